@@ -10,6 +10,12 @@ from enzsrp.presentation.download_isoform_id_uniparc_mapping import \
 
 from enzsrp.presentation.build_enzyme_reaction_dataset import build_enzyme_reaction_dataset
 
+from enzsrp.presentation.build_uniprot_entry_index import build_uniprot_index
+
+from enzsrp.presentation.build_uniprot_entry_catalog import build_uniprot_catalog
+
+from enzsrp.presentation.precompile_rhea import precompile_rhea
+
 
 @click.group()
 def create():
@@ -18,6 +24,9 @@ def create():
 
 create.add_command(download_isoform_id_uniparc_mapping)  # type: ignore
 create.add_command(build_enzyme_reaction_dataset)  # type: ignore
+create.add_command(build_uniprot_index)  # type: ignore
+create.add_command(build_uniprot_catalog)  # type: ignore
+create.add_command(precompile_rhea)  # type: ignore
 
 if __name__ == "__main__":
     create()
@@ -1,13 +1,20 @@
+import hashlib
 import json
 import os
 import warnings
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import List, Optional
+from pathlib import Path
+from typing import List, Optional, Dict, Tuple
 
 from enzsrp.data.datasource.original.mcsa.mcsa_entity import ResidueSequence, McsaEntry
 from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity
 from enzsrp.domain.entity.amino_acid import three_to_one
+from enzsrp.utils.json_sidecar import sidecar_path, load_json_sidecar, save_json_sidecar
+
+INDEX_FORMAT_VERSION = 2
+INDEX_FILE_SUFFIX = '.residue_index.json'
 
 
 # Intended for use by other classes
@@ -24,42 +31,104 @@ class MCSAResidueSequence:
         return cls(mcsa_id=mcsa_id, **asdict(residue_sequence))
 
 
+def default_index_path(mcsa_data_dir: Path) -> Path:
+    return sidecar_path(mcsa_data_dir, INDEX_FILE_SUFFIX)
+
+
+def _list_json_files(mcsa_data_dir: Path) -> List[str]:
+    return [os.path.join(root, file) for root, dirs, files in os.walk(mcsa_data_dir) for file in files if
+            file.endswith('.json')]
+
+
+def _fingerprint(json_files: List[str]) -> str:
+    # NOTE: Based on the file stats so that an unchanged directory is recognized without reading the files.
+    sha256 = hashlib.sha256()
+    for path in sorted(json_files):
+        stat = os.stat(path)
+        sha256.update(f"{path}\t{stat.st_size}\t{stat.st_mtime_ns}\n".encode('utf-8'))
+    return sha256.hexdigest()
+
+
+def _load_residue_sequences(filepath: str) -> List[Tuple[str, List[MCSAResidueSequence]]]:
+    """
+    Returns (M-CSA ID, residues linked to UniProt) of each entry in the file. Used in worker processes.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    result = []
+    for entry in data["results"]:
+        entry = McsaEntry.from_dict(entry)
+        # NOTE: entry.reference_uniprot_id may contain multiple UniProt IDs (?),
+        # so the residue's UniProt ID is used instead
+        result.append((entry.mcsa_id, [MCSAResidueSequence.from_dict(residue.residue_sequences, entry.mcsa_id) for
+                                       residue in entry.residues if residue.residue_sequences.uniprot_id is not None]))
+    return result
+
+
+def _decode_index(payload: dict) -> Dict[str, Tuple[MCSAResidueSequence, ...]]:
+    return {uniprot_id: tuple(MCSAResidueSequence(mcsa_id, uniprot_id, code, is_reference, resid) for
+                              mcsa_id, code, is_reference, resid in residues) for uniprot_id, residues in
+            payload.items()}
+
+
+def _encode_index(index: Dict[str, Tuple[MCSAResidueSequence, ...]]) -> dict:
+    return {uniprot_id: [[r.mcsa_id, r.code, r.is_reference, r.resid] for r in residues] for uniprot_id, residues in
+            index.items()}
+
+
 class OriginalMCSADataSource:
 
-    def __init__(self, mcsa_data_dir):
-        self.mcsa_data_dir = mcsa_data_dir
+    def __init__(self, mcsa_data_dir, n_workers: int = 1, index_path: Optional[Path] = None):
+        """
+        The residues linked to UniProt are indexed by UniProt ID and saved to `index_path` (default:
+        `<mcsa_data_dir>.residue_index.json`). The index is reused while the JSON files in `mcsa_data_dir` are unchanged.
+        """
+        self.mcsa_data_dir = Path(mcsa_data_dir)
+        self.n_workers = n_workers
+        self.index_path = index_path if index_path is not None else default_index_path(self.mcsa_data_dir)
         self.uniprot_id_residues_map = self._load_uniprot_id_residues_map()
+        # Validation error message (None if valid) by (accession, hash of the sequence)
+        self._validation_cache: Dict[Tuple[str, int], Optional[str]] = {}
+
+    def _load_json_files(self, json_files: List[str]) -> List[Tuple[str, List[MCSAResidueSequence]]]:
+        if self.n_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                loaded = list(executor.map(_load_residue_sequences, json_files))
+        else:
+            loaded = [_load_residue_sequences(filepath) for filepath in json_files]
+        entries = [entry for file_entries in loaded for entry in file_entries]
+        return sorted(entries, key=lambda x: x[0])
 
-    def _load_json_files(self):
-        json_data = []
-        for root, dirs, files in os.walk(self.mcsa_data_dir):
-            for file in files:
-                if file.endswith('.json'):
-                    filepath = os.path.join(root, file)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        json_data.append(data)
-        entries = [j for jo in json_data for j in jo["results"]]
-        entries = sorted(entries, key=lambda x: x["mcsa_id"])
-        return entries
-
-    # def load_entries(self):
-    #     entries = self._load_json_files()
-    #     entries = [McsaEntry.from_dict(entry) for entry in entries]
-    #     return entries
-
-    def _load_uniprot_id_residues_map(self) -> dict[str, List[MCSAResidueSequence]]:
-        entries = self._load_json_files()
-        entries = [McsaEntry.from_dict(entry) for entry in entries]
+    def _load_uniprot_id_residues_map(self) -> Dict[str, Tuple[MCSAResidueSequence, ...]]:
+        json_files = _list_json_files(self.mcsa_data_dir)
+        fingerprint = _fingerprint(json_files)
+        index = load_json_sidecar(self.index_path, INDEX_FORMAT_VERSION, fingerprint, _decode_index)
+        if index is not None:
+            return index
         result = defaultdict(list)
-        for entry in entries:
-            for residue in entry.residues:
-                # NOTE: entry.reference_uniprot_id may contain multiple UniProt IDs (?),
-                # so the residue's UniProt ID is used instead
-                if residue.residue_sequences.uniprot_id is not None:
-                    result[residue.residue_sequences.uniprot_id].append(
-                        MCSAResidueSequence.from_dict(residue.residue_sequences, entry.mcsa_id))
-        return result
+        for mcsa_id, residues in self._load_json_files(json_files):
+            for residue in residues:
+                result[residue.uniprot_id].append(residue)
+        index = {uniprot_id: tuple(residues) for uniprot_id, residues in result.items()}
+        try:
+            save_json_sidecar(self.index_path, INDEX_FORMAT_VERSION, fingerprint, _encode_index(index))
+        except OSError as e:
+            warnings.warn(f"Failed to save the M-CSA residue index to {self.index_path}: {e}")
+        return index
+
+    def _validate_residues(self, accession: str, sequence: str) -> Optional[str]:
+        key = (accession, hash(sequence))
+        if key not in self._validation_cache:
+            message = None
+            try:
+                for residue in self.uniprot_id_residues_map[accession]:
+                    if len(sequence) < residue.resid or sequence[residue.resid - 1] != three_to_one(residue.code):
+                        raise ValueError(
+                            f"residue does not match to Uniprot Entry Sequence, MCS-A ID: {residue.mcsa_id}")
+            except ValueError as e:
+                message = str(e)
+            self._validation_cache[key] = message
+        return self._validation_cache[key]
 
     def get_residues_by_entry(self, entry: EntryWithCatalyticActivity):
         result = set()
@@ -67,15 +136,11 @@ class OriginalMCSADataSource:
         if entry.last_sequence_update_date.year >= 2018:
             warnings.warn("MCS-A mapping might be legacy")
         for accession in accessions:
-            residues = self.uniprot_id_residues_map.get(accession, [])
-            try:
-                for residue in residues:
-                    if len(entry.sequence) < residue.resid or entry.sequence[residue.resid - 1] != three_to_one(
-                            residue.code):
-                        raise ValueError(
-                            f"residue does not match to Uniprot Entry Sequence, MCS-A ID: {residue.mcsa_id}")
-                result.update(residues)
-            except ValueError as e:
-                warnings.warn(str(e))
+            if accession not in self.uniprot_id_residues_map:
+                continue
+            message = self._validate_residues(accession, entry.sequence)
+            if message is not None:
+                warnings.warn(message)
                 return set()  # If even one residue doesn't match, discard all. Data might be old.
+            result.update(self.uniprot_id_residues_map[accession])
         return result
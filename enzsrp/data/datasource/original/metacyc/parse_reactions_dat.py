@@ -1,14 +1,25 @@
+import warnings
 from pathlib import Path
-from typing import Optional
-
-import pandas as pd
+from types import MappingProxyType
+from typing import Optional, List, Tuple, Generator, Dict, FrozenSet
 
 from enzsrp.domain.entity.reaction_direciton import MetaCycDirection
+from enzsrp.utils.hash_util import hash_file
+from enzsrp.utils.json_sidecar import sidecar_path, load_json_sidecar, save_json_sidecar
 from enzsrp.utils.list_utils import get_first_from_single_list
 
-UNIQUE_ID_TAG = "UNIQUE-ID"
-RHEA_TAG = "DBLINKS - (RHEA"
-REACTION_DIRECTION_TAG = "REACTION-DIRECTION"
+UNIQUE_ID_TAG = b"UNIQUE-ID"
+RHEA_TAG = b"DBLINKS - (RHEA"
+REACTION_DIRECTION_TAG = b"REACTION-DIRECTION"
+RECORD_START = b"UNIQUE-ID - "
+RECORD_END = b"//"
+
+INDEX_FORMAT_VERSION = 2
+INDEX_FILE_SUFFIX = '.directions.json'
+
+
+def default_index_path(reaction_dat: Path) -> Path:
+    return sidecar_path(reaction_dat, INDEX_FILE_SUFFIX)
 
 
 def _extract_rhea_id_from_line(text: str) -> str:
@@ -25,67 +36,98 @@ def _extract_rhea_id_from_line(text: str) -> str:
         raise RuntimeError()
 
 
-def _extract_value_from_line(text: str) -> str:
-    return text.replace("\n", "").strip().split(" - ")[1]
+def _decode(value: bytes) -> str:
+    # NOTE: The whole file used to be decoded with `unicode_escape`. Only the values used are decoded now.
+    return value.decode('unicode_escape')
 
 
-def _extract_reaction_direction_from_line(text: str) -> MetaCycDirection:
-    direction_text = _extract_value_from_line(text)
-    return MetaCycDirection.from_text(direction_text)
+def _extract_value_from_line(line: bytes) -> str:
+    return _decode(line.replace(b"\n", b"").strip().split(b" - ")[1])
 
 
-def _extract_rxn_direction_from_one_rxn(lines: list[str]):
-    rhea_lines = [hog for hog in lines if RHEA_TAG in hog]
-    reaction_direction_lines = [hog for hog in lines if REACTION_DIRECTION_TAG in hog]
-    unique_id_lines = [hog for hog in lines if UNIQUE_ID_TAG in hog]
+def _extract_rxn_direction_from_one_rxn(unique_id_lines: List[bytes], reaction_direction_lines: List[bytes],
+                                        rhea_lines: List[bytes]) -> Tuple[Optional[str], Optional[MetaCycDirection]]:
     if len(reaction_direction_lines) < 1 or len(unique_id_lines) < 1:
-        return None, None, None, None
-    unique_id = get_first_from_single_list(unique_id_lines)
-    unique_id = _extract_value_from_line(unique_id)
-    rhea_ids = [_extract_rhea_id_from_line(line) for line in rhea_lines]
+        return None, None
+    unique_id = _extract_value_from_line(get_first_from_single_list(unique_id_lines))
+    # NOTE: The Rhea IDs are not used, but malformed links are still rejected.
+    for line in rhea_lines:
+        _extract_rhea_id_from_line(_decode(line))
     reaction_direction = get_first_from_single_list(reaction_direction_lines)
-    reaction_direction = _extract_reaction_direction_from_line(reaction_direction)
-    if len(rhea_ids) > 2:
+    reaction_direction = MetaCycDirection.from_text(_extract_value_from_line(reaction_direction))
+    if len(rhea_lines) > 2:
         raise RuntimeError("unexpected. should be <= 2")
-    rhea_ids += [None] * (2 - len(rhea_ids))
-    return unique_id, rhea_ids[0], rhea_ids[1], reaction_direction
-
-
-def _parse_single_rxn_format_file(file_path: Path) -> list[dict]:
-    with open(file_path, 'r', encoding='unicode_escape') as file:
-        lines = file.readlines()
-
-    loading_mol_lines = []
-    result = []
-    for line in lines:
-        if line.startswith("UNIQUE-ID - "):
-            loading_mol_lines = []
-
-        loading_mol_lines.append(line)
-
-        if line.startswith("//"):
-            unique_id, rhea, rhea2, direction = _extract_rxn_direction_from_one_rxn(loading_mol_lines)
-            if direction is None:
-                continue
-            result.append(
-                {"unique_id_rxn": unique_id, "rhea_id1": rhea, "rhea_id2": rhea2, "rxn_direction": direction.value})
-    return result
+    return unique_id, reaction_direction
+
+
+def stream_reaction_directions(file_path: Path) -> Generator[Tuple[str, MetaCycDirection], None, None]:
+    """
+    Yields (UNIQUE-ID, REACTION-DIRECTION) of each record that has both, reading the file line by line as bytes.
+    Only the lines with UNIQUE-ID, REACTION-DIRECTION and Rhea DBLINKS are kept for the current record.
+    """
+    unique_id_lines, reaction_direction_lines, rhea_lines = [], [], []
+    with open(file_path, 'rb') as file:
+        for line in file:
+            if line.startswith(RECORD_START):
+                unique_id_lines, reaction_direction_lines, rhea_lines = [], [], []
+            # NOTE: using 'if' instead of 'elif' because the tags are matched anywhere in the line
+            if UNIQUE_ID_TAG in line:
+                unique_id_lines.append(line)
+            if REACTION_DIRECTION_TAG in line:
+                reaction_direction_lines.append(line)
+            if RHEA_TAG in line:
+                rhea_lines.append(line)
+            if line.startswith(RECORD_END):
+                unique_id, direction = _extract_rxn_direction_from_one_rxn(unique_id_lines, reaction_direction_lines,
+                                                                           rhea_lines)
+                if direction is not None:
+                    yield unique_id, direction
+
+
+def build_direction_index(file_path: Path) -> Tuple[Dict[str, MetaCycDirection], FrozenSet[str]]:
+    """
+    Returns the direction of each MetaCyc reaction ID and the IDs found in more than one record.
+    """
+    index = {}
+    duplicated = set()
+    for unique_id, direction in stream_reaction_directions(file_path):
+        if unique_id in index:
+            duplicated.add(unique_id)
+        index[unique_id] = direction
+    return index, frozenset(duplicated)
+
+
+def _decode_index(payload: dict) -> Tuple[Dict[str, MetaCycDirection], FrozenSet[str]]:
+    index = {unique_id: MetaCycDirection.from_text(direction) for unique_id, direction in payload['directions'].items()}
+    return index, frozenset(payload['duplicated_ids'])
+
+
+def _encode_index(index: Dict[str, MetaCycDirection], duplicated: FrozenSet[str]) -> dict:
+    return {'directions': {unique_id: direction.value for unique_id, direction in index.items()},
+            'duplicated_ids': sorted(duplicated)}
 
 
 class MetaCycDirectionMapper:
 
-    def __init__(self, reaction_dat: Path):
-        parsed = _parse_single_rxn_format_file(reaction_dat)
-        self.df_metacyc_id_to_direction = pd.DataFrame(parsed)
-        pass
+    def __init__(self, reaction_dat: Path, index_path: Optional[Path] = None):
+        """
+        The direction index is saved to `index_path` (default: `<reaction_dat>.directions.json`) with the hash of
+        `reaction_dat`, and reused while `reaction_dat` is unchanged.
+        """
+        index_path = index_path if index_path is not None else default_index_path(reaction_dat)
+        source_hash = hash_file(reaction_dat)
+        loaded = load_json_sidecar(index_path, INDEX_FORMAT_VERSION, source_hash, _decode_index)
+        if loaded is None:
+            loaded = build_direction_index(reaction_dat)
+            try:
+                save_json_sidecar(index_path, INDEX_FORMAT_VERSION, source_hash, _encode_index(*loaded))
+            except OSError as e:
+                warnings.warn(f"Failed to save the MetaCyc direction index to {index_path}: {e}")
+        index, self.duplicated_metacyc_ids = loaded
+        self.direction_by_metacyc_id = MappingProxyType(index)
 
     # If direction is not defined, set to None
     def metacyc_id_to_direction(self, metacyc_id: str) -> Optional[MetaCycDirection]:
-        result = self.df_metacyc_id_to_direction[self.df_metacyc_id_to_direction["unique_id_rxn"] == metacyc_id]
-        if len(result) == 1:
-            direction_str = result["rxn_direction"].iloc[0]
-            return MetaCycDirection.from_text(direction_str)
-        elif len(result) >= 1:
+        if metacyc_id in self.duplicated_metacyc_ids:
             raise ValueError("Unexpected. MetaCyc ID should be unique(?)")
-        else:
-            return None
+        return self.direction_by_metacyc_id.get(metacyc_id)
@@ -1,52 +1,100 @@
 import warnings
+from collections import defaultdict
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Optional, Set
+from types import MappingProxyType
+from typing import Optional, Set, Mapping, Tuple, FrozenSet, Iterable, Dict
 
 import pandas as pd
 from rdkit.Chem import AllChem
 
+from enzsrp.data.datasource.original.rhea.rhea_reaction import RheaReaction
+from enzsrp.data.datasource.original.rhea.rhea_reaction_cache import RheaReactionCache, DEFAULT_REACTION_CACHE_BYTES
+from enzsrp.data.datasource.original.rhea.rhea_reaction_store import RheaReactionStore, reaction_from_binary, \
+    compile_rhea_reaction, PRECOMPILE_CHUNK_SIZE
+from enzsrp.data.datasource.original.rhea.rhea_rxn_file import parse_rhea_rxn_block, open_rhea_rxn_source
 from enzsrp.domain.entity.reaction_direciton import RheaDirectionName
-from enzsrp.extension.parse_reaction import reaction_from_rxn_block_with_mol_title
-from enzsrp.extension.rdkit_warning import RDKitWarningInterceptor, AmbiguousStereoChemistryWarningException, \
-    Tagged3DBut2DMarkersFoundException
+from enzsrp.extension.rdkit_warning import AmbiguousStereoChemistryWarningException
+
+# Order of the direction IDs stored in `OriginalRheaDatasource.direction_ids_by_master_id`
+_DIRECTION_COLUMNS = (RheaDirectionName.RHEA_ID_LR, RheaDirectionName.RHEA_ID_RL, RheaDirectionName.RHEA_ID_BI)
 
 
 class OriginalRheaDatasource:
 
-    def __init__(self, rhea_rxn_dir: Path, rhea2metacyc: Path, rhea_directions: Path):
-        self.single_reaction_cache = {}
+    def __init__(self, rhea_rxn_dir: Path, rhea2metacyc: Path, rhea_directions: Path,
+                 reaction_store: Optional[Path] = None,
+                 reaction_cache_bytes: Optional[int] = DEFAULT_REACTION_CACHE_BYTES):
+        """
+        `rhea_rxn_dir` is the directory of the extracted rxn files, or the Rhea rxn archive itself (.tar or .tar.gz).
+        If `reaction_store` (created by `precompile-rhea`) is given, reactions are loaded from it instead of being
+        parsed from the rxn files. IDs not in the store are parsed as usual.
+        `reaction_cache_bytes` is the memory budget of `single_reaction_cache` (None for no limit).
+        """
+        self.single_reaction_cache = RheaReactionCache(reaction_cache_bytes)
+        # Results of the last `prefetch_reactions`, kept until `release_prefetched_reactions` even if evicted from
+        # `single_reaction_cache`
+        self._prefetched: Dict[str, Optional[RheaReaction]] = {}
         self.rhea_rxn_dir = rhea_rxn_dir
-        self.rhea_metacyc_df = pd.read_csv(rhea2metacyc, sep="\t", dtype={'RHEA_ID': str, 'MASTER_ID': str})
-        self.rhea_id_map = pd.read_csv(rhea_directions, sep="\t", dtype=str)
-        self.master_ids = self.rhea_id_map['RHEA_ID_MASTER'].values
+        self.rxn_source = open_rhea_rxn_source(rhea_rxn_dir) if rhea_rxn_dir is not None else None
+        self.reaction_store = RheaReactionStore(reaction_store) if reaction_store is not None else None
+        rhea_metacyc_df = pd.read_csv(rhea2metacyc, sep="\t", dtype={'RHEA_ID': str, 'MASTER_ID': str})
+        rhea_id_map = pd.read_csv(rhea_directions, sep="\t", dtype=str)
+        self.direction_ids_by_master_id, self.duplicated_master_ids = self._index_direction_ids(rhea_id_map)
+        self.metacyc_ids_by_master_id = self._index_metacyc_ids(rhea_metacyc_df)
         self.warned_rhea_ids = set()
 
+    @staticmethod
+    def _index_direction_ids(rhea_id_map: pd.DataFrame) \
+            -> Tuple[Mapping[str, Tuple[str, str, str]], FrozenSet[str]]:
+        index = {}
+        duplicated = set()
+        columns = [rhea_id_map[name.value].values for name in _DIRECTION_COLUMNS]
+        for master_id, *direction_ids in zip(rhea_id_map[RheaDirectionName.RHEA_ID_MASTER.value].values, *columns):
+            if master_id in index:
+                duplicated.add(master_id)
+            index[master_id] = tuple(direction_ids)
+        return MappingProxyType(index), frozenset(duplicated)
+
+    @staticmethod
+    def _index_metacyc_ids(rhea_metacyc_df: pd.DataFrame) -> Mapping[str, FrozenSet[str]]:
+        index = defaultdict(set)
+        for master_id, metacyc_id in zip(rhea_metacyc_df['MASTER_ID'].values, rhea_metacyc_df['ID'].values):
+            index[master_id].add(metacyc_id.strip())
+        return MappingProxyType({master_id: frozenset(metacyc_ids) for master_id, metacyc_ids in index.items()})
+
     def map_master_id_to_direction_id(self, rhea_id: str, direction: RheaDirectionName):
-        selected_row = self.rhea_id_map[self.rhea_id_map[RheaDirectionName.RHEA_ID_MASTER.value] == rhea_id]
-        if len(selected_row) == 1:
-            return selected_row[direction.value].iloc[0]
-        elif len(selected_row) > 1:
+        if rhea_id in self.duplicated_master_ids:
             raise ValueError(f"Unexpected multiple hit while mapping rhea MASTER_ID {rhea_id}")
-        else:
+        direction_ids = self.direction_ids_by_master_id.get(rhea_id)
+        if direction_ids is None:
             raise ValueError(
                 f"rhea ID: {rhea_id} is not listed in rhea MASTER_ID column in id table. It might be other ID (e.g. RHEA_ID_LR)")
+        if direction is RheaDirectionName.RHEA_ID_MASTER:
+            return rhea_id
+        return direction_ids[_DIRECTION_COLUMNS.index(direction)]
+
+    def _warn_failure(self, rhea_id: str, reason: str):
+        warnings.warn(f"rhea: {rhea_id}, message: {reason}")
+        self.warned_rhea_ids.add(rhea_id)
+
+    def _get_single_reaction_from_store(self, rhea_id: str) -> Tuple[bool, Optional[AllChem.ChemicalReaction]]:
+        binary = self.reaction_store.get_reaction_binary(rhea_id)
+        if binary is not None:
+            return True, reaction_from_binary(binary)
+        reason = self.reaction_store.get_failure_reason(rhea_id)
+        if reason is not None:
+            self._warn_failure(rhea_id, reason)
+            return True, None
+        return False, None
 
     def get_single_reaction(self, rhea_id: str) -> Optional[AllChem.ChemicalReaction]:
+        if self.reaction_store is not None:
+            found, result = self._get_single_reaction_from_store(rhea_id)
+            if found:
+                return result
         try:
-            path = self.rhea_rxn_dir.joinpath(f"{rhea_id}.rxn")
-            with open(path, 'r') as file:
-                rxn_block = file.read()
-                if rhea_id == '55541':
-                    rxn_block = rxn_block.replace('93123', '93 123')
-            interceptor = RDKitWarningInterceptor()
-            # NOTE: You can ignore warnings by comment out following code, otherwise reactions with these warning won't be used.
-            interceptor.set_ignore_warning_exceptions(
-                [AmbiguousStereoChemistryWarningException, Tagged3DBut2DMarkersFoundException])
-            with interceptor:
-                result = reaction_from_rxn_block_with_mol_title(rxn_block)
-            if rhea_id == '61542':
-                print(result)
-            return result
+            return parse_rhea_rxn_block(self.rxn_source.read_rxn_block(rhea_id))
         except FileNotFoundError as e:
             # NOTE: If a molecule in ChEBI does not have a provided structure, the rxn file is likely missing
             # (the Rhea page also does not have a download button).
@@ -73,18 +121,75 @@ class OriginalRheaDatasource:
             self.warned_rhea_ids.add(rhea_id)
             return None
 
-    def get_single_reaction_with_cache(self, rhea_id: str) -> Optional[AllChem.ChemicalReaction]:
+    def get_rhea_reaction_with_cache(self, rhea_id: str) -> Optional[RheaReaction]:
         assert isinstance(rhea_id, str), "rhea_id should be `str` type"
-        if rhea_id in self.single_reaction_cache:
-            return self.single_reaction_cache[rhea_id]
-        result = self.get_single_reaction(rhea_id)
-        self.single_reaction_cache[rhea_id] = result
+        if rhea_id in self._prefetched:
+            return self._prefetched[rhea_id]
+        found, result = self.single_reaction_cache.lookup(rhea_id)
+        if found:
+            return result
+        reaction = self.get_single_reaction(rhea_id)
+        result = RheaReaction.from_reaction(reaction) if reaction is not None else None
+        self.single_reaction_cache.put(rhea_id, result)
         return result
 
+    def get_single_reaction_with_cache(self, rhea_id: str) -> Optional[AllChem.ChemicalReaction]:
+        result = self.get_rhea_reaction_with_cache(rhea_id)
+        return result.reaction if result is not None else None
+
+    def _put_prefetched(self, rhea_id: str, result: Optional[RheaReaction]):
+        self._prefetched[rhea_id] = result
+        self.single_reaction_cache.put(rhea_id, result)
+
+    def prefetch_reactions(self, rhea_ids: Iterable[str], executor: Executor):
+        """
+        Resolves the reactions, parsing the ones not cached yet with `executor`. Failures are warned here and kept as
+        None. The results are kept until `release_prefetched_reactions` regardless of the budget of
+        `single_reaction_cache`, so that generating the rows afterwards is only a lookup.
+        """
+        missing = []
+        for rhea_id in set(rhea_ids):
+            found, result = self.single_reaction_cache.lookup(rhea_id)
+            if found:
+                self._prefetched[rhea_id] = result
+            else:
+                missing.append(rhea_id)
+        if self.reaction_store is not None:
+            not_stored = []
+            for rhea_id in missing:
+                binary = self.reaction_store.get_reaction_binary(rhea_id)
+                if binary is not None:
+                    self._put_prefetched(rhea_id, RheaReaction.from_binary(binary))
+                    continue
+                reason = self.reaction_store.get_failure_reason(rhea_id)
+                if reason is None:
+                    not_stored.append(rhea_id)
+                else:
+                    self._warn_failure(rhea_id, reason)
+                    self._put_prefetched(rhea_id, None)
+            missing = not_stored
+        rxn_blocks = self.rxn_source.read_rxn_blocks(missing)
+        for rhea_id in missing:
+            if rhea_id not in rxn_blocks:
+                warnings.warn(f"File not found Rhea ID: {rhea_id}. This Rhea ID won't be used.")
+                self._put_prefetched(rhea_id, None)
+        for rhea_id, binary, reason in executor.map(compile_rhea_reaction, rxn_blocks.keys(), rxn_blocks.values(),
+                                                    chunksize=PRECOMPILE_CHUNK_SIZE):
+            if binary is None:
+                self._warn_failure(rhea_id, reason)
+                self._put_prefetched(rhea_id, None)
+            else:
+                self._put_prefetched(rhea_id, RheaReaction.from_binary(binary))
+
+    def release_prefetched_reactions(self):
+        """
+        Drops the results kept by `prefetch_reactions`. They stay in `single_reaction_cache` within its budget.
+        """
+        self._prefetched.clear()
+
     # There may be multiple hits. If there is no reference from Rhea to MetaCyc, an empty set is returned.
     def map_rhea_id_to_metacyc_id(self, rhea_id: str) -> Set[str]:
-        if rhea_id not in self.master_ids:
+        if rhea_id not in self.direction_ids_by_master_id:
             warnings.warn('MASTER_ID is expected')
             return set()
-        metacyc_ids = self.rhea_metacyc_df[self.rhea_metacyc_df['MASTER_ID'] == rhea_id]["ID"].values
-        return set([metacyc_id.strip() for metacyc_id in metacyc_ids])
+        return set(self.metacyc_ids_by_master_id.get(rhea_id, ()))
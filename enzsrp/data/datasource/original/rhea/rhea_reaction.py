@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+from rdkit.Chem import AllChem
+
+from enzsrp.data.datasource.original.rhea.rhea_reaction_store import reaction_to_binary, reaction_from_binary
+from enzsrp.extension.parse_reaction import get_all_mol_names_in_rxn
+
+
+@dataclass(frozen=True)
+class RheaReaction:
+    """
+    A parsed Rhea reaction with the attributes used for every dataset row, computed once per reaction. The reaction
+    itself is kept as RDKit's binary pickle, which is much smaller than the molecules, and rebuilt on access.
+    `binary` is None for reactions read from Rhea's reaction SMILES (see `TabularRheaDatasource`). Their `reaction`
+    is built from `smiles` and its molecules have no title.
+    """
+    binary: Optional[bytes]
+    smiles: str
+    mol_titles: FrozenSet[str]  # ChEBI IDs of the participants
+
+    @property
+    def reaction(self) -> AllChem.ChemicalReaction:
+        if self.binary is None:
+            return AllChem.ReactionFromSmarts(self.smiles, useSmiles=True)
+        return reaction_from_binary(self.binary)
+
+    @property
+    def n_bytes(self) -> int:
+        """
+        Approximate size of the payload, used for the cache budget.
+        """
+        return len(self.binary or b'') + len(self.smiles) + sum(len(title) for title in self.mol_titles)
+
+    @classmethod
+    def from_reaction(cls, reaction: AllChem.ChemicalReaction) -> 'RheaReaction':
+        return cls(reaction_to_binary(reaction), AllChem.ReactionToSmiles(reaction),
+                   frozenset(get_all_mol_names_in_rxn(reaction)))
+
+    @classmethod
+    def from_binary(cls, binary: bytes) -> 'RheaReaction':
+        reaction = reaction_from_binary(binary)
+        return cls(binary, AllChem.ReactionToSmiles(reaction), frozenset(get_all_mol_names_in_rxn(reaction)))
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict, KeysView
+
+from enzsrp.data.datasource.original.rhea.rhea_reaction import RheaReaction
+
+DEFAULT_REACTION_CACHE_BYTES = 1 << 30
+# Charged for a failed reaction (None) so that failures are also bounded
+_FAILURE_N_BYTES = 64
+
+
+class RheaReactionCache:
+    """
+    LRU cache of `RheaReaction` (or None for a reaction that failed to be parsed) keyed by Rhea ID. The least recently
+    used reactions are evicted while the resident bytes exceed `max_bytes`. `max_bytes=None` means no limit.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = DEFAULT_REACTION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._reactions: 'OrderedDict[str, Optional[RheaReaction]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resident_bytes = 0
+
+    def __len__(self):
+        return len(self._reactions)
+
+    def __contains__(self, rhea_id: str):
+        return rhea_id in self._reactions
+
+    def keys(self) -> KeysView[str]:
+        return self._reactions.keys()
+
+    @staticmethod
+    def _n_bytes(reaction: Optional[RheaReaction]) -> int:
+        return reaction.n_bytes if reaction is not None else _FAILURE_N_BYTES
+
+    def lookup(self, rhea_id: str) -> Tuple[bool, Optional[RheaReaction]]:
+        """
+        Returns (True, cached value) on a hit, otherwise (False, None).
+        """
+        if rhea_id not in self._reactions:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self._reactions.move_to_end(rhea_id)
+        return True, self._reactions[rhea_id]
+
+    def put(self, rhea_id: str, reaction: Optional[RheaReaction]):
+        if rhea_id in self._reactions:
+            self.resident_bytes -= self._n_bytes(self._reactions.pop(rhea_id))
+        self._reactions[rhea_id] = reaction
+        self.resident_bytes += self._n_bytes(reaction)
+        # NOTE: The reaction just added is kept even if it alone exceeds the budget.
+        while self.max_bytes is not None and self.resident_bytes > self.max_bytes and len(self._reactions) > 1:
+            _, evicted = self._reactions.popitem(last=False)
+            self.resident_bytes -= self._n_bytes(evicted)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'resident_bytes': self.resident_bytes, 'n_reactions': len(self._reactions)}
@@ -0,0 +1,113 @@
+import sqlite3
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Tuple, Iterable, List, Generator, Union
+
+from rdkit import Chem, rdBase
+from rdkit.Chem import AllChem
+from tqdm import tqdm
+
+from enzsrp.data.datasource.original.rhea.rhea_rxn_file import parse_rhea_rxn_block, open_rhea_rxn_source, \
+    RheaRxnDirectory, RheaRxnArchive
+from enzsrp.utils.atomic_file import atomic_write_path
+
+STORE_FORMAT_VERSION = 1
+PRECOMPILE_CHUNK_SIZE = 64
+PRECOMPILE_BATCH_SIZE = 4096
+
+_SCHEMA = """
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE reactions (rhea_id TEXT PRIMARY KEY, reaction BLOB NOT NULL);
+CREATE TABLE failures (rhea_id TEXT PRIMARY KEY, reason TEXT NOT NULL);
+"""
+
+
+def reaction_to_binary(reaction: AllChem.ChemicalReaction) -> bytes:
+    # NOTE: Molecule properties (e.g. titles) are dropped by the default pickle options.
+    return reaction.ToBinary(Chem.PropertyPickleOptions.AllProps)
+
+
+def reaction_from_binary(binary: bytes) -> AllChem.ChemicalReaction:
+    return AllChem.ChemicalReaction(binary)
+
+
+def compile_rhea_reaction(rhea_id: str, rxn_block: str) -> Tuple[str, Optional[bytes], Optional[str]]:
+    """
+    Returns (rhea_id, reaction binary, None), or (rhea_id, None, failure reason). Used in worker processes.
+    """
+    try:
+        return rhea_id, reaction_to_binary(parse_rhea_rxn_block(rxn_block)), None
+    except Exception as e:
+        return rhea_id, None, f"{type(e).__name__}: {e}"
+
+
+class RheaReactionStore:
+    """
+    Parsed Rhea reactions created by `precompile_rhea_reactions`. Reactions that failed to be parsed are recorded with
+    the reason.
+    """
+
+    def __init__(self, path: Path):
+        if not path.exists():
+            raise FileNotFoundError(f"The Rhea reaction store is not found: {path}. Please run `precompile-rhea` first.")
+        self.path = path
+        # NOTE: `check_same_thread=False` since the store is read only.
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        metadata = dict(self._connection.execute("SELECT key, value FROM metadata").fetchall())
+        if int(metadata['format_version']) != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported Rhea reaction store format version {metadata['format_version']}: {path}")
+        if metadata['rdkit_version'] != rdBase.rdkitVersion:
+            warnings.warn(f"The Rhea reaction store was created with RDKit {metadata['rdkit_version']}, but RDKit "
+                          f"{rdBase.rdkitVersion} is used. Please consider running `precompile-rhea` again.")
+
+    def get_reaction_binary(self, rhea_id: str) -> Optional[bytes]:
+        row = self._connection.execute("SELECT reaction FROM reactions WHERE rhea_id = ?", (rhea_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_failure_reason(self, rhea_id: str) -> Optional[str]:
+        row = self._connection.execute("SELECT reason FROM failures WHERE rhea_id = ?", (rhea_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def close(self):
+        self._connection.close()
+
+
+def write_reaction_store(store_path: Path, results: Iterable[Tuple[str, Optional[bytes], Optional[str]]]):
+    """
+    Writes (rhea_id, reaction binary, failure reason) records. The file is replaced atomically.
+    """
+    with atomic_write_path(store_path) as tmp_path, closing(sqlite3.connect(tmp_path)) as connection:
+        connection.executescript(_SCHEMA)
+        connection.executemany("INSERT INTO metadata VALUES (?, ?)",
+                               [('format_version', str(STORE_FORMAT_VERSION)), ('rdkit_version', rdBase.rdkitVersion)])
+        for rhea_id, binary, reason in results:
+            if binary is not None:
+                connection.execute("INSERT INTO reactions VALUES (?, ?)", (rhea_id, binary))
+            else:
+                connection.execute("INSERT INTO failures VALUES (?, ?)", (rhea_id, reason))
+        connection.commit()
+
+
+def _compile_reactions_in_batches(executor: ProcessPoolExecutor, rxn_source: Union[RheaRxnDirectory, RheaRxnArchive],
+                                  rhea_ids: List[str]) \
+        -> Generator[Tuple[str, Optional[bytes], Optional[str]], None, None]:
+    # NOTE: `Executor.map` submits all the tasks at once, so the rxn blocks are read and sent batch by batch.
+    for i in range(0, len(rhea_ids), PRECOMPILE_BATCH_SIZE):
+        rxn_blocks = rxn_source.read_rxn_blocks(rhea_ids[i:i + PRECOMPILE_BATCH_SIZE])
+        yield from executor.map(compile_rhea_reaction, rxn_blocks.keys(), rxn_blocks.values(),
+                                chunksize=PRECOMPILE_CHUNK_SIZE)
+
+
+def precompile_rhea_reactions(rhea_rxn_dir: Path, store_path: Path, n_workers: int = 1):
+    """
+    Parses all rxn files in `rhea_rxn_dir` (a directory or the Rhea rxn archive) with a process pool and saves them to
+    the reaction store.
+    """
+    rxn_source = open_rhea_rxn_source(rhea_rxn_dir)
+    rhea_ids = rxn_source.list_rhea_ids()
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = _compile_reactions_in_batches(executor, rxn_source, rhea_ids)
+        write_reaction_store(store_path, tqdm(results, total=len(rhea_ids), desc='Compiling Rhea reactions',
+                                              unit=' reactions'))
@@ -0,0 +1,138 @@
+import tarfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from rdkit.Chem import AllChem
+
+from enzsrp.extension.parse_reaction import reaction_from_rxn_block_with_mol_title
+from enzsrp.extension.rdkit_warning import RDKitWarningCapture, AmbiguousStereoChemistryWarningException, \
+    Tagged3DBut2DMarkersFoundException
+
+
+def fix_rhea_rxn_block(rhea_id: str, rxn_block: str) -> str:
+    if rhea_id == '55541':
+        rxn_block = rxn_block.replace('93123', '93 123')
+    return rxn_block
+
+
+def read_rhea_rxn_block(rhea_rxn_dir: Path, rhea_id: str) -> str:
+    path = rhea_rxn_dir.joinpath(f"{rhea_id}.rxn")
+    with open(path, 'r') as file:
+        return fix_rhea_rxn_block(rhea_id, file.read())
+
+
+class RheaRxnDirectory:
+    """
+    The rxn files extracted from the Rhea archive, one `{rhea_id}.rxn` file per reaction.
+    """
+
+    def __init__(self, rhea_rxn_dir: Path):
+        self.path = rhea_rxn_dir
+
+    def list_rhea_ids(self) -> List[str]:
+        return sorted(path.stem for path in self.path.glob('*.rxn'))
+
+    def read_rxn_block(self, rhea_id: str) -> str:
+        return read_rhea_rxn_block(self.path, rhea_id)
+
+    def read_rxn_blocks(self, rhea_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Reads the rxn blocks of `rhea_ids`. IDs without a rxn file are omitted.
+        """
+        result = {}
+        for rhea_id in rhea_ids:
+            try:
+                result[rhea_id] = self.read_rxn_block(rhea_id)
+            except FileNotFoundError:
+                continue
+        return result
+
+
+def _rhea_id_of_member(member: tarfile.TarInfo) -> Optional[str]:
+    name = Path(member.name)
+    return name.stem if member.isfile() and name.suffix == '.rxn' else None
+
+
+class RheaRxnArchive:
+    """
+    The Rhea rxn archive read without extraction. For an uncompressed tar, an index of member offsets is built on first
+    access and blocks are read with seeks. A compressed tar cannot be seeked, so all blocks are loaded into memory in
+    one sequential read.
+    """
+
+    def __init__(self, archive_path: Path):
+        self.path = archive_path
+        with open(archive_path, 'rb') as file:
+            # NOTE: gzip, bz2 and xz magic numbers
+            self._is_compressed = file.read(3) in (b'\x1f\x8b\x08', b'BZh', b'\xfd7z')
+        self._offsets: Optional[Dict[str, Tuple[int, int]]] = None
+        self._blocks: Optional[Dict[str, str]] = None
+
+    def _get_offsets(self) -> Dict[str, Tuple[int, int]]:
+        if self._offsets is None:
+            offsets = {}
+            with tarfile.open(self.path, 'r:') as archive:
+                for member in archive:
+                    rhea_id = _rhea_id_of_member(member)
+                    if rhea_id is not None:
+                        offsets[rhea_id] = (member.offset_data, member.size)
+            self._offsets = offsets
+        return self._offsets
+
+    def _get_blocks(self) -> Dict[str, str]:
+        if self._blocks is None:
+            blocks = {}
+            with tarfile.open(self.path, 'r:*') as archive:
+                for member in archive:
+                    rhea_id = _rhea_id_of_member(member)
+                    if rhea_id is not None:
+                        text = archive.extractfile(member).read().decode('utf-8')
+                        blocks[rhea_id] = fix_rhea_rxn_block(rhea_id, text)
+            self._blocks = blocks
+        return self._blocks
+
+    def list_rhea_ids(self) -> List[str]:
+        return sorted(self._get_blocks().keys() if self._is_compressed else self._get_offsets().keys())
+
+    def read_rxn_block(self, rhea_id: str) -> str:
+        blocks = self.read_rxn_blocks([rhea_id])
+        if rhea_id not in blocks:
+            raise FileNotFoundError(f"{rhea_id}.rxn is not found in {self.path}")
+        return blocks[rhea_id]
+
+    def read_rxn_blocks(self, rhea_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Reads the rxn blocks of `rhea_ids` in archive order. IDs without a rxn file are omitted.
+        """
+        if self._is_compressed:
+            blocks = self._get_blocks()
+            return {rhea_id: blocks[rhea_id] for rhea_id in rhea_ids if rhea_id in blocks}
+        offsets = self._get_offsets()
+        found = sorted((offsets[rhea_id], rhea_id) for rhea_id in set(rhea_ids) if rhea_id in offsets)
+        result = {}
+        with open(self.path, 'rb') as file:
+            for (offset, size), rhea_id in found:
+                file.seek(offset)
+                result[rhea_id] = fix_rhea_rxn_block(rhea_id, file.read(size).decode('utf-8'))
+        return result
+
+
+def open_rhea_rxn_source(path: Path) -> Union[RheaRxnDirectory, RheaRxnArchive]:
+    """
+    Returns `RheaRxnArchive` if `path` is a tar archive, otherwise `RheaRxnDirectory`.
+    """
+    if path.is_file():
+        return RheaRxnArchive(path)
+    return RheaRxnDirectory(path)
+
+
+def parse_rhea_rxn_block(rxn_block: str, verify: bool = False) -> AllChem.ChemicalReaction:
+    """
+    Parses a Rhea rxn block with molecule titles. Raises the RDKit warnings as exceptions, except the ignored ones.
+    Safe to call from multiple threads.
+    See `reaction_from_rxn_block_with_mol_title` for `verify`.
+    """
+    # NOTE: You can ignore warnings by comment out following code, otherwise reactions with these warning won't be used.
+    capture = RDKitWarningCapture(ignored=[AmbiguousStereoChemistryWarningException, Tagged3DBut2DMarkersFoundException])
+    with capture:
+        return reaction_from_rxn_block_with_mol_title(rxn_block, verify=verify)
@@ -0,0 +1,85 @@
+import warnings
+from collections import defaultdict
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Optional, Iterable, Dict
+
+import pandas as pd
+from rdkit.Chem import AllChem
+
+from enzsrp.data.datasource.original.rhea.original_rhea_datasource import OriginalRheaDatasource
+from enzsrp.data.datasource.original.rhea.rhea_reaction import RheaReaction
+
+CHEBI_PREFIX = 'CHEBI:'
+
+
+def read_rhea_reaction_smiles(path: Path) -> Dict[str, str]:
+    """
+    Reads `rhea-reaction-smiles.tsv` (RHEA_ID and reaction SMILES, without a header).
+    """
+    df = pd.read_csv(path, sep="\t", header=None, names=['RHEA_ID', 'SMILES'], dtype=str)
+    return dict(zip(df['RHEA_ID'].values, df['SMILES'].values))
+
+
+def read_rhea_reaction_participants(path: Path) -> Dict[str, frozenset]:
+    """
+    Reads a TSV of RHEA_ID and CHEBI_ID columns, one row per reaction participant. ChEBI IDs without the `CHEBI:`
+    prefix are prefixed, so that they match the molecule titles of the rxn files.
+    """
+    df = pd.read_csv(path, sep="\t", dtype=str)
+    participants = defaultdict(set)
+    for rhea_id, chebi_id in zip(df['RHEA_ID'].values, df['CHEBI_ID'].values):
+        chebi_id = chebi_id.strip()
+        participants[rhea_id].add(chebi_id if chebi_id.startswith(CHEBI_PREFIX) else CHEBI_PREFIX + chebi_id)
+    return {rhea_id: frozenset(chebi_ids) for rhea_id, chebi_ids in participants.items()}
+
+
+class TabularRheaDatasource(OriginalRheaDatasource):
+    """
+    Rhea reactions read from Rhea's reaction SMILES table and a reaction participant table instead of the rxn files,
+    so that no mol block is parsed. The reaction SMILES in the dataset are Rhea's, not RDKit's canonical ones.
+    The reactions returned by `get_single_reaction` are built from the SMILES and their molecules have no title.
+    Use `get_rhea_reaction_with_cache(...).mol_titles` for the participants. If a directional Rhea ID has no
+    participants in the table, those of its master ID are used. Reactions without any participants are not used.
+    """
+
+    def __init__(self, rhea_reaction_smiles: Path, rhea_reaction_participants: Path, rhea2metacyc: Path,
+                 rhea_directions: Path):
+        super().__init__(rhea_rxn_dir=None, rhea2metacyc=rhea2metacyc, rhea_directions=rhea_directions,
+                         reaction_cache_bytes=None)
+        smiles_by_rhea_id = read_rhea_reaction_smiles(rhea_reaction_smiles)
+        participants = read_rhea_reaction_participants(rhea_reaction_participants)
+        master_id_by_direction_id = {direction_id: master_id for master_id, direction_ids in
+                                     self.direction_ids_by_master_id.items() for direction_id in direction_ids}
+        self.reactions_by_rhea_id: Dict[str, RheaReaction] = {}
+        self.rhea_ids_without_participants = set()
+        for rhea_id, smiles in smiles_by_rhea_id.items():
+            mol_titles = participants.get(rhea_id) or participants.get(master_id_by_direction_id.get(rhea_id))
+            if mol_titles is None:
+                self.rhea_ids_without_participants.add(rhea_id)
+            else:
+                self.reactions_by_rhea_id[rhea_id] = RheaReaction(None, smiles, mol_titles)
+
+    def get_rhea_reaction_with_cache(self, rhea_id: str) -> Optional[RheaReaction]:
+        assert isinstance(rhea_id, str), "rhea_id should be `str` type"
+        result = self.reactions_by_rhea_id.get(rhea_id)
+        if result is None and rhea_id not in self.warned_rhea_ids:
+            if rhea_id in self.rhea_ids_without_participants:
+                warnings.warn(f"Rhea ID: {rhea_id} has no participants in the reaction participant table. "
+                              f"This Rhea ID won't be used.")
+            else:
+                warnings.warn(
+                    f"Rhea ID: {rhea_id} is not found in the reaction SMILES table. This Rhea ID won't be used.")
+            self.warned_rhea_ids.add(rhea_id)
+        return result
+
+    def get_single_reaction(self, rhea_id: str) -> Optional[AllChem.ChemicalReaction]:
+        result = self.get_rhea_reaction_with_cache(rhea_id)
+        return result.reaction if result is not None else None
+
+    def prefetch_reactions(self, rhea_ids: Iterable[str], executor: Executor):
+        # NOTE: All reactions are loaded on construction.
+        pass
+
+    def release_prefetched_reactions(self):
+        pass
@@ -1,25 +1,121 @@
+import hashlib
 import json
+import mmap
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, Iterator, Union
+
+import ijson
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import is_jsonl
+from enzsrp.utils.atomic_file import atomic_write_path
+from enzsrp.utils.compressed_file import open_binary
+
+
+class PackedSequences(Mapping):
+    """
+    Read-only mapping from isoform ID to sequence. Identical sequences are stored once in a single buffer, and each
+    isoform ID keeps only its (offset, length) in the buffer. The buffer is either in memory or memory-mapped from a
+    sidecar file.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], ranges: Dict[str, Tuple[int, int]]):
+        self._buffer = buffer
+        self._ranges = ranges
+
+    def __getitem__(self, isoform_id: str) -> str:
+        offset, length = self._ranges[isoform_id]
+        return self._buffer[offset:offset + length].decode('ascii')
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ranges)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    @property
+    def n_buffer_bytes(self) -> int:
+        return len(self._buffer)
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+class _PackedSequencesBuilder:
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # NOTE: Keyed by digest so that the sequences are not kept twice while loading.
+        self._range_by_digest: Dict[bytes, Tuple[int, int]] = {}
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, isoform_id: str, sequence: str):
+        data = sequence.encode('ascii')
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        seq_range = self._range_by_digest.get(digest)
+        if seq_range is None:
+            seq_range = (len(self._buffer), len(data))
+            self._buffer += data
+            self._range_by_digest[digest] = seq_range
+        self.ranges[isoform_id] = seq_range
+
+    def build(self, sidecar_path: Optional[Path] = None) -> PackedSequences:
+        if sidecar_path is None or len(self._buffer) == 0:
+            return PackedSequences(bytes(self._buffer), self.ranges)
+        with atomic_write_path(sidecar_path) as tmp_path, open(tmp_path, 'wb') as file:
+            file.write(self._buffer)
+        with open(sidecar_path, 'rb') as file:
+            return PackedSequences(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), self.ranges)
+
+
+# NOTE: Multiple IDs are linked to each entry's isoform, so we remap them to single active id.
+# NOTE: If multiple active IDs exist for a single key, the original key is used for consistency.
+def _active_isoform_id(key_isoform_id: str, to: dict) -> str:
+    cross_refs = to["uniParcCrossReferences"]
+    active_cross_refs = [ref for ref in cross_refs if ref["active"] == True]
+    uniprot_swiss = [ref for ref in active_cross_refs if
+                     ref["database"] == "UniProtKB/Swiss-Prot protein isoforms"]
+    # NOTE: if non-swiss entries exists, it might result in multiple hits.
+    if len(uniprot_swiss) > 1:
+        uniprot_swiss = [u for u in uniprot_swiss if u['id'] == key_isoform_id]
+    return uniprot_swiss[0]["id"]
+
+
+def _iter_mapping_results(path: Path) -> Iterator[dict]:
+    with open_binary(path) as file:
+        if is_jsonl(path):
+            # NOTE: Written by the streaming download, one result per line.
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from ijson.items(file, 'results.item')
 
 
 class IsoformIdMappingDataSource:
 
-    def __init__(self, path: Path):
-        with open(path, 'r') as file:
-            self.data = json.load(file)
-            assert len([item['from'] for item in self.data["results"]]) == len(set(
-                [item['from'] for item in self.data["results"]])), "'from' is not unique"
-            self.isoform_id_to_sequence = {item["from"]: item["to"]["sequence"]["value"] for item in
-                                           self.data["results"]}
-            self.isoform_id_to_active_isoform_id = self._construct_isoform_id_map()
+    def __init__(self, path: Path, sequence_sidecar_path: Optional[Path] = None):
+        """
+        Streams the UniParc ID mapping result and keeps only the isoform ID to sequence and isoform ID to active
+        isoform ID maps. The result is read as JSON lines if `path` has a `.jsonl` suffix.
+        If `sequence_sidecar_path` is given, the sequences are written there and memory-mapped.
+        """
+        sequences = _PackedSequencesBuilder()
+        self.isoform_id_to_active_isoform_id: Dict[str, str] = {}
+        for item in _iter_mapping_results(path):
+            key_isoform_id = item["from"]
+            assert key_isoform_id not in self.isoform_id_to_active_isoform_id, "'from' is not unique"
+            sequences.add(key_isoform_id, item["to"]["sequence"]["value"])
+            self.isoform_id_to_active_isoform_id[key_isoform_id] = _active_isoform_id(key_isoform_id, item["to"])
+        self.isoform_id_to_sequence = sequences.build(sequence_sidecar_path)
 
     def map_isoform_to_seq(self, isoform_id: str) -> Optional[str]:
         return self.isoform_id_to_sequence.get(isoform_id, None)
 
     def bulk_map_isoform_id_to_seq(self, isoform_ids: List[str]) -> Dict:
         mapped = {isoform_id: self.isoform_id_to_sequence.get(isoform_id, None) for isoform_id in isoform_ids}
-        mapped = {isoform_id: seq for (isoform_id, seq) in mapped.values() if seq is not None}
+        mapped = {isoform_id: seq for (isoform_id, seq) in mapped.items() if seq is not None}
         return mapped
 
     def map_isoform_id_to_active_isoform_id(self, isoform_id: str) -> Optional[str]:
@@ -29,19 +125,5 @@ class IsoformIdMappingDataSource:
         mapped = {isoform_id: self.isoform_id_to_active_isoform_id.get(isoform_id, None) for isoform_id in isoform_ids}
         return {isoform_id: active_id for isoform_id, active_id in mapped.items() if active_id is not None}
 
-    # NOTE: Multiple IDs are linked to each entry's isoform, so we remap them to single active id.
-    # NOTE: If multiple active IDs exist for a single key, the original key is used for consistency.
-    def _construct_isoform_id_map(self) -> dict[str, str]:
-        uniprot_id_map = {}
-        for result in self.data["results"]:
-            key_isoform_id = result["from"]
-            to = [item["to"] for item in self.data["results"] if item["from"] == key_isoform_id]
-            cross_refs = to[0]["uniParcCrossReferences"]
-            active_cross_refs = [ref for ref in cross_refs if ref["active"] == True]
-            uniprot_swiss = [ref for ref in active_cross_refs if
-                             ref["database"] == "UniProtKB/Swiss-Prot protein isoforms"]
-            # NOTE: if non-swiss entries exists, it might result in multiple hits.
-            if len(uniprot_swiss) > 1:
-                uniprot_swiss = [u for u in uniprot_swiss if u['id'] == key_isoform_id]
-            uniprot_id_map[key_isoform_id] = uniprot_swiss[0]["id"]
-        return uniprot_id_map
+    def close(self):
+        self.isoform_id_to_sequence.close()
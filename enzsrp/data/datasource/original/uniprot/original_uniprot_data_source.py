@@ -1,31 +1,149 @@
+import json
+import random
+import warnings
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Optional, Iterable, List
 
 import ijson
 from tqdm import tqdm
 
-from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity
+from enzsrp.data.datasource.original.uniprot.sharded_uniprot_reader import stream_entries_in_parallel, \
+    stream_jsonl_entries_in_parallel
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity, EntryComponent
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_consumer import UniprotEntryConsumer, IsoformIdCollector, \
+    fan_out
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_index import UniprotEntryIndex, default_index_path
+from enzsrp.data.datasource.original.uniprot.uniprot_snapshot_cache import UniprotSnapshotCache
+from enzsrp.utils.compressed_file import open_binary, detect_compression
+
+
+def is_jsonl(path: Path) -> bool:
+    return '.jsonl' in path.suffixes
 
 
 class OriginalUniprotDataSource:
 
-    def __init__(self, uniprot_entries_with_catalytic_activity_json: Path):
+    def __init__(self, uniprot_entries_with_catalytic_activity_json: Path, n_workers: int = 1,
+                 snapshot_dir: Optional[Path] = None, projection: Optional[Iterable[EntryComponent]] = None,
+                 entry_filter: Optional[UniprotEntryFilter] = None, index_path: Optional[Path] = None):
+        """
+        `projection` selects the entry components built while streaming. The others are built on first access.
+        If None, all components are built.
+        `entry_filter` is applied to the raw entry dicts, so rejected entries are never built.
+        The entries JSON may be gzip or zstd compressed. Files with a `.jsonl` suffix (e.g. `entries.jsonl.gz`) are read
+        as JSON lines, one entry per line.
+        `index_path` is the entry index used for random access. If None, the index next to the entries JSON is used.
+        """
         self._uniprot_json_path = uniprot_entries_with_catalytic_activity_json
+        self._n_workers = n_workers
+        self._is_jsonl = is_jsonl(uniprot_entries_with_catalytic_activity_json)
+        self._projection = frozenset(projection) if projection is not None else None
+        self._entry_filter = entry_filter
+        self._index_path = index_path if index_path is not None else default_index_path(
+            uniprot_entries_with_catalytic_activity_json)
+        self._index: Optional[UniprotEntryIndex] = None
+        self._snapshot = UniprotSnapshotCache(snapshot_dir, uniprot_entries_with_catalytic_activity_json) \
+            if snapshot_dir is not None else None
+
+    def _stream_entry_dicts(self) -> Generator[dict, None, None]:
+        with open_binary(self._uniprot_json_path) as file:
+            if self._is_jsonl:
+                entries = (json.loads(line) for line in file if line.strip())
+            else:
+                entries = ijson.items(file, 'results.item')
+            for entry in tqdm(entries, desc='Processing UniProt entries (250K+ entries)', unit=' entries'):
+                yield entry
+
+    def _ensure_snapshot(self) -> UniprotSnapshotCache:
+        if not self._snapshot.exists():
+            self._snapshot.write(EntryWithCatalyticActivity.from_dict(data) for data in self._stream_entry_dicts())
+        return self._snapshot
+
+    def _build_entries(self, entry_dicts: Iterable[dict]) -> Generator[EntryWithCatalyticActivity, None, None]:
+        for entry in entry_dicts:
+            if self._entry_filter is None or self._entry_filter.matches(entry):
+                yield EntryWithCatalyticActivity.from_dict(entry, self._projection)
+
+    def stream_entries_with_catalytic_activity(self, executor: Optional[Executor] = None) \
+            -> Generator[EntryWithCatalyticActivity, None, None]:
+        """
+        If `executor` is given, the shards are parsed with it instead of a new pool of `n_workers` processes.
+        """
+        if self._snapshot is not None:
+            yield from self._ensure_snapshot().stream_entries(self._projection, self._entry_filter)
+            return
+        if self._n_workers > 1 and detect_compression(self._uniprot_json_path) is not None:
+            warnings.warn("Sharding requires an uncompressed file. Entries are parsed sequentially.")
+        elif self._n_workers > 1 and self._is_jsonl:
+            yield from stream_jsonl_entries_in_parallel(self._uniprot_json_path, self._n_workers,
+                                                        projection=self._projection, entry_filter=self._entry_filter,
+                                                        executor=executor)
+            return
+        elif self._n_workers > 1:
+            yield from stream_entries_in_parallel(self._uniprot_json_path, self._n_workers,
+                                                  projection=self._projection, entry_filter=self._entry_filter,
+                                                  executor=executor)
+            return
+        yield from self._build_entries(self._stream_entry_dicts())
+
+    def _get_index(self) -> UniprotEntryIndex:
+        if self._index is None:
+            if not self._index_path.exists():
+                raise FileNotFoundError(f"The entry index is not found: {self._index_path}. "
+                                        f"Please run `build-uniprot-index` first.")
+            index = UniprotEntryIndex.load(self._index_path, self._uniprot_json_path)
+            if index is None:
+                raise ValueError(f"The entry index does not match {self._uniprot_json_path}: {self._index_path}. "
+                                 f"Please run `build-uniprot-index` again.")
+            self._index = index
+        return self._index
+
+    def get_entries_by_accessions(self, accessions: Iterable[str]) -> List[EntryWithCatalyticActivity]:
+        """
+        Reads only the requested entries using the entry index. The entry filter is not applied.
+        """
+        index = self._get_index()
+        ranges = [index.get_range(accession) for accession in accessions]
+        return [EntryWithCatalyticActivity.from_dict(data, self._projection) for data in
+                index.read_entry_dicts(self._uniprot_json_path, ranges)]
+
+    def sample_entries(self, n: int, seed: int = 0) -> List[EntryWithCatalyticActivity]:
+        """
+        Returns `n` randomly chosen entries in file order. The same seed always gives the same entries for the same
+        entries JSON. If the entry filter is set, the entries are chosen from the matching entries only.
+        """
+        index = self._get_index()
+        rng = random.Random(seed)
+        if self._entry_filter is None:
+            positions = sorted(rng.sample(range(len(index)), min(n, len(index))))
+            entry_dicts = index.read_entry_dicts(self._uniprot_json_path, [index.entries[i][1:] for i in positions])
+            return [EntryWithCatalyticActivity.from_dict(data, self._projection) for data in entry_dicts]
+        candidates = [i for i, (accession, _, _) in enumerate(index.entries) if
+                      self._entry_filter.accessions is None or accession in self._entry_filter.accessions]
+        # NOTE: The candidates are read in random order, `n` at a time, until `n` of them match the filter.
+        rng.shuffle(candidates)
+        matched = []
+        for i in range(0, len(candidates), max(n, 1)):
+            if len(matched) >= n:
+                break
+            chunk = candidates[i:i + max(n, 1)]
+            entry_dicts = index.read_entry_dicts(self._uniprot_json_path, [index.entries[j][1:] for j in chunk])
+            matched.extend((j, data) for j, data in zip(chunk, entry_dicts) if self._entry_filter.matches(data))
+        return [EntryWithCatalyticActivity.from_dict(data, self._projection) for _, data in
+                sorted(matched[:n], key=lambda x: x[0])]
 
-    def stream_entries_with_catalytic_activity(self) -> Generator[EntryWithCatalyticActivity, None, None]:
-        with open(self._uniprot_json_path, 'rb') as file:
-            for entry in tqdm(ijson.items(file, 'results.item'),
-                              desc='Processing UniProt entries (250K+ entries)', unit=' entries'):
-                yield EntryWithCatalyticActivity.from_dict(entry)
+    def stream_to_consumers(self, consumers: Iterable[UniprotEntryConsumer]):
+        """
+        Reads the entries once and passes each of them to all the consumers.
+        """
+        fan_out(self.stream_entries_with_catalytic_activity(), consumers)
 
     def get_all_isoform_ids(self):
-        result = set()
-        for entry in self.stream_entries_with_catalytic_activity():
-            for activity in entry.catalytic_activities:
-                if activity.molecule is not None:
-                    if entry.alternative_products_data is not None and len(
-                            entry.alternative_products_data.isoforms) >= 1:
-                        isoform_ids = [isoform_id for isoform in entry.alternative_products_data.isoforms for isoform_id
-                                       in isoform.isoformIds]
-                        result.update(isoform_ids)
-        return result
+        # NOTE: The snapshot column covers all entries, so it cannot be used when entries are filtered.
+        if self._snapshot is not None and self._entry_filter is None:
+            return self._ensure_snapshot().read_isoform_ids()
+        collector = IsoformIdCollector()
+        self.stream_to_consumers([collector])
+        return collector.isoform_ids
@@ -0,0 +1,155 @@
+import json
+import mmap
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Executor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Generator, List, Tuple, Optional, FrozenSet, Callable
+
+from tqdm import tqdm
+
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity, EntryComponent
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
+
+# NOTE: Every entry object in the UniProt REST output starts with the "entryType" key. Double quotes inside JSON strings
+# are always escaped, so this pattern can only match at the structural level, i.e. at the start of an entry.
+ENTRY_START_PATTERN = re.compile(rb'\{\s*"entryType"\s*:')
+
+DEFAULT_SHARD_SIZE = 500
+DEFAULT_LINE_SHARD_BYTES = 8 << 20
+
+
+def find_entry_offsets(path: Path) -> List[int]:
+    """
+    Returns the byte offset of each entry object in the `results` array, in file order.
+    """
+    with open(path, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [match.start() for match in ENTRY_START_PATTERN.finditer(mm)]
+
+
+def split_into_shards(offsets: List[int], file_size: int, shard_size: int) -> List[Tuple[List[int], int]]:
+    """
+    Groups entry offsets into shards of `shard_size` entries. Each shard is (entry offsets, end byte offset).
+    """
+    shards = []
+    for i in range(0, len(offsets), shard_size):
+        shard_offsets = offsets[i:i + shard_size]
+        end = offsets[i + shard_size] if i + shard_size < len(offsets) else file_size
+        shards.append((shard_offsets, end))
+    return shards
+
+
+def decode_entries_in_range(path: Path, offsets: List[int], end: int) -> List[dict]:
+    """
+    Decodes the entry objects starting at `offsets`. Bytes after each object (',', ']}', etc.) are ignored.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'rb') as file:
+        file.seek(offsets[0])
+        chunk = file.read(end - offsets[0])
+    bounds = [offset - offsets[0] for offset in offsets] + [len(chunk)]
+    result = []
+    for start, stop in zip(bounds, bounds[1:]):
+        data, _ = decoder.raw_decode(chunk[start:stop].decode('utf-8'))
+        result.append(data)
+    return result
+
+
+def split_lines_into_ranges(path: Path, shard_bytes: int = DEFAULT_LINE_SHARD_BYTES) -> List[Tuple[int, int]]:
+    """
+    Splits a JSON-lines file into byte ranges of about `shard_bytes`. Each range ends right after a newline.
+    """
+    file_size = path.stat().st_size
+    ranges = []
+    with open(path, 'rb') as file:
+        start = 0
+        while start < file_size:
+            if start + shard_bytes >= file_size:
+                end = file_size
+            else:
+                file.seek(start + shard_bytes)
+                file.readline()
+                end = file.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def decode_lines_in_range(path: Path, start: int, end: int) -> List[dict]:
+    with open(path, 'rb') as file:
+        file.seek(start)
+        chunk = file.read(end - start)
+    return [json.loads(line) for line in chunk.splitlines() if line.strip()]
+
+
+def _build_entries(entry_dicts: List[dict], projection: Optional[FrozenSet[EntryComponent]],
+                   entry_filter: Optional[UniprotEntryFilter]) -> Tuple[int, List[EntryWithCatalyticActivity]]:
+    return len(entry_dicts), [EntryWithCatalyticActivity.from_dict(data, projection) for data in entry_dicts if
+                              entry_filter is None or entry_filter.matches(data)]
+
+
+def _parse_shard(path: Path, offsets: List[int], end: int, projection: Optional[FrozenSet[EntryComponent]],
+                 entry_filter: Optional[UniprotEntryFilter]) -> Tuple[int, List[EntryWithCatalyticActivity]]:
+    return _build_entries(decode_entries_in_range(path, offsets, end), projection, entry_filter)
+
+
+def _parse_line_range(path: Path, start: int, end: int, projection: Optional[FrozenSet[EntryComponent]],
+                      entry_filter: Optional[UniprotEntryFilter]) -> Tuple[int, List[EntryWithCatalyticActivity]]:
+    return _build_entries(decode_lines_in_range(path, start, end), projection, entry_filter)
+
+
+def _stream_shard_results(parse: Callable, shards: List[tuple], n_workers: int, total: Optional[int] = None,
+                          executor: Optional[Executor] = None) -> Generator[EntryWithCatalyticActivity, None, None]:
+    # NOTE: The number of in-flight shards is bounded so that parsed entries do not pile up when the consumer is slow.
+    max_in_flight = n_workers * 2
+    # NOTE: A given executor is shared with the caller, so it is not shut down here.
+    with nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=n_workers) as executor, \
+            tqdm(total=total, desc='Processing UniProt entries (250K+ entries)', unit=' entries') as progress:
+        pending = deque()
+        shard_iter = iter(shards)
+        for shard in shard_iter:
+            pending.append(executor.submit(parse, *shard))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            n_decoded, entries = pending.popleft().result()
+            next_shard = next(shard_iter, None)
+            if next_shard is not None:
+                pending.append(executor.submit(parse, *next_shard))
+            progress.update(n_decoded)
+            yield from entries
+
+
+def stream_entries_in_parallel(path: Path, n_workers: int, shard_size: int = DEFAULT_SHARD_SIZE,
+                               projection: Optional[FrozenSet[EntryComponent]] = None,
+                               entry_filter: Optional[UniprotEntryFilter] = None,
+                               executor: Optional[Executor] = None) \
+        -> Generator[EntryWithCatalyticActivity, None, None]:
+    """
+    Parses the UniProt entries JSON with a process pool. Each worker decodes and builds the entries of one byte range,
+    and entries are yielded in file order. Entries rejected by `entry_filter` are dropped in the workers.
+    If `executor` is given, it is used instead of a new pool of `n_workers` processes.
+    """
+    offsets = find_entry_offsets(path)
+    if len(offsets) == 0:
+        return
+    shards = [(path, shard_offsets, end, projection, entry_filter) for shard_offsets, end in
+              split_into_shards(offsets, path.stat().st_size, shard_size)]
+    yield from _stream_shard_results(_parse_shard, shards, n_workers, total=len(offsets), executor=executor)
+
+
+def stream_jsonl_entries_in_parallel(path: Path, n_workers: int, shard_bytes: int = DEFAULT_LINE_SHARD_BYTES,
+                                     projection: Optional[FrozenSet[EntryComponent]] = None,
+                                     entry_filter: Optional[UniprotEntryFilter] = None,
+                                     executor: Optional[Executor] = None) \
+        -> Generator[EntryWithCatalyticActivity, None, None]:
+    """
+    Same as `stream_entries_in_parallel` for a JSON-lines file. Shards are split at line boundaries, so no scan of the
+    file is needed in advance.
+    """
+    shards = [(path, start, end, projection, entry_filter) for start, end in split_lines_into_ranges(path, shard_bytes)]
+    yield from _stream_shard_results(_parse_line_range, shards, n_workers, executor=executor)
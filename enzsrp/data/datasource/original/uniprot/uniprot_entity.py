@@ -3,13 +3,38 @@ import warnings
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Iterable, Callable, Any, Tuple, FrozenSet
+from weakref import WeakValueDictionary
 
 from enzsrp.domain.entity.evidence_and_clusion_ontology import ECO
 from enzsrp.domain.entity.reaction_direciton import ReactionDirection
 
+# NOTE: Flyweight pools. Evidences, IDs and locations are immutable and mostly exact repeats across entries, so
+# identical values share one instance. Unpickling (e.g. entries returned by worker processes) goes through the pools too.
+# The pools hold weak references, so an instance is freed once no entry refers to it any more.
+_EVIDENCE_POOL: "WeakValueDictionary[Tuple[str, Optional[str], Optional[str]], Evidence]" = \
+    WeakValueDictionary()
+_ID_POOL: "WeakValueDictionary[Tuple[type, str], Union[RheaID, RheaCompID, ChEBIID]]" = WeakValueDictionary()
+_LOCATION_POOL: "WeakValueDictionary[Tuple[int, str, int, str], Location]" = WeakValueDictionary()
 
-@dataclass(frozen=True)
+
+def intern_evidence(evidence_code: str, evd_id: Optional[str], source: Optional[str]) -> "Evidence":
+    key = (evidence_code, evd_id, source)
+    evidence = _EVIDENCE_POOL.get(key)
+    if evidence is None:
+        evidence = _EVIDENCE_POOL[key] = Evidence(ECO.get_eco_enum(evidence_code), evd_id, source)
+    return evidence
+
+
+def _intern_id(cls, text: str):
+    key = (cls, text)
+    value = _ID_POOL.get(key)
+    if value is None:
+        value = _ID_POOL[key] = cls(text)
+    return value
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Evidence:
     type: ECO
     evd_id: Optional[str]
@@ -17,10 +42,7 @@ class Evidence:
 
     @classmethod
     def from_dict(cls, data: dict):
-        eco_type = ECO.get_eco_enum(data["evidenceCode"])
-        evd_id = data.get("id", None)
-        source = data.get("source", None)
-        return cls(eco_type, evd_id, source)
+        return intern_evidence(data["evidenceCode"], data.get("id", None), data.get("source", None))
 
     def to_dict(self) -> dict:
         return {
@@ -29,72 +51,86 @@ class Evidence:
             "source": self.source if self.source else None,
         }
 
+    def __reduce__(self):
+        return intern_evidence, (self.type.value, self.evd_id, self.source)
 
-@dataclass(frozen=True)
+
+_RHEA_ID_PATTERN = re.compile(r'^RHEA:(\d+)$')
+_RHEA_COMP_ID_PATTERN = re.compile(r'^RHEA-COMP:(\d+)$')
+_CHEBI_ID_PATTERN = re.compile(r'^CHEBI:(\d+)$')
+
+
+# NOTE: The numeric part of each ID is extracted once in `__post_init__`, as it is read for every output row.
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class RheaID:
     id: str
+    id_intstr: str = field(init=False, repr=False, compare=False)
     pattern = r'^RHEA:\d+$'
 
     def __post_init__(self):
-        if not re.match(self.pattern, self.id):
+        match = _RHEA_ID_PATTERN.match(self.id)
+        if not match:
             raise ValueError("Invalid Rhea ID format.")
+        object.__setattr__(self, 'id_intstr', match.group(1))
 
-    @property
-    def id_intstr(self) -> str:
-        match = re.search(r'^RHEA:(\d+)$', self.id)
-        if match:
-            return match.group(1)
-        else:
-            raise ValueError("Rhea id has invalid format")
+    @classmethod
+    def from_string(cls, text: str):
+        return _intern_id(cls, text)
 
+    def __reduce__(self):
+        return _intern_id, (type(self), self.id)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class RheaCompID:
     id: str
+    id_intstr: str = field(init=False, repr=False, compare=False)
     pattern = r'^RHEA-COMP:\d+$'
 
     def __post_init__(self):
-        if not re.match(self.pattern, self.id):
+        match = _RHEA_COMP_ID_PATTERN.match(self.id)
+        if not match:
             raise ValueError("Invalid Rhea ID format.")
+        object.__setattr__(self, 'id_intstr', match.group(1))
 
-    @property
-    def id_intstr(self) -> str:
-        match = re.search(r'^RHEA-COMP:(\d+)$', self.id)
-        if match:
-            return match.group(1)
-        else:
-            raise ValueError("Rhea id has invalid format")
+    @classmethod
+    def from_string(cls, text: str):
+        return _intern_id(cls, text)
+
+    def __reduce__(self):
+        return _intern_id, (type(self), self.id)
 
 
 def map_to_rhea_id_or_rhea_comp_id(text: str) -> Union[RheaID, RheaCompID]:
     try:
-        return RheaID(text)
+        return RheaID.from_string(text)
     except ValueError as e:
         try:
-            return RheaCompID(text)
+            return RheaCompID.from_string(text)
         except ValueError as e2:
             raise ValueError(str(e) + str(e2))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class ChEBIID:
     """
     id should be something like this -> ChEBI:CHEBI:57540
     """
     id: str
+    short_id: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        pattern = r'^CHEBI:\d+$'
-        if not re.match(pattern, self.id):
+        match = _CHEBI_ID_PATTERN.match(self.id)
+        if not match:
             raise ValueError(f"Invalid ChEBI ID format. {self.id}")
+        object.__setattr__(self, 'short_id', match.group(1))
 
-    @property
-    def short_id(self) -> str:
-        match = re.search(r'^CHEBI:(\d+)$', self.id)
-        if match:
-            return match.group(1)
-        else:
-            raise ValueError("ChEBI id has invalid format")
+    @classmethod
+    def from_string(cls, text: str) -> "ChEBIID":
+        return _intern_id(cls, text)
+
+    def __reduce__(self):
+        return _intern_id, (ChEBIID, self.id)
 
 
 # Parent class
@@ -127,7 +163,7 @@ class ChEBIReference(CrossReference):
     @classmethod
     def from_dict(cls, data: dict) -> "ChEBIReference":
         assert data["database"] == cls.database, data
-        return cls(cls.database, db_id=ChEBIID(data["id"]))
+        return cls(cls.database, db_id=ChEBIID.from_string(data["id"]))
 
 
 @dataclass(frozen=True)
@@ -174,7 +210,7 @@ class Reaction:
 
     @property
     def has_exp_evidence(self) -> bool:
-        return any([evidence.type.value == ECO.EXPERIMENTAL.value for evidence in self.evidences])
+        return any(evidence.type is ECO.EXPERIMENTAL for evidence in self.evidences)
 
 
 @dataclass(frozen=True)
@@ -206,7 +242,7 @@ class PhysiologicalReaction:
 
     @property
     def has_exp_evidence(self) -> bool:
-        return any([evidence.type.value == ECO.EXPERIMENTAL.value for evidence in self.evidences])
+        return any(evidence.type is ECO.EXPERIMENTAL for evidence in self.evidences)
 
 
 @dataclass(frozen=True)
@@ -251,13 +287,29 @@ class LocationModifier(Enum):
 
     @classmethod
     def from_string(cls, text):
-        for item in cls:
-            if item.value == text:
-                return item
-        raise ValueError(f"Invalid string: {text}")
+        item = _LOCATION_MODIFIER_BY_VALUE.get(text)
+        if item is None:
+            raise ValueError(f"Invalid string: {text}")
+        return item
 
 
-@dataclass(frozen=True)
+_LOCATION_MODIFIER_BY_VALUE = {item.value: item for item in LocationModifier}
+
+
+def intern_location(start_value: int, start_modifier: str, end_value: int, end_modifier: str) -> "Location":
+    key = (start_value, start_modifier, end_value, end_modifier)
+    location = _LOCATION_POOL.get(key)
+    if location is None:
+        location = _LOCATION_POOL[key] = Location(
+            start_value=start_value,
+            start_modifier=LocationModifier.from_string(start_modifier),
+            end_value=end_value,
+            end_modifier=LocationModifier.from_string(end_modifier),
+        )
+    return location
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Location:
     start_value: int  # starts form '1'
     start_modifier: LocationModifier
@@ -266,12 +318,11 @@ class Location:
 
     @classmethod
     def from_dict(cls, data: dict) -> "Location":
-        return cls(
-            start_value=data["start"]["value"],
-            start_modifier=LocationModifier.from_string(data["start"]["modifier"]),
-            end_value=data["end"]["value"],
-            end_modifier=LocationModifier.from_string(data["end"]["modifier"]),
-        )
+        return intern_location(data["start"]["value"], data["start"]["modifier"], data["end"]["value"],
+                               data["end"]["modifier"])
+
+    def __reduce__(self):
+        return intern_location, (self.start_value, self.start_modifier.value, self.end_value, self.end_modifier.value)
 
     @property
     def string_notation(self) -> str:
@@ -299,7 +350,7 @@ class Ligand:
         # The format of Ligand ID is like: ChEBI:CHEBI:nnnnn
         return cls(
             name=data["name"],
-            ligand_id=ChEBIID(data.get("id").split(":", 1)[1]) if data.get("id") else None,
+            ligand_id=ChEBIID.from_string(data.get("id").split(":", 1)[1]) if data.get("id") else None,
             label=data.get("label"),
             note=data.get("note"))
 
@@ -357,7 +408,7 @@ class BindingSite:
 
     @property
     def has_exp_evidence(self) -> bool:
-        return any([evidence.type.value == ECO.EXPERIMENTAL.value for evidence in self.evidences])
+        return any(evidence.type is ECO.EXPERIMENTAL for evidence in self.evidences)
 
 
 @dataclass(frozen=True)
@@ -370,6 +421,7 @@ class ActiveSite:
 
     @classmethod
     def from_dict(cls, data: dict) -> "ActiveSite":
+        data = dict(data)  # NOTE: the raw dict is shared with `Feature.from_dict`, so it must not be modified
         location = Location.from_dict(data.pop("location"))
         feature_cross_reference = [ChEBIReference.from_dict(ref) for ref in data.pop("featureCrossReferences", [])]
         evidences = [Evidence.from_dict(ref) for ref in data.pop("evidences", [])]
@@ -382,7 +434,7 @@ class ActiveSite:
 
     @property
     def has_exp_evidence(self) -> bool:
-        return any([evidence.type.value == ECO.EXPERIMENTAL.value for evidence in self.evidences])
+        return any(evidence.type is ECO.EXPERIMENTAL for evidence in self.evidences)
 
 
 @dataclass(frozen=True)
@@ -395,6 +447,7 @@ class Site:
 
     @classmethod
     def from_dict(cls, data: dict) -> "Site":
+        data = dict(data)  # NOTE: the raw dict is shared with `Feature.from_dict`, so it must not be modified
         location = Location.from_dict(data.pop("location"))
         feature_cross_reference = [ChEBIReference.from_dict(ref) for ref in data.pop("featureCrossReferences", [])]
         evidences = [Evidence.from_dict(ref) for ref in data.pop("evidences", [])]
@@ -407,7 +460,7 @@ class Site:
 
     @property
     def has_exp_evidence(self) -> bool:
-        return any([evidence.type.value == ECO.EXPERIMENTAL.value for evidence in self.evidences])
+        return any(evidence.type is ECO.EXPERIMENTAL for evidence in self.evidences)
 
 
 @dataclass(frozen=True)
@@ -509,6 +562,85 @@ class AlternativeProductsData:
         return hit_isoforms[0] if len(hit_isoforms) == 1 else None
 
 
+class EntryComponent(Enum):
+    """
+    Sub-objects of `EntryWithCatalyticActivity` that can be selected by a projection.
+    """
+    BINDING_SITES = "binding_sites"
+    ACTIVE_SITES = "active_sites"
+    SITES = "sites"
+    FEATURES = "features"
+    COFACTOR_DATA_LIST = "cofactor_data_list"
+    ALTERNATIVE_PRODUCTS_DATA = "alternative_products_data"
+
+
+ALL_ENTRY_COMPONENTS = frozenset(EntryComponent)
+
+
+class _Deferred:
+    """
+    Raw data of an entry component that is built on first access.
+    """
+    __slots__ = ("build", "data")
+
+    def __init__(self, build: Callable[[Any], Any], data):
+        self.build = build
+        self.data = data
+
+
+class _LazyComponent:
+    """
+    Data descriptor for the fields of `EntryWithCatalyticActivity` that may hold a `_Deferred` value.
+    """
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            # NOTE: Raising AttributeError makes dataclass treat the field as one without a default value.
+            raise AttributeError(self._name)
+        value = instance.__dict__[self._name]
+        if isinstance(value, _Deferred):
+            value = value.build(value.data)
+            instance.__dict__[self._name] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self._name] = value
+
+
+def build_component(kind: EntryComponent, projection: FrozenSet[EntryComponent], build: Callable[[Any], Any], data):
+    """
+    Returns `build(data)` if `kind` is selected by `projection`. Otherwise, it is built on first access.
+    """
+    return build(data) if kind in projection else _Deferred(build, data)
+
+
+def _build_binding_sites(raws: List[dict]) -> List[BindingSite]:
+    return [BindingSite.from_dict(site) for site in raws]
+
+
+def _build_active_sites(raws: List[dict]) -> List[ActiveSite]:
+    return [ActiveSite.from_dict(site) for site in raws]
+
+
+def _build_sites(raws: List[dict]) -> List[Site]:
+    return [Site.from_dict(site) for site in raws]
+
+
+def _build_features(raws: List[dict]) -> List[Feature]:
+    return [Feature.from_dict(feature) for feature in raws]
+
+
+def _build_cofactor_data_list(raws: List[dict]) -> List[CofactorData]:
+    return [CofactorData.from_dict(comment) for comment in raws]
+
+
+def _build_alternative_products_data(raws: List[dict]) -> Optional[AlternativeProductsData]:
+    return AlternativeProductsData.from_dict(raws[0]) if raws else None
+
+
 @dataclass
 class EntryWithCatalyticActivity:
     primary_accession: str
@@ -516,43 +648,61 @@ class EntryWithCatalyticActivity:
     uniprot_kb_id: str
     protein_existence: str
     catalytic_activities: List[CatalyticActivity]
-    binding_sites: List[BindingSite]
-    active_sites: List[ActiveSite]
-    sites: List[Site]
-    features: List[Feature]
+    # NOTE: Components not selected by the projection of `from_dict` are built on first access.
+    binding_sites: List[BindingSite] = _LazyComponent()
+    active_sites: List[ActiveSite] = _LazyComponent()
+    sites: List[Site] = _LazyComponent()
+    features: List[Feature] = _LazyComponent()
     sequence: str
     last_sequence_update_date: datetime
-    cofactor_data_list: List[CofactorData]
-    alternative_products_data: Optional[AlternativeProductsData]
+    cofactor_data_list: List[CofactorData] = _LazyComponent()
+    alternative_products_data: Optional[AlternativeProductsData] = _LazyComponent()
 
     def __post_init__(self):
         pass
 
     @classmethod
-    def from_dict(cls, data: dict):
-        activities = [comment for comment in data["comments"] if comment["commentType"] == "CATALYTIC ACTIVITY"]
+    def from_dict(cls, data: dict, projection: Optional[Iterable[EntryComponent]] = None):
+        """
+        `projection` selects the components built here. If None, all components are built.
+        """
+        projection = ALL_ENTRY_COMPONENTS if projection is None else frozenset(projection)
+
+        def component(kind: EntryComponent, build: Callable[[List[dict]], Any], raws: List[dict]):
+            return build_component(kind, projection, build, raws)
+
+        # NOTE: comments and features are dispatched by type in a single pass each
+        activities, cofactor_data, alternative = [], [], []
+        comment_buckets = {"CATALYTIC ACTIVITY": activities, "COFACTOR": cofactor_data,
+                           "ALTERNATIVE PRODUCTS": alternative}
+        for comment in data["comments"]:
+            bucket = comment_buckets.get(comment["commentType"])
+            if bucket is not None:
+                bucket.append(comment)
+
+        features = data["features"]
+        binding_sites, active_sites, sites = [], [], []
+        feature_buckets = {"Binding site": binding_sites, "Active site": active_sites, "Site": sites}
+        features_by_description = {}
+        for feature in features:
+            bucket = feature_buckets.get(feature["type"])
+            if bucket is not None:
+                bucket.append(feature)
+            features_by_description.setdefault(feature["description"], []).append(feature)
+
         activities = [CatalyticActivity.from_dict(activity) for activity in activities]
         assert len(activities) != 0
 
-        binding_sites = [feature for feature in data["features"] if feature["type"] == "Binding site"]
-        binding_sites = [BindingSite.from_dict(site) for site in binding_sites]
-
-        active_sites = [feature for feature in data["features"] if feature["type"] == "Active site"]
-        active_sites = [ActiveSite.from_dict(site) for site in active_sites]
-
-        sites = [feature for feature in data["features"] if feature["type"] == "Site"]
-        sites = [Site.from_dict(site) for site in sites]
-
-        features = [feature for feature in data["features"]]
-        features = [Feature.from_dict(feature) for feature in features]
-
-        cofactor_data = [CofactorData.from_dict(comment) for comment in data["comments"] if
-                         comment["commentType"] == "COFACTOR"]
+        binding_sites = component(EntryComponent.BINDING_SITES, _build_binding_sites, binding_sites)
+        active_sites = component(EntryComponent.ACTIVE_SITES, _build_active_sites, active_sites)
+        sites = component(EntryComponent.SITES, _build_sites, sites)
+        features = component(EntryComponent.FEATURES, _build_features, features)
+        cofactor_data = component(EntryComponent.COFACTOR_DATA_LIST, _build_cofactor_data_list, cofactor_data)
 
-        alternative = [AlternativeProductsData.from_dict(comment) for comment in data["comments"] if
-                       comment["commentType"] == "ALTERNATIVE PRODUCTS"]
         assert len(alternative) <= 1
-        alternative = alternative[0] if alternative else None
+        has_alternative = len(alternative) == 1
+        alternative = component(EntryComponent.ALTERNATIVE_PRODUCTS_DATA, _build_alternative_products_data,
+                                alternative) if has_alternative else None
 
         # ASSERT
         for activity in activities:
@@ -560,16 +710,15 @@ class EntryWithCatalyticActivity:
                 continue
             if activity.has_isoform_molecule:
                 continue
-            match_features = [feature for feature in features if feature.description == activity.molecule]
-            if len(match_features) > 0:
-                types = [f.type for f in match_features]
+            types = [feature["type"] for feature in features_by_description.get(activity.molecule, [])]
+            if len(types) > 0:
                 assert len(types) == 1 and types[0] == 'Chain'
                 continue
             raise ValueError()
 
         for activity in activities:
             if activity.has_isoform_molecule:
-                assert alternative is not None, activity.molecule
+                assert has_alternative, activity.molecule
 
         return cls(primary_accession=data["primaryAccession"],
                    secondary_accessions=data.get("secondaryAccessions", []),
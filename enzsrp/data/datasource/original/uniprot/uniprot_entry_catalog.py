@@ -0,0 +1,116 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity, RheaReference, \
+    CatalyticActivity
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_consumer import UniprotEntryConsumer
+from enzsrp.domain.entity.reaction_direciton import ReactionDirection
+from enzsrp.utils.atomic_file import prepare_temporary_path, replace_with_temporary_path
+
+CATALOG_FILE_SUFFIX = '.catalog.sqlite'
+CATALOG_BATCH_SIZE = 10000
+
+_SCHEMA = """
+CREATE TABLE entries (
+    accession TEXT PRIMARY KEY,
+    n_activities INTEGER NOT NULL,
+    n_phy_reactions INTEGER NOT NULL,
+    n_isoforms INTEGER NOT NULL,
+    has_isoform_molecule INTEGER NOT NULL,
+    has_ptm_molecule INTEGER NOT NULL,
+    has_rhea INTEGER NOT NULL,
+    has_exp_evidence INTEGER NOT NULL
+);
+CREATE TABLE activities (
+    accession TEXT NOT NULL,
+    activity_index INTEGER NOT NULL,
+    ec_number TEXT,
+    rhea_master_id TEXT,
+    molecule TEXT,
+    is_isoform_molecule INTEGER NOT NULL,
+    is_ptm_molecule INTEGER NOT NULL,
+    rxn_has_exp_evidence INTEGER NOT NULL,
+    n_phy_reactions INTEGER NOT NULL,
+    n_exp_phy_reactions INTEGER NOT NULL,
+    has_left_to_right INTEGER NOT NULL,
+    has_right_to_left INTEGER NOT NULL,
+    PRIMARY KEY (accession, activity_index)
+);
+CREATE INDEX entries_n_activities ON entries (n_activities);
+CREATE INDEX activities_ec_number ON activities (ec_number);
+CREATE INDEX activities_rhea_master_id ON activities (rhea_master_id);
+CREATE INDEX activities_n_phy_reactions ON activities (n_phy_reactions, n_exp_phy_reactions);
+"""
+
+
+def default_catalog_path(uniprot_json_path: Path) -> Path:
+    return uniprot_json_path.with_name(uniprot_json_path.name + CATALOG_FILE_SUFFIX)
+
+
+def _rhea_master_id(activity: CatalyticActivity) -> Optional[str]:
+    # NOTE: `Reaction.rhea_main_reference` raises on multiple master references. The catalog records them as NULL.
+    master_refs = [ref for ref in activity.reaction.cross_references if
+                   isinstance(ref, RheaReference) and not ref.is_comp]
+    return master_refs[0].db_id.id_intstr if len(master_refs) == 1 else None
+
+
+def _has_exp_evidence(activity: CatalyticActivity) -> bool:
+    return activity.reaction.has_exp_evidence or any(phy_rxn.has_exp_evidence for phy_rxn in activity.phy_reactions)
+
+
+def _activity_row(accession: str, index: int, activity: CatalyticActivity) -> tuple:
+    directions = {phy_rxn.direction for phy_rxn in activity.phy_reactions}
+    return (accession, index, activity.reaction.ec_number, _rhea_master_id(activity), activity.molecule,
+            bool(activity.has_isoform_molecule), bool(activity.has_non_isoform_molecule),
+            activity.reaction.has_exp_evidence, len(activity.phy_reactions),
+            sum(1 for phy_rxn in activity.phy_reactions if phy_rxn.has_exp_evidence),
+            ReactionDirection.LEFT_TO_RIGHT in directions, ReactionDirection.RIGHT_TO_LEFT in directions)
+
+
+class EntryCatalogWriter(UniprotEntryConsumer):
+    """
+    Writes a per-entry and per-activity summary of the UniProt entries to SQLite, so that entries can be searched with
+    indexed queries instead of a full scan. The file is replaced atomically on `close`.
+    """
+
+    def __init__(self, catalog_path: Path):
+        self.catalog_path = catalog_path
+        self._tmp_path = prepare_temporary_path(catalog_path)
+        self._connection = sqlite3.connect(self._tmp_path)
+        self._connection.executescript(_SCHEMA)
+        self._entry_rows: List[tuple] = []
+        self._activity_rows: List[tuple] = []
+
+    def _flush(self):
+        self._connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._entry_rows)
+        self._connection.executemany("INSERT INTO activities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     self._activity_rows)
+        self._entry_rows.clear()
+        self._activity_rows.clear()
+
+    def consume(self, entry: EntryWithCatalyticActivity):
+        activities = entry.catalytic_activities
+        n_isoforms = len(entry.alternative_products_data.isoforms) if entry.alternative_products_data else 0
+        self._entry_rows.append((
+            entry.primary_accession, len(activities), sum(len(activity.phy_reactions) for activity in activities),
+            n_isoforms, any(activity.has_isoform_molecule for activity in activities),
+            any(activity.has_non_isoform_molecule for activity in activities),
+            any(activity.reaction.has_rhea_rxn_reference for activity in activities),
+            any(_has_exp_evidence(activity) for activity in activities)))
+        self._activity_rows.extend(
+            _activity_row(entry.primary_accession, i, activity) for i, activity in enumerate(activities))
+        if len(self._entry_rows) >= CATALOG_BATCH_SIZE:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._connection.commit()
+        self._connection.close()
+        replace_with_temporary_path(self._tmp_path, self.catalog_path)
+
+
+def query_catalog(catalog_path: Path, sql: str, parameters: tuple = ()) -> List[tuple]:
+    with closing(sqlite3.connect(f"file:{catalog_path}?mode=ro", uri=True)) as connection:
+        return connection.execute(sql, parameters).fetchall()
@@ -0,0 +1,77 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Iterable, Set, Dict
+
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity
+
+
+class UniprotEntryConsumer(ABC):
+    """
+    Receives each entry of a single pass over the UniProt entries. See `fan_out`.
+    """
+
+    @abstractmethod
+    def consume(self, entry: EntryWithCatalyticActivity):
+        pass
+
+    def close(self):
+        """
+        Called once after the last entry.
+        """
+        pass
+
+
+def fan_out(entries: Iterable[EntryWithCatalyticActivity], consumers: Iterable[UniprotEntryConsumer]):
+    """
+    Passes each entry to all the consumers, in the order of `consumers`, so that the entries are read and parsed once.
+    """
+    consumers = list(consumers)
+    for entry in entries:
+        for consumer in consumers:
+            consumer.consume(entry)
+    for consumer in consumers:
+        consumer.close()
+
+
+class IsoformIdCollector(UniprotEntryConsumer):
+    """
+    Collects the isoform IDs of the entries having a catalytic activity with a molecule.
+    """
+
+    def __init__(self):
+        self.isoform_ids: Set[str] = set()
+
+    def consume(self, entry: EntryWithCatalyticActivity):
+        if not any(activity.molecule is not None for activity in entry.catalytic_activities):
+            return
+        if entry.alternative_products_data is not None and len(entry.alternative_products_data.isoforms) >= 1:
+            self.isoform_ids.update(isoform_id for isoform in entry.alternative_products_data.isoforms for isoform_id in
+                                    isoform.isoformIds)
+
+
+class EntryStatsAccumulator(UniprotEntryConsumer):
+    """
+    Counts entries and catalytic activities by the properties used in the dataset build.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def consume(self, entry: EntryWithCatalyticActivity):
+        self.counts['entries'] += 1
+        for activity in entry.catalytic_activities:
+            self.counts['activities'] += 1
+            self.counts['physiological_reactions'] += len(activity.phy_reactions)
+            if activity.reaction.has_exp_evidence:
+                self.counts['activities_with_exp_evidence'] += 1
+            if any(phy_rxn.has_exp_evidence for phy_rxn in activity.phy_reactions):
+                self.counts['activities_with_exp_physiological_reaction'] += 1
+            if activity.reaction.has_rhea_rxn_reference:
+                self.counts['activities_with_rhea_reference'] += 1
+            if activity.has_isoform_molecule:
+                self.counts['activities_with_isoform_molecule'] += 1
+            elif activity.has_non_isoform_molecule:
+                self.counts['activities_with_ptm_molecule'] += 1
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.counts)
@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from typing import Optional, FrozenSet, List
+
+
+@dataclass(frozen=True)
+class UniprotEntryFilter:
+    """
+    Predicates evaluated on the raw entry dict, before `EntryWithCatalyticActivity` is built.
+    All specified conditions must hold.
+
+    accessions: the primary accession must be one of them.
+    ec_prefix: at least one catalytic activity must have an EC number under this prefix, e.g. '1.14.*' or '1.14'.
+    require_rhea: at least one catalytic activity must have a Rhea cross-reference.
+    """
+    accessions: Optional[FrozenSet[str]] = None
+    ec_prefix: Optional[str] = None
+    require_rhea: bool = False
+    _ec_class: Optional[str] = field(init=False, repr=False, compare=False, default=None)
+
+    def __post_init__(self):
+        if self.ec_prefix is not None:
+            # '1.14.*', '1.14.' and '1.14' are all normalized to '1.14'
+            object.__setattr__(self, '_ec_class', self.ec_prefix.rstrip('*').rstrip('.'))
+
+    def _match_ec_number(self, ec_number: Optional[str]) -> bool:
+        if ec_number is None:
+            return False
+        return ec_number == self._ec_class or ec_number.startswith(self._ec_class + '.')
+
+    def matches(self, data: dict) -> bool:
+        if self.accessions is not None and data["primaryAccession"] not in self.accessions:
+            return False
+        if self.ec_prefix is None and not self.require_rhea:
+            return True
+        reactions = [comment["reaction"] for comment in data["comments"] if
+                     comment["commentType"] == "CATALYTIC ACTIVITY"]
+        return self.matches_summary(data["primaryAccession"], [reaction.get("ecNumber") for reaction in reactions],
+                                    any(ref["database"] == "Rhea" for reaction in reactions for ref in
+                                        reaction.get("reactionCrossReferences", [])))
+
+    def matches_summary(self, primary_accession: str, ec_numbers: List[Optional[str]],
+                        has_rhea_reference: bool) -> bool:
+        """
+        Same as `matches`, for the values already read from an entry, i.e. the EC numbers of the catalytic activities
+        and whether any of them has a Rhea cross-reference.
+        """
+        if self.accessions is not None and primary_accession not in self.accessions:
+            return False
+        if self.ec_prefix is not None and not any(self._match_ec_number(ec_number) for ec_number in ec_numbers):
+            return False
+        if self.require_rhea and not has_rhea_reference:
+            return False
+        return True
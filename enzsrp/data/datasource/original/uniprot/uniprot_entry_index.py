@@ -0,0 +1,94 @@
+import json
+import mmap
+from pathlib import Path
+from typing import List, Tuple, Dict, Iterable, Optional
+
+from enzsrp.data.datasource.original.uniprot.sharded_uniprot_reader import find_entry_offsets
+from enzsrp.utils.json_sidecar import sidecar_path, file_fingerprint, load_json_sidecar, save_json_sidecar
+
+INDEX_FORMAT_VERSION = 3
+INDEX_FILE_SUFFIX = '.index.json'
+
+
+def default_index_path(uniprot_json_path: Path) -> Path:
+    return sidecar_path(uniprot_json_path, INDEX_FILE_SUFFIX)
+
+
+def find_entry_ranges(path: Path) -> List[Tuple[str, int, int]]:
+    """
+    Returns (primary accession, start, end) of each entry object in the `results` array, in file order.
+    `end` is exclusive and points right after the closing brace of the entry.
+
+    The entries start at the offsets found by the sharded reader. Each entry is decoded, and its end and accession are
+    taken from the decoded object, so the index never depends on the key order or on the bytes between entries.
+    """
+    offsets = find_entry_offsets(path)
+    if len(offsets) == 0:
+        return []
+    decoder = json.JSONDecoder()
+    result = []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i, start in enumerate(offsets):
+            is_last = i + 1 == len(offsets)
+            stop = len(mm) if is_last else offsets[i + 1]
+            text = mm[start:stop].decode('utf-8')
+            data, end = decoder.raw_decode(text)
+            trailing = text[end:]
+            # Only ',' and whitespace follow an entry that is not the last one. Anything else means that the start of
+            # the next entry was missed.
+            if not is_last and trailing.strip() not in ('', ','):
+                raise ValueError(f"Unexpected data after the entry at byte {start} of {path}")
+            if not isinstance(data, dict) or "primaryAccession" not in data:
+                raise ValueError(f"primaryAccession is not found in the entry at byte {start} of {path}")
+            result.append((data["primaryAccession"], start, stop - len(trailing.encode('utf-8'))))
+    return result
+
+
+class UniprotEntryIndex:
+    """
+    Byte ranges of the entries in a UniProt entries JSON, keyed by primary accession.
+    """
+
+    def __init__(self, source_key: str, entries: List[Tuple[str, int, int]]):
+        # NOTE: A re-downloaded file can have the same size, so the key also has the modification time.
+        self.source_key = source_key
+        self.entries = entries
+        self._range_by_accession: Dict[str, Tuple[int, int]] = {accession: (start, end) for accession, start, end in
+                                                                entries}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, accession: str):
+        return accession in self._range_by_accession
+
+    def get_range(self, accession: str) -> Tuple[int, int]:
+        if accession not in self._range_by_accession:
+            raise KeyError(f"Accession {accession} is not found in the index")
+        return self._range_by_accession[accession]
+
+    @classmethod
+    def build(cls, uniprot_json_path: Path) -> 'UniprotEntryIndex':
+        return cls(file_fingerprint(uniprot_json_path), find_entry_ranges(uniprot_json_path))
+
+    def save(self, path: Path):
+        save_json_sidecar(path, INDEX_FORMAT_VERSION, self.source_key, self.entries)
+
+    @classmethod
+    def load(cls, path: Path, uniprot_json_path: Path) -> Optional['UniprotEntryIndex']:
+        """
+        Returns None if the index does not exist, was built by another version or does not match `uniprot_json_path`.
+        """
+        source_key = file_fingerprint(uniprot_json_path)
+        return load_json_sidecar(path, INDEX_FORMAT_VERSION, source_key, lambda entries: cls(
+            source_key, [(accession, start, end) for accession, start, end in entries]))
+
+    def read_entry_dicts(self, uniprot_json_path: Path, ranges: Iterable[Tuple[int, int]]) -> List[dict]:
+        if file_fingerprint(uniprot_json_path) != self.source_key:
+            raise ValueError(f"The index does not match {uniprot_json_path}. Please rebuild the index.")
+        result = []
+        with open(uniprot_json_path, 'rb') as file:
+            for start, end in ranges:
+                file.seek(start)
+                result.append(json.loads(file.read(end - start)))
+        return result
@@ -0,0 +1,348 @@
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Generator, List, Set, Optional, Callable, Any, Dict
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity, EntryComponent, \
+    ALL_ENTRY_COMPONENTS, build_component, Evidence, intern_evidence, Location, intern_location, CrossReference, \
+    RheaReference, ChEBIReference, map_to_rhea_id_or_rhea_comp_id, ChEBIID, Reaction, PhysiologicalReaction, \
+    CatalyticActivity, Ligand, LigandPart, BindingSite, ActiveSite, Site, Feature, Cofactor, NoteText, CofactorData, \
+    Isoform, AlternativeProductsData
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
+from enzsrp.domain.entity.reaction_direciton import ReactionDirection
+from enzsrp.utils.atomic_file import atomic_write_path
+from enzsrp.utils.hash_util import hash_file_with_cache
+
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_BATCH_SIZE = 10000
+SOURCE_HASH_FILE_SUFFIX = '.sha256.json'
+
+# Each entity is stored as a struct of its own fields. IDs are stored as their text and interned again when read.
+_EVIDENCE = pa.struct([("code", pa.string()), ("id", pa.string()), ("source", pa.string())])
+_LOCATION = pa.struct([("start_value", pa.int64()), ("start_modifier", pa.string()), ("end_value", pa.int64()),
+                       ("end_modifier", pa.string())])
+_CROSS_REFERENCE = pa.struct([("database", pa.string()), ("id", pa.string())])
+_REACTION = pa.struct([("ec_number", pa.string()), ("name", pa.string()), ("evidences", pa.list_(_EVIDENCE)),
+                       ("cross_references", pa.list_(_CROSS_REFERENCE))])
+_PHYSIOLOGICAL_REACTION = pa.struct([("direction", pa.string()), ("evidences", pa.list_(_EVIDENCE)),
+                                     ("cross_references", pa.list_(_CROSS_REFERENCE))])
+_CATALYTIC_ACTIVITY = pa.struct([("molecule", pa.string()), ("reaction", _REACTION),
+                                 ("phy_reactions", pa.list_(_PHYSIOLOGICAL_REACTION))])
+_LIGAND = pa.struct([("name", pa.string()), ("id", pa.string()), ("label", pa.string()), ("note", pa.string())])
+_SITE = pa.struct([("type", pa.string()), ("location", _LOCATION), ("chebi_ids", pa.list_(pa.string())),
+                   ("description", pa.string()), ("evidences", pa.list_(_EVIDENCE))])
+_BINDING_SITE = pa.struct(list(_SITE) + [("ligand", _LIGAND), ("ligand_part", _LIGAND)])
+_FEATURE = pa.struct([("type", pa.string()), ("location", _LOCATION), ("description", pa.string())])
+_COFACTOR = pa.struct([("name", pa.string()), ("evidences", pa.list_(_EVIDENCE)), ("chebi_id", pa.string())])
+_NOTE_TEXT = pa.struct([("evidences", pa.list_(_EVIDENCE)), ("value", pa.string())])
+_COFACTOR_DATA = pa.struct([("cofactors", pa.list_(_COFACTOR)), ("note_texts", pa.list_(_NOTE_TEXT))])
+_ISOFORM = pa.struct([("name", pa.string()), ("isoform_ids", pa.list_(pa.string())),
+                      ("sequence_status", pa.string()), ("sequence_ids", pa.list_(pa.string()))])
+_ALTERNATIVE_PRODUCTS = pa.struct([("comment_type", pa.string()), ("events", pa.list_(pa.string())),
+                                   ("isoforms", pa.list_(_ISOFORM))])
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("primary_accession", pa.string()),
+    ("secondary_accessions", pa.list_(pa.string())),
+    ("uniprot_kb_id", pa.string()),
+    ("protein_existence", pa.string()),
+    ("catalytic_activities", pa.list_(_CATALYTIC_ACTIVITY)),
+    ("binding_sites", pa.list_(_BINDING_SITE)),
+    ("active_sites", pa.list_(_SITE)),
+    ("sites", pa.list_(_SITE)),
+    ("features", pa.list_(_FEATURE)),
+    ("sequence", pa.string()),
+    ("last_sequence_update_date", pa.timestamp('s')),
+    ("cofactor_data_list", pa.list_(_COFACTOR_DATA)),
+    ("alternative_products_data", _ALTERNATIVE_PRODUCTS),
+    ("isoform_ids", pa.list_(pa.string())),
+])
+
+
+# Entity -> row
+
+def _evidence_row(evidence: Evidence) -> dict:
+    return {"code": evidence.type.value, "id": evidence.evd_id, "source": evidence.source}
+
+
+def _location_row(location: Optional[Location]) -> Optional[dict]:
+    if location is None:
+        return None
+    return {"start_value": location.start_value, "start_modifier": location.start_modifier.value,
+            "end_value": location.end_value, "end_modifier": location.end_modifier.value}
+
+
+def _cross_reference_row(ref: CrossReference) -> dict:
+    return {"database": ref.database, "id": ref.db_id.id}
+
+
+def _catalytic_activity_row(activity: CatalyticActivity) -> dict:
+    reaction = activity.reaction
+    return {
+        "molecule": activity.molecule,
+        "reaction": {"ec_number": reaction.ec_number, "name": reaction.name,
+                     "evidences": [_evidence_row(e) for e in reaction.evidences],
+                     "cross_references": [_cross_reference_row(ref) for ref in reaction.cross_references]},
+        "phy_reactions": [{"direction": phy_rxn.direction.value,
+                           "evidences": [_evidence_row(e) for e in phy_rxn.evidences],
+                           "cross_references": [_cross_reference_row(ref) for ref in phy_rxn.cross_references]}
+                          for phy_rxn in activity.phy_reactions],
+    }
+
+
+def _site_row(site) -> dict:
+    return {"type": site.type, "location": _location_row(site.location),
+            "chebi_ids": [ref.db_id.id for ref in site.featureCrossReference], "description": site.description,
+            "evidences": [_evidence_row(e) for e in site.evidences]}
+
+
+def _ligand_row(ligand) -> Optional[dict]:
+    if ligand is None:
+        return None
+    ligand_id = ligand.ligand_id.id if isinstance(ligand.ligand_id, ChEBIID) else ligand.ligand_id
+    return {"name": ligand.name, "id": ligand_id, "label": ligand.label, "note": ligand.note}
+
+
+def _binding_site_row(site: BindingSite) -> dict:
+    return {**_site_row(site), "ligand": _ligand_row(site.ligand), "ligand_part": _ligand_row(site.ligandPart)}
+
+
+def _cofactor_data_row(data: CofactorData) -> dict:
+    return {"cofactors": [{"name": cofactor.name, "evidences": [_evidence_row(e) for e in cofactor.evidences],
+                           "chebi_id": cofactor.cofactorCrossReference.db_id.id} for cofactor in data.cofactors],
+            "note_texts": [{"evidences": [_evidence_row(e) for e in text.evidences], "value": text.value}
+                           for text in data.note_texts]}
+
+
+def _alternative_products_row(data: Optional[AlternativeProductsData]) -> Optional[dict]:
+    if data is None:
+        return None
+    return {"comment_type": data.commentType, "events": data.events,
+            "isoforms": [{"name": isoform.name, "isoform_ids": isoform.isoformIds,
+                          "sequence_status": isoform.isoformSequenceStatus, "sequence_ids": isoform.sequenceIds}
+                         for isoform in data.isoforms]}
+
+
+# Same rule as `IsoformIdCollector`.
+def _collect_isoform_ids(entry: EntryWithCatalyticActivity) -> List[str]:
+    if not any(activity.molecule is not None for activity in entry.catalytic_activities):
+        return []
+    if entry.alternative_products_data is None:
+        return []
+    return [isoform_id for isoform in entry.alternative_products_data.isoforms for isoform_id in isoform.isoformIds]
+
+
+def _entry_row(entry: EntryWithCatalyticActivity) -> dict:
+    return {
+        "primary_accession": entry.primary_accession,
+        "secondary_accessions": entry.secondary_accessions,
+        "uniprot_kb_id": entry.uniprot_kb_id,
+        "protein_existence": entry.protein_existence,
+        "catalytic_activities": [_catalytic_activity_row(activity) for activity in entry.catalytic_activities],
+        "binding_sites": [_binding_site_row(site) for site in entry.binding_sites],
+        "active_sites": [_site_row(site) for site in entry.active_sites],
+        "sites": [_site_row(site) for site in entry.sites],
+        "features": [{"type": feature.type, "location": _location_row(feature.location),
+                      "description": feature.description} for feature in entry.features],
+        "sequence": entry.sequence,
+        "last_sequence_update_date": entry.last_sequence_update_date,
+        "cofactor_data_list": [_cofactor_data_row(data) for data in entry.cofactor_data_list],
+        "alternative_products_data": _alternative_products_row(entry.alternative_products_data),
+        "isoform_ids": _collect_isoform_ids(entry),
+    }
+
+
+# Row -> entity
+
+def _evidences(rows: List[dict]) -> List[Evidence]:
+    return [intern_evidence(row["code"], row["id"], row["source"]) for row in rows]
+
+
+def _location(row: Optional[dict]) -> Optional[Location]:
+    if row is None:
+        return None
+    return intern_location(row["start_value"], row["start_modifier"], row["end_value"], row["end_modifier"])
+
+
+def _cross_references(rows: List[dict]) -> List[CrossReference]:
+    return [RheaReference(RheaReference.database, map_to_rhea_id_or_rhea_comp_id(row["id"]))
+            if row["database"] == RheaReference.database else _chebi_reference(row["id"]) for row in rows]
+
+
+def _chebi_reference(chebi_id: str) -> ChEBIReference:
+    return ChEBIReference(ChEBIReference.database, ChEBIID.from_string(chebi_id))
+
+
+def _catalytic_activities(rows: List[dict]) -> List[CatalyticActivity]:
+    activities = []
+    for row in rows:
+        reaction = row["reaction"]
+        activities.append(CatalyticActivity(
+            molecule=row["molecule"],
+            reaction=Reaction(ec_number=reaction["ec_number"], evidences=_evidences(reaction["evidences"]),
+                              cross_references=_cross_references(reaction["cross_references"]), name=reaction["name"]),
+            phy_reactions=[PhysiologicalReaction(direction=ReactionDirection.from_string(phy_rxn["direction"]),
+                                                 evidences=_evidences(phy_rxn["evidences"]),
+                                                 cross_references=_cross_references(phy_rxn["cross_references"]))
+                           for phy_rxn in row["phy_reactions"]]))
+    return activities
+
+
+def _site_fields(row: dict) -> dict:
+    return {"type": row["type"], "location": _location(row["location"]),
+            "featureCrossReference": [_chebi_reference(chebi_id) for chebi_id in row["chebi_ids"]],
+            "description": row["description"], "evidences": _evidences(row["evidences"])}
+
+
+def _binding_sites(rows: List[dict]) -> List[BindingSite]:
+    sites = []
+    for row in rows:
+        ligand, ligand_part = row["ligand"], row["ligand_part"]
+        sites.append(BindingSite(
+            **_site_fields(row),
+            ligand=Ligand(name=ligand["name"],
+                          ligand_id=ChEBIID.from_string(ligand["id"]) if ligand["id"] is not None else None,
+                          label=ligand["label"], note=ligand["note"]),
+            ligandPart=LigandPart(name=ligand_part["name"], ligand_id=ligand_part["id"], label=ligand_part["label"],
+                                  note=ligand_part["note"]) if ligand_part is not None else None))
+    return sites
+
+
+def _active_sites(rows: List[dict]) -> List[ActiveSite]:
+    return [ActiveSite(**_site_fields(row)) for row in rows]
+
+
+def _sites(rows: List[dict]) -> List[Site]:
+    return [Site(**_site_fields(row)) for row in rows]
+
+
+def _features(rows: List[dict]) -> List[Feature]:
+    return [Feature(type=row["type"], location=_location(row["location"]), description=row["description"])
+            for row in rows]
+
+
+def _cofactor_data_list(rows: List[dict]) -> List[CofactorData]:
+    return [CofactorData(
+        cofactors=[Cofactor(name=cofactor["name"], evidences=_evidences(cofactor["evidences"]),
+                            cofactorCrossReference=_chebi_reference(cofactor["chebi_id"]))
+                   for cofactor in row["cofactors"]],
+        note_texts=[NoteText(evidences=_evidences(text["evidences"]), value=text["value"])
+                    for text in row["note_texts"]]) for row in rows]
+
+
+def _alternative_products_data(row: Optional[dict]) -> Optional[AlternativeProductsData]:
+    if row is None:
+        return None
+    return AlternativeProductsData(
+        commentType=row["comment_type"], events=row["events"],
+        isoforms=[Isoform(name=isoform["name"], isoformIds=isoform["isoform_ids"],
+                          isoformSequenceStatus=isoform["sequence_status"], sequenceIds=isoform["sequence_ids"])
+                  for isoform in row["isoforms"]])
+
+
+_COMPONENT_BUILDERS: Dict[EntryComponent, Callable[[Any], Any]] = {
+    EntryComponent.BINDING_SITES: _binding_sites,
+    EntryComponent.ACTIVE_SITES: _active_sites,
+    EntryComponent.SITES: _sites,
+    EntryComponent.FEATURES: _features,
+    EntryComponent.COFACTOR_DATA_LIST: _cofactor_data_list,
+    EntryComponent.ALTERNATIVE_PRODUCTS_DATA: _alternative_products_data,
+}
+
+
+def _build_from_scalar(build: Callable[[Any], Any], scalar: pa.Scalar):
+    return build(scalar.as_py())
+
+
+def _matches(entry_filter: UniprotEntryFilter, primary_accession: str, activities: List[dict]) -> bool:
+    reactions = [activity["reaction"] for activity in activities]
+    return entry_filter.matches_summary(
+        primary_accession, [reaction["ec_number"] for reaction in reactions],
+        any(ref["database"] == RheaReference.database for reaction in reactions for ref in
+            reaction["cross_references"]))
+
+
+class UniprotSnapshotCache:
+    """
+    Columnar (Parquet) snapshot of the UniProt entry fields used by this package, keyed by the hash of the input file.
+    The hash is saved next to the snapshots, and the input is hashed again only when its size or modification time
+    changes.
+    """
+
+    def __init__(self, snapshot_dir: Path, uniprot_json_path: Path):
+        self.snapshot_dir = snapshot_dir
+        source_hash = hash_file_with_cache(uniprot_json_path,
+                                           snapshot_dir.joinpath(uniprot_json_path.name + SOURCE_HASH_FILE_SUFFIX))
+        self.path = snapshot_dir.joinpath(f"uniprot_snapshot_v{SNAPSHOT_FORMAT_VERSION}_{source_hash}.parquet")
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def write(self, entries: Iterable[EntryWithCatalyticActivity]):
+        with atomic_write_path(self.path) as tmp_path, pq.ParquetWriter(tmp_path, SNAPSHOT_SCHEMA) as writer:
+            batch = []
+            for entry in tqdm(entries, desc='Writing UniProt snapshot', unit=' entries'):
+                batch.append(_entry_row(entry))
+                if len(batch) >= SNAPSHOT_BATCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=SNAPSHOT_SCHEMA))
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=SNAPSHOT_SCHEMA))
+
+    def stream_entries(self, projection: Optional[Iterable[EntryComponent]] = None,
+                       entry_filter: Optional[UniprotEntryFilter] = None) \
+            -> Generator[EntryWithCatalyticActivity, None, None]:
+        """
+        Builds the entries from the columns. The components not selected by `projection` are converted from Arrow on
+        first access. `entry_filter` is evaluated on the accession and catalytic activity columns, so rejected entries
+        are never built.
+        """
+        projection = ALL_ENTRY_COMPONENTS if projection is None else frozenset(projection)
+        parquet_file = pq.ParquetFile(self.path)
+        for batch in parquet_file.iter_batches(batch_size=SNAPSHOT_BATCH_SIZE):
+            activities = batch.column("catalytic_activities").to_pylist()
+            if entry_filter is not None:
+                accessions = batch.column("primary_accession").to_pylist()
+                matched = [i for i in range(batch.num_rows) if _matches(entry_filter, accessions[i], activities[i])]
+                if len(matched) == 0:
+                    continue
+                batch = batch.take(pa.array(matched, type=pa.int64()))
+                activities = [activities[i] for i in matched]
+            values = {name: batch.column(name).to_pylist() for name in
+                      ["primary_accession", "secondary_accessions", "uniprot_kb_id", "protein_existence", "sequence",
+                       "last_sequence_update_date"]}
+            components = {}
+            for kind, build in _COMPONENT_BUILDERS.items():
+                column = batch.column(kind.value)
+                if kind in projection:
+                    components[kind] = column.to_pylist()
+                else:
+                    components[kind] = [column[i] for i in range(batch.num_rows)]
+                    build = partial(_build_from_scalar, build)
+                components[kind] = [build_component(kind, projection, build, value) for value in components[kind]]
+            for i in range(batch.num_rows):
+                yield EntryWithCatalyticActivity(
+                    primary_accession=values["primary_accession"][i],
+                    secondary_accessions=values["secondary_accessions"][i],
+                    uniprot_kb_id=values["uniprot_kb_id"][i],
+                    protein_existence=values["protein_existence"][i],
+                    catalytic_activities=_catalytic_activities(activities[i]),
+                    binding_sites=components[EntryComponent.BINDING_SITES][i],
+                    active_sites=components[EntryComponent.ACTIVE_SITES][i],
+                    sites=components[EntryComponent.SITES][i],
+                    features=components[EntryComponent.FEATURES][i],
+                    sequence=values["sequence"][i],
+                    last_sequence_update_date=values["last_sequence_update_date"][i],
+                    cofactor_data_list=components[EntryComponent.COFACTOR_DATA_LIST][i],
+                    alternative_products_data=components[EntryComponent.ALTERNATIVE_PRODUCTS_DATA][i])
+
+    def stream_column(self, column: str) -> Generator:
+        parquet_file = pq.ParquetFile(self.path)
+        for batch in parquet_file.iter_batches(batch_size=SNAPSHOT_BATCH_SIZE, columns=[column]):
+            yield from batch.column(0).to_pylist()
+
+    def read_isoform_ids(self) -> Set[str]:
+        return {isoform_id for isoform_ids in self.stream_column("isoform_ids") for isoform_id in isoform_ids}
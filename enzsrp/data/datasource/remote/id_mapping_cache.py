@@ -0,0 +1,74 @@
+import json
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Dict, Iterable
+
+CACHE_FORMAT_VERSION = 1
+# Number of IDs per query, below the SQLite host parameter limit
+_QUERY_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS results (
+    from_db TEXT NOT NULL,
+    to_db TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (from_db, to_db, id, position)
+);
+"""
+
+
+class IdMappingCache:
+    """
+    Results of the UniProt ID mapping service by (from database, to database, ID), kept across runs so that only new
+    IDs are submitted. IDs that failed to be mapped are not cached.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute("INSERT OR IGNORE INTO metadata VALUES ('format_version', ?)",
+                                 (str(CACHE_FORMAT_VERSION),))
+        self._connection.commit()
+        version = self._connection.execute("SELECT value FROM metadata WHERE key = 'format_version'").fetchone()[0]
+        if int(version) != CACHE_FORMAT_VERSION:
+            self._connection.close()
+            raise ValueError(f"Unsupported ID mapping cache format version {version}: {path}")
+
+    def get_results(self, from_db: str, to_db: str, ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """
+        Returns the cached results of `ids`, keyed by ID. IDs not in the cache are omitted.
+        """
+        ids = list(dict.fromkeys(ids))
+        result = defaultdict(list)
+        for i in range(0, len(ids), _QUERY_CHUNK_SIZE):
+            chunk = ids[i:i + _QUERY_CHUNK_SIZE]
+            rows = self._connection.execute(
+                f"SELECT id, result FROM results WHERE from_db = ? AND to_db = ? AND id IN "
+                f"({','.join('?' * len(chunk))}) ORDER BY id, position", (from_db, to_db, *chunk)).fetchall()
+            for mapped_id, mapping_result in rows:
+                result[mapped_id].append(json.loads(mapping_result))
+        return dict(result)
+
+    def put_results(self, from_db: str, to_db: str, results: Iterable[dict]):
+        """
+        Saves the results returned by the ID mapping service (`{"from": ..., "to": ...}`), replacing the cached results
+        of the same IDs.
+        """
+        by_id = defaultdict(list)
+        for mapping_result in results:
+            by_id[mapping_result["from"]].append(mapping_result)
+        with self._connection:
+            self._connection.executemany("DELETE FROM results WHERE from_db = ? AND to_db = ? AND id = ?",
+                                         [(from_db, to_db, mapped_id) for mapped_id in by_id])
+            self._connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?)", [
+                (from_db, to_db, mapped_id, position, json.dumps(mapping_result, ensure_ascii=False)) for
+                mapped_id, mapping_results in by_id.items() for position, mapping_result in enumerate(mapping_results)])
+
+    def close(self):
+        self._connection.close()
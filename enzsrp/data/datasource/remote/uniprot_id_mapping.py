@@ -159,6 +159,26 @@ def get_id_mapping_results_search(url):
     return results
 
 
+def add_default_page_size(url, size=500):
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if "size" not in query:
+        query["size"] = size
+    return parsed._replace(query=urlencode(query, doseq=True)).geturl()
+
+
+def iter_id_mapping_results_pages(url):
+    """
+    Yields (JSON results of the page, URL of the next page or None, total number of results) one page at a time,
+    following the `Link: <...>; rel="next"` headers. The download can be resumed from any yielded next page URL.
+    """
+    while url:
+        request = session.get(url)
+        check_response(request)
+        url = get_next_link(request.headers)
+        yield request.json(), url, int(request.headers["x-total-results"])
+
+
 def get_id_mapping_results_stream(url):
     if "/stream/" not in url:
         url = url.replace("/results/", "/results/stream/")
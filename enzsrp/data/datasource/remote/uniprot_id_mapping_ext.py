@@ -1,16 +1,195 @@
+import hashlib
 import json
-from typing import List
+import os
+from pathlib import Path
+from typing import List, Optional, Iterable, Iterator, Dict, Tuple
 
+from enzsrp.data.datasource.remote.id_mapping_cache import IdMappingCache
 from enzsrp.data.datasource.remote.uniprot_id_mapping import submit_id_mapping, check_id_mapping_results_ready, \
-    get_id_mapping_results_link, get_id_mapping_results_search
+    get_id_mapping_results_link, get_id_mapping_results_search, iter_id_mapping_results_pages, add_default_page_size
+from enzsrp.utils.json_sidecar import sidecar_path, load_json_sidecar, save_json_sidecar
 
+CHECKPOINT_FORMAT_VERSION = 2
+CHECKPOINT_FILE_SUFFIX = '.checkpoint.json'
 
-def submit_id_mapping_task_and_download_file(from_db: str, to_db: str, ids: List[str], output_file_path):
+
+def _submit_id_mapping_task(from_db: str, to_db: str, ids: List[str]) -> Optional[dict]:
     job_id = submit_id_mapping(from_db, to_db, ids)
     print(f"jobid: {job_id}")
+    results = None
     if check_id_mapping_results_ready(job_id):
         link = get_id_mapping_results_link(job_id)
         results = get_id_mapping_results_search(link)
+    print(f"you can also check result in: https://www.uniprot.org/id-mapping/uniparc/{job_id}/overview")
+    return results
+
+
+def _submit_missing_ids_and_merge(from_db: str, to_db: str, ids: List[str], cache: IdMappingCache) -> dict:
+    cached = cache.get_results(from_db, to_db, ids)
+    missing_ids = [i for i in dict.fromkeys(ids) if i not in cached]
+    print(f"cached: {len(cached)}, to be submitted: {len(missing_ids)}")
+    fetched = {}
+    if len(missing_ids) > 0:
+        fetched = _submit_id_mapping_task(from_db, to_db, missing_ids) or {}
+        cache.put_results(from_db, to_db, fetched.get("results", []))
+    # NOTE: The results are ordered by the given IDs so that the output does not depend on what was cached.
+    results_by_id = dict(cached)
+    for result in fetched.get("results", []):
+        results_by_id.setdefault(result["from"], []).append(result)
+    return {**fetched, "results": [result for i in dict.fromkeys(ids) for result in results_by_id.get(i, [])]}
+
+
+def submit_id_mapping_task_and_download_file(from_db: str, to_db: str, ids: List[str], output_file_path,
+                                             cache_path: Optional[Path] = None):
+    """
+    If `cache_path` is given, the results are also kept in the SQLite cache there, and only the IDs not in the cache
+    are submitted. The cached and newly fetched results are merged into the same output format.
+    """
+    if cache_path is None:
+        results = _submit_id_mapping_task(from_db, to_db, ids)
+    else:
+        cache = IdMappingCache(cache_path)
+        try:
+            results = _submit_missing_ids_and_merge(from_db, to_db, ids, cache)
+        finally:
+            cache.close()
+    if results is not None:
         with open(output_file_path, 'w') as f:
             json.dump(results, f, ensure_ascii=False, indent=4)
-    print(f"you can also check result in: https://www.uniprot.org/id-mapping/uniparc/{job_id}/overview")
+
+
+def default_checkpoint_path(output_file_path: Path) -> Path:
+    return sidecar_path(output_file_path, CHECKPOINT_FILE_SUFFIX)
+
+
+def _hash_ids(ids: List[str]) -> str:
+    # NOTE: Sorted because the IDs are often collected in a set, whose order changes between processes.
+    return hashlib.sha256("\n".join(sorted(set(ids))).encode('utf-8')).hexdigest()
+
+
+def _get_cached_and_missing(from_db: str, to_db: str, ids: List[str], cache: Optional[IdMappingCache]) \
+        -> Tuple[Dict[str, List[dict]], List[str]]:
+    cached = cache.get_results(from_db, to_db, ids) if cache is not None else {}
+    return cached, [i for i in dict.fromkeys(ids) if i not in cached]
+
+
+def _checkpoint_key(from_db: str, to_db: str, ids_hash: str) -> str:
+    return f"{from_db}:{to_db}:{ids_hash}"
+
+
+def _load_checkpoint(checkpoint_path: Path, from_db: str, to_db: str, ids_hash: str) -> Optional[dict]:
+    return load_json_sidecar(checkpoint_path, CHECKPOINT_FORMAT_VERSION, _checkpoint_key(from_db, to_db, ids_hash),
+                             dict)
+
+
+def _save_checkpoint(checkpoint_path: Path, checkpoint: dict):
+    save_json_sidecar(checkpoint_path, CHECKPOINT_FORMAT_VERSION,
+                      _checkpoint_key(checkpoint['from_db'], checkpoint['to_db'], checkpoint['ids_hash']), checkpoint)
+
+
+def _write_results(output_file_path: Path, offset: int, results: Iterable[dict]) -> int:
+    """
+    Writes `results` as JSON lines from `offset`, dropping anything written after the last checkpoint, and returns the
+    new end offset. The file is synced before the offset is returned so that the checkpoint never points past the data.
+    """
+    with open(output_file_path, 'r+b') as file:
+        file.seek(offset)
+        file.truncate()
+        for result in results:
+            file.write(json.dumps(result, ensure_ascii=False).encode('utf-8') + b'\n')
+        file.flush()
+        os.fsync(file.fileno())
+        return file.tell()
+
+
+def _read_results(output_file_path: Path, n_bytes: int) -> Iterator[dict]:
+    offset = 0
+    with open(output_file_path, 'rb') as file:
+        for line in file:
+            if offset >= n_bytes:
+                break
+            offset += len(line)
+            yield json.loads(line)
+
+
+def _start_job(from_db: str, to_db: str, ids: List[str], ids_hash: str) -> dict:
+    job_id, next_url = None, None
+    if len(ids) > 0:
+        job_id = submit_id_mapping(from_db, to_db, ids)
+        print(f"jobid: {job_id}")
+        if check_id_mapping_results_ready(job_id):
+            next_url = add_default_page_size(get_id_mapping_results_link(job_id))
+    return {'from_db': from_db, 'to_db': to_db, 'ids_hash': ids_hash, 'job_id': job_id, 'next_url': next_url,
+            'n_bytes': 0, 'n_results': 0, 'failed_ids': [], 'complete': False}
+
+
+def find_interrupted_download(candidates: Iterable[Path], from_db: str, to_db: str, ids: List[str],
+                              cache_path: Optional[Path] = None) -> Optional[Path]:
+    """
+    Returns the first of `candidates` whose streamed download with the same arguments was interrupted, so that it can
+    be resumed by passing it to `submit_id_mapping_task_and_stream_to_file`.
+    """
+    cache = IdMappingCache(cache_path) if cache_path is not None else None
+    try:
+        _, missing_ids = _get_cached_and_missing(from_db, to_db, ids, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    ids_hash = _hash_ids(missing_ids)
+    for path in candidates:
+        if not path.exists():
+            continue
+        checkpoint = _load_checkpoint(default_checkpoint_path(path), from_db, to_db, ids_hash)
+        if checkpoint is not None and not checkpoint['complete']:
+            return path
+    return None
+
+
+def submit_id_mapping_task_and_stream_to_file(from_db: str, to_db: str, ids: List[str], output_file_path: Path,
+                                              cache_path: Optional[Path] = None):
+    """
+    Streaming variant of `submit_id_mapping_task_and_download_file`. Each page of the results is appended to
+    `output_file_path` as JSON lines (one result per line) as soon as it arrives, and the next page URL is saved to
+    `<output_file_path>.checkpoint.json` with the failed IDs. If the download is interrupted, calling this again with
+    the same arguments resumes the same job from the last saved page.
+
+    If `cache_path` is given, only the IDs not in the cache are submitted, and the cached results are appended after
+    the fetched ones when the download is complete.
+    """
+    cache = IdMappingCache(cache_path) if cache_path is not None else None
+    try:
+        cached, missing_ids = _get_cached_and_missing(from_db, to_db, ids, cache)
+        ids_hash = _hash_ids(missing_ids)
+        checkpoint_path = default_checkpoint_path(output_file_path)
+        checkpoint = _load_checkpoint(checkpoint_path, from_db, to_db, ids_hash) if output_file_path.exists() else None
+        if checkpoint is None:
+            if cache is not None:
+                print(f"cached: {len(cached)}, to be submitted: {len(missing_ids)}")
+            checkpoint = _start_job(from_db, to_db, missing_ids, ids_hash)
+            open(output_file_path, 'wb').close()
+            _save_checkpoint(checkpoint_path, checkpoint)
+        elif checkpoint['complete']:
+            print(f"already downloaded: {output_file_path}")
+            return
+        else:
+            print(f"resuming jobid: {checkpoint['job_id']}, fetched: {checkpoint['n_results']}")
+        for page, next_url, total in iter_id_mapping_results_pages(checkpoint['next_url']):
+            results = page.get("results", [])
+            checkpoint['n_bytes'] = _write_results(output_file_path, checkpoint['n_bytes'], results)
+            checkpoint['n_results'] += len(results)
+            checkpoint['failed_ids'] += page.get("failedIds", [])
+            checkpoint['next_url'] = next_url
+            _save_checkpoint(checkpoint_path, checkpoint)
+            print(f"Fetched: {checkpoint['n_results']} / {total}")
+        if cache is not None:
+            cache.put_results(from_db, to_db, _read_results(output_file_path, checkpoint['n_bytes']))
+        _write_results(output_file_path, checkpoint['n_bytes'],
+                       (result for i in dict.fromkeys(ids) for result in cached.get(i, [])))
+        checkpoint['complete'] = True
+        _save_checkpoint(checkpoint_path, checkpoint)
+        if checkpoint['job_id'] is not None:
+            print(f"you can also check result in: "
+                  f"https://www.uniprot.org/id-mapping/uniparc/{checkpoint['job_id']}/overview")
+    finally:
+        if cache is not None:
+            cache.close()
@@ -7,6 +7,7 @@ amino_acids = {
 
     'U': 'Sec', 'O': 'Pyl'  # Not standard amino acids
 }
+_three_to_one_dict = {v: k for k, v in amino_acids.items()}
 
 
 def one_to_three(code):
@@ -17,8 +18,7 @@ def one_to_three(code):
 
 
 def three_to_one(code):
-    reverse_dict = {v: k for k, v in amino_acids.items()}
-    if code in reverse_dict:
-        return reverse_dict[code]
+    if code in _three_to_one_dict:
+        return _three_to_one_dict[code]
     else:
         raise ValueError("Invalid three-letter amino acid code")
@@ -39,7 +39,10 @@ class ECO(Enum):
 
     @classmethod
     def get_eco_enum(cls, value):
-        for eco_enum in ECO:
-            if eco_enum.value == value:
-                return eco_enum
-        raise ValueError("No matched item")
+        eco_enum = _ECO_BY_VALUE.get(value)
+        if eco_enum is None:
+            raise ValueError("No matched item")
+        return eco_enum
+
+
+_ECO_BY_VALUE = {eco_enum.value: eco_enum for eco_enum in ECO}
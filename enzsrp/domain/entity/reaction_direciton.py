@@ -10,10 +10,13 @@ class RheaDirectionName(Enum):
 
     @classmethod
     def from_text(cls, text):
-        for direction in cls:
-            if direction.value == text:
-                return direction
-        raise ValueError(f"No matching enum value for {text}")
+        direction = _RHEA_DIRECTION_NAME_BY_VALUE.get(text)
+        if direction is None:
+            raise ValueError(f"No matching enum value for {text}")
+        return direction
+
+
+_RHEA_DIRECTION_NAME_BY_VALUE = {direction.value: direction for direction in RheaDirectionName}
 
 
 class ReactionDirection(Enum):
@@ -22,10 +25,10 @@ class ReactionDirection(Enum):
 
     @classmethod
     def from_string(cls, direction_str):
-        for direction in cls:
-            if direction.value == direction_str:
-                return direction
-        raise ValueError(f"Invalid direction string: {direction_str}")
+        direction = _REACTION_DIRECTION_BY_VALUE.get(direction_str)
+        if direction is None:
+            raise ValueError(f"Invalid direction string: {direction_str}")
+        return direction
 
     @property
     def rhea_diction_name(self):
@@ -42,6 +45,9 @@ class ReactionDirection(Enum):
             return "r2l"
 
 
+_REACTION_DIRECTION_BY_VALUE = {direction.value: direction for direction in ReactionDirection}
+
+
 # see: https://biocyc.org/PGDBConceptsGuide.shtml#TAG:__tex2page_sec_4.2
 class MetaCycDirection(Enum):
     REVERSIBLE = "REVERSIBLE"
@@ -54,10 +60,10 @@ class MetaCycDirection(Enum):
 
     @classmethod
     def from_text(cls, text):
-        for direction in cls:
-            if direction.value == text:
-                return direction
-        raise ValueError(f"No matching enum value for {text}")
+        direction = _METACYC_DIRECTION_BY_VALUE.get(text)
+        if direction is None:
+            raise ValueError(f"No matching enum value for {text}")
+        return direction
 
     def to_reaction_directions(self) -> Tuple[ReactionDirection, ...]:
         if self.value == MetaCycDirection.REVERSIBLE.value:
@@ -74,3 +80,6 @@ class MetaCycDirection(Enum):
             return ReactionDirection.RIGHT_TO_LEFT,
         else:
             raise ValueError("unexpected")
+
+
+_METACYC_DIRECTION_BY_VALUE = {direction.value: direction for direction in MetaCycDirection}
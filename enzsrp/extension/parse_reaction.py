@@ -54,20 +54,26 @@ def reaction_from_rxn_block_with_cleaning(rxn_block: str) -> AllChem.ChemicalRea
         return AllChem.ReactionFromRxnBlock(result, sanitize=True)
 
 
+def _assert_same_molecules(my_mols: List[Chem.Mol], rd_mols: List[Chem.Mol]):
+    assert len(my_mols) == len(rd_mols), "unexpected"
+    for my_mol, rd_mol in zip(my_mols, rd_mols):
+        assert Chem.MolToSmiles(my_mol, True) == Chem.MolToSmiles(rd_mol), "unexpected"
+
+
 # NOTE: Considered using HasSubstructMatch, but it did not yield sufficient matches.
-# Attach titles parsed manually from the reaction block to each Mol object parsed by RDKit as properties using SetProp.
+# The reaction is built from the mol blocks parsed (and titled) in `_parse_rxn_block_manually`, so each mol block is
+# parsed by RDKit only once. Set `verify` to check the molecules against `AllChem.ReactionFromRxnBlock`, which doubles
+# the parse cost.
 # noinspection PyArgumentList
-def reaction_from_rxn_block_with_mol_title(rxn_block: str):
-    reaction = reaction_from_rxn_block_with_cleaning(rxn_block)
+def reaction_from_rxn_block_with_mol_title(rxn_block: str, verify: bool = False) -> AllChem.ChemicalReaction:
     reactants, products = _parse_rxn_block_manually(rxn_block, TITLE_KEY)
-    for my_reactant, rd_reactant in zip(reactants, reaction.GetReactants()):
-        assert Chem.MolToSmiles(my_reactant, True) == Chem.MolToSmiles(rd_reactant), "unexpected"
-        # Chem.AssignStereochemistry(my_reactant, cleanIt=True, force=True)
-        # my_reactant = Chem.RemoveHs(my_reactant)
-        rd_reactant.SetProp(TITLE_KEY, my_reactant.GetProp(TITLE_KEY))
-    for my_product, rd_product in zip(products, reaction.GetProducts()):
-        assert Chem.MolToSmiles(my_product, True) == Chem.MolToSmiles(rd_product), "unexpected"
-        # Chem.AssignStereochemistry(my_product, cleanIt=True, force=True)
-        # my_product = Chem.RemoveHs(my_product)
-        rd_product.SetProp(TITLE_KEY, my_product.GetProp(TITLE_KEY))
+    if verify:
+        rd_reaction = reaction_from_rxn_block_with_cleaning(rxn_block)
+        _assert_same_molecules(reactants, list(rd_reaction.GetReactants()))
+        _assert_same_molecules(products, list(rd_reaction.GetProducts()))
+    reaction = AllChem.ChemicalReaction()
+    for reactant in reactants:
+        reaction.AddReactantTemplate(reactant)
+    for product in products:
+        reaction.AddProductTemplate(product)
     return reaction
@@ -1,8 +1,12 @@
+import logging
 import sys
+from contextvars import ContextVar
 from io import StringIO
-from typing import List, Type
+from typing import List, Type, Optional, Iterable
 
-from rdkit.rdBase import LogToPythonStderr
+from rdkit.rdBase import LogToPythonStderr, LogToPythonLogger
+
+RDKIT_LOGGER_NAME = 'rdkit'
 
 
 class RDKitWarningInterceptor:
@@ -56,38 +60,104 @@ class RDKitWarningInterceptor:
         self._supress = []
 
     def check_error_immediately(self):
-        value = self._pop_value()
-        try:
-            for line in value.split("\n"):
-                if line == "":
-                    continue
-                if "Warning" not in line and "WARNING" not in line:
-                    raise RuntimeError("unexpected")
-                # NOTE: using 'if' instead of 'elif' because multiple warnings can be included in one line
-                if "ambiguous stereochemistry" in value:
-                    # Warning: ambiguous stereochemistry - linear bond arrangement  NOTE: more patterns?
-                    raise AmbiguousStereoChemistryWarningException(value)
-                if "molecule is tagged as 3D, but all Z coords are zero and 2D stereo markers have been found, marking the mol as 2D" in value:
-                    raise Tagged3DBut2DMarkersFoundException(value)
-                if "Proton(s) added/removed" in value:
-                    raise ProtonsAddedOrRemovedWarningException(value)
-                if "Metal was disconnected" in value:
-                    raise MetalWasDisconnectedWarningException(value)
-                if "Omitted undefined stereo" in value:
-                    raise OmittedUndefinedStereoWarningException(value)
-                if "Charges were rearranged" in value:
-                    raise ChargesWereRearrangedWarningException(value)
-                if "not removing hydrogen atom without neighbors" in value:
-                    raise NotRemovingHydrogenAtomWithoutNeighbors(value)
-                if "not removing hydrogen atom with dummy atom neighbors" in value:
-                    raise NotRemovingHydrogenAtomWithDummyAtomNeighbors(value)
-
-                raise ValueError(f"undefined warning has thrown! Add error handling. content: {value}")
-        except Exception as e:
-            if isinstance(e, tuple(self._supress)):
-                print(f"\n LOG: The following warning is ignored \n {e}")
-            else:
-                raise e
+        check_rdkit_warnings(self._pop_value(), self._supress)
+
+
+def raise_for_rdkit_warnings(value: str):
+    """
+    Raises the exception corresponding to the RDKit warnings in `value` (log lines). Does nothing for an empty value.
+    """
+    for line in value.split("\n"):
+        if line == "":
+            continue
+        if "Warning" not in line and "WARNING" not in line:
+            raise RuntimeError("unexpected")
+        # NOTE: using 'if' instead of 'elif' because multiple warnings can be included in one line
+        if "ambiguous stereochemistry" in value:
+            # Warning: ambiguous stereochemistry - linear bond arrangement  NOTE: more patterns?
+            raise AmbiguousStereoChemistryWarningException(value)
+        if "molecule is tagged as 3D, but all Z coords are zero and 2D stereo markers have been found, marking the mol as 2D" in value:
+            raise Tagged3DBut2DMarkersFoundException(value)
+        if "Proton(s) added/removed" in value:
+            raise ProtonsAddedOrRemovedWarningException(value)
+        if "Metal was disconnected" in value:
+            raise MetalWasDisconnectedWarningException(value)
+        if "Omitted undefined stereo" in value:
+            raise OmittedUndefinedStereoWarningException(value)
+        if "Charges were rearranged" in value:
+            raise ChargesWereRearrangedWarningException(value)
+        if "not removing hydrogen atom without neighbors" in value:
+            raise NotRemovingHydrogenAtomWithoutNeighbors(value)
+        if "not removing hydrogen atom with dummy atom neighbors" in value:
+            raise NotRemovingHydrogenAtomWithDummyAtomNeighbors(value)
+
+        raise ValueError(f"undefined warning has thrown! Add error handling. content: {value}")
+
+
+def check_rdkit_warnings(value: str, ignored: Iterable[Type[Exception]] = ()):
+    """
+    `raise_for_rdkit_warnings`, except that the warnings of the `ignored` exception types are only logged.
+    """
+    try:
+        raise_for_rdkit_warnings(value)
+    except Exception as e:
+        if isinstance(e, tuple(ignored)):
+            print(f"\n LOG: The following warning is ignored \n {e}")
+        else:
+            raise e
+
+
+# The log messages of the current `RDKitWarningCapture`, or None outside of a capture. Each thread (and asyncio task)
+# has its own value, so concurrent captures do not see each other's warnings.
+_captured_messages: ContextVar[Optional[List[str]]] = ContextVar('captured_rdkit_messages', default=None)
+
+
+class _CaptureFilter(logging.Filter):
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        messages = _captured_messages.get()
+        if messages is None:
+            return True
+        messages.append(record.getMessage())
+        # NOTE: Captured records are not emitted, as the interceptor swallows stderr.
+        return False
+
+
+_capture_filter = _CaptureFilter()
+
+
+class RDKitWarningCapture:
+    """
+    Captures the RDKit log of the current thread (or asyncio task) and raises it as exceptions on exit, the same way as
+    `RDKitWarningInterceptor`. The RDKit log is routed to the `rdkit` logger instead of replacing `sys.stderr`, so
+    captures can be used concurrently from multiple threads and can be nested.
+    NOTE: Do not use it at the same time as `RDKitWarningInterceptor`, which routes the RDKit log to stderr.
+    """
+
+    def __init__(self, ignored: Iterable[Type[Exception]] = ()):
+        self._ignored = tuple(ignored)
+        self._messages: Optional[List[str]] = None
+        self._token = None
+
+    def __enter__(self):
+        if self._token is not None:
+            raise RuntimeError("The capture is already in use within another 'with' block.")
+        # NOTE: The log route is process-wide, and `RDKitWarningInterceptor` switches it to stderr. Setting it again is
+        # cheap.
+        LogToPythonLogger()
+        logger = logging.getLogger(RDKIT_LOGGER_NAME)
+        if _capture_filter not in logger.filters:
+            logger.addFilter(_capture_filter)
+        self._messages = []
+        self._token = _captured_messages.set(self._messages)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _captured_messages.reset(self._token)
+        messages = self._messages
+        self._token = None
+        self._messages = None
+        check_rdkit_warnings("\n".join(messages), self._ignored)
 
 
 class AmbiguousStereoChemistryWarningException(Exception):
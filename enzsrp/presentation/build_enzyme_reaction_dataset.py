@@ -1,23 +1,29 @@
+import json
 import os
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from pathlib import Path
-from typing import Optional, List, Set
+from typing import Optional, List, Set, Tuple, Iterable, Dict
 
 import click
 import pandas as pd
-from rdkit.Chem import AllChem
 
 from enzsrp.data.datasource.original.mcsa.original_mcsa_datasource import MCSAResidueSequence, OriginalMCSADataSource
 from enzsrp.data.datasource.original.metacyc.parse_reactions_dat import MetaCycDirectionMapper
 from enzsrp.data.datasource.original.rhea.original_rhea_datasource import OriginalRheaDatasource
+from enzsrp.data.datasource.original.rhea.rhea_reaction import RheaReaction
+from enzsrp.data.datasource.original.rhea.rhea_reaction_cache import DEFAULT_REACTION_CACHE_BYTES
+from enzsrp.data.datasource.original.rhea.tabular_rhea_datasource import TabularRheaDatasource
 from enzsrp.data.datasource.original.uniprot.id_mapping_data_source import IsoformIdMappingDataSource
 from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
 from enzsrp.data.datasource.original.uniprot.uniprot_entity import BindingSite, EntryWithCatalyticActivity, \
-    RheaReference, CatalyticActivity
+    RheaReference, CatalyticActivity, EntryComponent, PhysiologicalReaction
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_consumer import UniprotEntryConsumer, fan_out, \
+    EntryStatsAccumulator
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
 from enzsrp.domain.entity.evidence_and_clusion_ontology import ECO
 from enzsrp.domain.entity.reaction_direciton import ReactionDirection
-from enzsrp.extension.parse_reaction import get_all_mol_names_in_rxn
 from enzsrp.utils import env_var_names
 from enzsrp.utils.list_utils import get_first_from_single_set
 
@@ -38,14 +44,13 @@ def data_formatter(data_id: str, primary_accession: str,
                    physiological_rxn_has_exp_evidence: Optional[bool],
                    rhea_master_id: str,
                    rhea_id: str,
-                   rhea_rxn: AllChem.ChemicalReaction,
+                   rhea_rxn: RheaReaction,
                    binding_site_all: List[BindingSite],
                    binding_site_exp: List[BindingSite],
                    mcsa_residues: Optional[Set[MCSAResidueSequence]],
                    direction_source: DirectionSource,
                    rxn_ecos: Optional[List[ECO]],
                    phy_rxn_ecos: Optional[List[ECO]]):
-    rhea_rxn = AllChem.ReactionToSmiles(rhea_rxn)
     binding_site_all_sorted = sorted([site.location.string_notation for site in binding_site_all])
     binding_site_exp_sorted = sorted([site.location.string_notation for site in binding_site_exp])
     sorted_mcsa_residues = sorted(
@@ -62,7 +67,7 @@ def data_formatter(data_id: str, primary_accession: str,
         "rxn_has_exp_evidence": rxn_has_exp_evidence,
         "rhea_master_id": rhea_master_id,
         "rhea_id": rhea_id,
-        "rxn": rhea_rxn,
+        "rxn": rhea_rxn.smiles,
         "binding_site_all": "|".join(binding_site_all_sorted),
         "binding_site_exp": "|".join(binding_site_exp_sorted),
         "mcsa_residues": "|".join(sorted_mcsa_residues) if sorted_mcsa_residues is not None else None,
@@ -72,15 +77,15 @@ def data_formatter(data_id: str, primary_accession: str,
     }
 
 
-def get_binding_site(binding_sites: List[BindingSite], rxn: AllChem.ChemicalReaction, only_exp: bool):
+def get_binding_site(binding_sites: List[BindingSite], rxn: RheaReaction, only_exp: bool):
     if only_exp:
         return [site for site in binding_sites if
                 any([evidence.type.value == ECO.EXPERIMENTAL.value for evidence in
                      site.evidences]) and site.ligand.ligand_id is not None and site.
-                ligand.ligand_id.id in get_all_mol_names_in_rxn(rxn)]
+                ligand.ligand_id.id in rxn.mol_titles]
     else:
         return [site for site in binding_sites if
-                site.ligand.ligand_id is not None and site.ligand.ligand_id.id in get_all_mol_names_in_rxn(rxn)]
+                site.ligand.ligand_id is not None and site.ligand.ligand_id.id in rxn.mol_titles]
 
 
 class ActivityDiscardReason(Enum):
@@ -93,7 +98,12 @@ class DirectionDiscardReason(Enum):
     FAILED_RHEA_ID_TO_RXN_MAPPING = 'Failed to map rhea id to reaction'
 
 
-class EnzymeReactionDatasetBuilder:
+class EnzymeReactionDatasetBuilder(UniprotEntryConsumer):
+    # Entry components read for every entry while building the dataset. The others are built only if accessed
+    # (e.g. features are read only for activities on a PTM molecule).
+    ENTRY_PROJECTION = frozenset({EntryComponent.BINDING_SITES, EntryComponent.ALTERNATIVE_PRODUCTS_DATA})
+    # Number of entries whose Rhea reactions are prefetched together
+    PREFETCH_BATCH_SIZE = 2000
     ALLOWED_DIRECTION_SETS = [
         {ReactionDirection.LEFT_TO_RIGHT},
         {ReactionDirection.RIGHT_TO_LEFT},
@@ -103,19 +113,56 @@ class EnzymeReactionDatasetBuilder:
     def __init__(self, uniprot_entries_json: Path, uniprot_isoform_uniparc_mapping_json: Path, rhea_rxn_dir: Path,
                  rhea_2_metacyc_file: Path, rhea_directions_file: Path, mcsa_data_dir: Optional[Path],
                  metacyc_reactions_dat: Optional[Path], output_path: Path, use_undefined_direction_rxn: bool,
-                 allow_non_exp_evidence: bool):
-        self.source = OriginalUniprotDataSource(uniprot_entries_json)
-        self.rhea_source = OriginalRheaDatasource(rhea_rxn_dir=rhea_rxn_dir, rhea2metacyc=rhea_2_metacyc_file,
-                                                  rhea_directions=rhea_directions_file)
-        self.isoform_source = IsoformIdMappingDataSource(uniprot_isoform_uniparc_mapping_json)
+                 allow_non_exp_evidence: bool, n_workers: int = 1, uniprot_snapshot_dir: Optional[Path] = None,
+                 entry_filter: Optional[UniprotEntryFilter] = None, sample_size: Optional[int] = None,
+                 sample_seed: int = 0, rhea_reaction_store: Optional[Path] = None,
+                 rhea_cache_bytes: Optional[int] = DEFAULT_REACTION_CACHE_BYTES,
+                 rhea_reaction_smiles_file: Optional[Path] = None,
+                 rhea_reaction_participants_file: Optional[Path] = None,
+                 isoform_sequence_sidecar: Optional[Path] = None):
+        """
+        If `rhea_reaction_smiles_file` and `rhea_reaction_participants_file` are given, Rhea reactions are read from
+        them (`TabularRheaDatasource`) instead of the rxn files, and `rhea_rxn_dir` is not used.
+        """
+        self.source = OriginalUniprotDataSource(uniprot_entries_json, n_workers=n_workers,
+                                                snapshot_dir=uniprot_snapshot_dir, projection=self.ENTRY_PROJECTION,
+                                                entry_filter=entry_filter)
+        if (rhea_reaction_smiles_file is None) != (rhea_reaction_participants_file is None):
+            raise ValueError("Both the Rhea reaction SMILES file and the reaction participants file are required")
+        if rhea_reaction_smiles_file is not None:
+            self.rhea_source = TabularRheaDatasource(rhea_reaction_smiles=rhea_reaction_smiles_file,
+                                                     rhea_reaction_participants=rhea_reaction_participants_file,
+                                                     rhea2metacyc=rhea_2_metacyc_file,
+                                                     rhea_directions=rhea_directions_file)
+        else:
+            self.rhea_source = OriginalRheaDatasource(rhea_rxn_dir=rhea_rxn_dir, rhea2metacyc=rhea_2_metacyc_file,
+                                                      rhea_directions=rhea_directions_file,
+                                                      reaction_store=rhea_reaction_store,
+                                                      reaction_cache_bytes=rhea_cache_bytes)
+        self.isoform_source = IsoformIdMappingDataSource(uniprot_isoform_uniparc_mapping_json,
+                                                         sequence_sidecar_path=isoform_sequence_sidecar)
 
-        self.mcsa_source = OriginalMCSADataSource(mcsa_data_dir) if mcsa_data_dir is not None else None
+        self.mcsa_source = OriginalMCSADataSource(mcsa_data_dir,
+                                                  n_workers=n_workers) if mcsa_data_dir is not None else None
         self.metacyc_mapper = MetaCycDirectionMapper(
             metacyc_reactions_dat) if metacyc_reactions_dat is not None else None
 
         self.save_path = output_path
         self.use_undefined_direction_rxn = use_undefined_direction_rxn
         self.allow_non_exp_evidence = allow_non_exp_evidence
+        self.sample_size = sample_size
+        self.sample_seed = sample_seed
+        self.n_workers = n_workers
+        self._data = []
+        self._skipped_activities = []
+        self._skipped_directions = []
+        self._pending_entries: List[EntryWithCatalyticActivity] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _stream_entries(self) -> Iterable[EntryWithCatalyticActivity]:
+        if self.sample_size is not None:
+            return self.source.sample_entries(self.sample_size, seed=self.sample_seed)
+        return self.source.stream_entries_with_catalytic_activity(executor=self._executor)
 
     def _mapping_isoform(self, entry: EntryWithCatalyticActivity, isoform_ids):
         assert isoform_ids is not None
@@ -158,80 +205,83 @@ class EnzymeReactionDatasetBuilder:
         assert len(directions) == 0 or set(directions) in self.ALLOWED_DIRECTION_SETS
         return directions
 
-    def construct_full_directed_dataset(self) -> pd.DataFrame:
-        data = []
-        skipped_activities = []
-        skipped_directions = []
-        for entry in self.source.stream_entries_with_catalytic_activity():
-            mcsa_residues = None
-            if self.mcsa_source is not None:
-                mcsa_residues = self.mcsa_source.get_residues_by_entry(entry)
-            for activity in entry.catalytic_activities:
-                if self.allow_non_exp_evidence:
-                    verified_phy_rxns = [phy_rxn for phy_rxn in activity.phy_reactions]
-                else:
-                    verified_phy_rxns = [phy_rxn for phy_rxn in activity.phy_reactions if
-                                         phy_rxn.has_exp_evidence or activity.reaction.has_exp_evidence]
-                direction_source = None
-                if len(verified_phy_rxns) >= 1:
-                    direction_source = DirectionSource.UNIPROT
-                    for phy_rxn in verified_phy_rxns:
-                        # Isoform or PTM processing
-                        isoform_main_id, ptm_key, isoform_or_ptm_seq = None, None, None
-                        if activity.has_isoform_molecule:
-                            isoform_main_id, isoform_or_ptm_seq = self.get_isoform_sequence(entry, activity)
-                        elif activity.has_non_isoform_molecule:
-                            ptm_key, isoform_or_ptm_seq = self.get_post_translational_mod_seq(entry, activity)
-
-                        rhea_id = self.rhea_source.map_master_id_to_direction_id(
-                            activity.reaction.rhea_main_reference.db_id.id_intstr,
-                            phy_rxn.direction.rhea_diction_name)
-                        if not (rxn := self.rhea_source.get_single_reaction_with_cache(rhea_id)):
-                            skipped_directions.append({
-                                'accession': entry.primary_accession,
-                                'reaction': activity.reaction.name,
-                                'rhea_id': rhea_id,
-                                'direction': phy_rxn.direction.short_name,
-                                'reason': DirectionDiscardReason.FAILED_RHEA_ID_TO_RXN_MAPPING.value})
-                            continue
-                        data.append(data_formatter(
-                            data_id=self.construct_unique_id(entry.primary_accession, isoform_main_id,
-                                                             activity.reaction.rhea_main_reference, phy_rxn.direction),
-                            primary_accession=entry.primary_accession,
-                            isoform_id=isoform_main_id,
-                            ptm_key=ptm_key,
-                            sequence=isoform_or_ptm_seq if isoform_or_ptm_seq else entry.sequence,
-                            ec_number=activity.reaction.ec_number,
-                            has_physiological_rxn=True,
-                            physiological_rxn_has_exp_evidence=phy_rxn.has_exp_evidence,
-                            rxn_has_exp_evidence=activity.reaction.has_exp_evidence,
-                            rhea_master_id=activity.reaction.rhea_main_reference.db_id.id_intstr,
-                            rhea_id=rhea_id,
-                            rhea_rxn=rxn,
-                            binding_site_all=get_binding_site(entry.binding_sites, rxn,
-                                                              only_exp=False),
-                            binding_site_exp=get_binding_site(entry.binding_sites, rxn,
-                                                              only_exp=True),
-                            mcsa_residues=mcsa_residues,
-                            direction_source=direction_source,
-                            rxn_ecos=[evidence.type for evidence in activity.reaction.evidences],
-                            phy_rxn_ecos=[evidence.type for evidence in activity.reaction.evidences]))
-                else:
-                    # Direction will be defined by MetaCyc data
-                    if not activity.reaction.has_exp_evidence and not self.allow_non_exp_evidence:
-                        # no exp evidence
-                        skipped_activities.append({
-                            'accession': entry.primary_accession,
-                            'reaction': activity.reaction.name,
-                            'reason': ActivityDiscardReason.NO_EXP_EVIDENCE.value})
-                        continue
-                    if not activity.reaction.has_rhea_rxn_reference:
-                        # no Rhea reference
-                        skipped_activities.append({
-                            'accession': entry.primary_accession,
-                            'reaction': activity.reaction.name,
-                            'reason': ActivityDiscardReason.NO_RHEA_REFERENCE.value})
-                        continue
+    def _get_verified_phy_rxns(self, activity: CatalyticActivity) -> List[PhysiologicalReaction]:
+        if self.allow_non_exp_evidence:
+            return [phy_rxn for phy_rxn in activity.phy_reactions]
+        return [phy_rxn for phy_rxn in activity.phy_reactions if
+                phy_rxn.has_exp_evidence or activity.reaction.has_exp_evidence]
+
+    def _plan_entry(self, entry: EntryWithCatalyticActivity) -> Tuple[Set[str], Dict[int, List[ReactionDirection]]]:
+        """
+        Returns the direction-specific Rhea IDs `_process_entry` will look up for the entry, and the MetaCyc directions
+        by activity index so that `_process_entry` does not look them up again. The IDs only decide what is prefetched,
+        so an ID missed here is still resolved lazily.
+        """
+        rhea_ids = set()
+        metacyc_directions = {}
+        for i, activity in enumerate(entry.catalytic_activities):
+            verified_phy_rxns = self._get_verified_phy_rxns(activity)
+            if len(verified_phy_rxns) >= 1:
+                directions = [phy_rxn.direction for phy_rxn in verified_phy_rxns]
+            elif not activity.reaction.has_exp_evidence and not self.allow_non_exp_evidence:
+                continue
+            elif not activity.reaction.has_rhea_rxn_reference:
+                continue
+            else:
+                directions = []
+                if self.metacyc_mapper is not None:
+                    directions = self.get_metacyc_directions(activity.reaction.rhea_main_reference)
+                    metacyc_directions[i] = directions
+                if self.use_undefined_direction_rxn and len(directions) == 0:
+                    directions = [ReactionDirection.LEFT_TO_RIGHT]
+            master_ref = activity.reaction.rhea_main_reference
+            if master_ref is None:
+                continue
+            for direction in directions:
+                try:
+                    rhea_ids.add(self.rhea_source.map_master_id_to_direction_id(master_ref.db_id.id_intstr,
+                                                                                direction.rhea_diction_name))
+                except ValueError:
+                    continue
+        return rhea_ids, metacyc_directions
+
+    def _process_pending_entries(self):
+        planned_metacyc_directions = [None] * len(self._pending_entries)
+        if self._executor is not None:
+            rhea_ids = set()
+            for i, entry in enumerate(self._pending_entries):
+                entry_rhea_ids, planned_metacyc_directions[i] = self._plan_entry(entry)
+                rhea_ids.update(entry_rhea_ids)
+            self.rhea_source.prefetch_reactions(rhea_ids, self._executor)
+        try:
+            for entry, metacyc_directions in zip(self._pending_entries, planned_metacyc_directions):
+                self._process_entry(entry, metacyc_directions)
+        finally:
+            self.rhea_source.release_prefetched_reactions()
+        self._pending_entries.clear()
+
+    def consume(self, entry: EntryWithCatalyticActivity):
+        self._pending_entries.append(entry)
+        if len(self._pending_entries) >= self.PREFETCH_BATCH_SIZE:
+            self._process_pending_entries()
+
+    def close(self):
+        self._process_pending_entries()
+
+    def _process_entry(self, entry: EntryWithCatalyticActivity,
+                       metacyc_directions: Optional[Dict[int, List[ReactionDirection]]] = None):
+        """
+        `metacyc_directions` are the MetaCyc directions by activity index returned by `_plan_entry`, if planned.
+        """
+        mcsa_residues = None
+        if self.mcsa_source is not None:
+            mcsa_residues = self.mcsa_source.get_residues_by_entry(entry)
+        for i, activity in enumerate(entry.catalytic_activities):
+            verified_phy_rxns = self._get_verified_phy_rxns(activity)
+            direction_source = None
+            if len(verified_phy_rxns) >= 1:
+                direction_source = DirectionSource.UNIPROT
+                for phy_rxn in verified_phy_rxns:
                     # Isoform or PTM processing
                     isoform_main_id, ptm_key, isoform_or_ptm_seq = None, None, None
                     if activity.has_isoform_molecule:
@@ -239,68 +289,147 @@ class EnzymeReactionDatasetBuilder:
                     elif activity.has_non_isoform_molecule:
                         ptm_key, isoform_or_ptm_seq = self.get_post_translational_mod_seq(entry, activity)
 
-                    cyc_directions = []
-                    if self.metacyc_mapper is not None:
-                        ref = activity.reaction.rhea_main_reference
+                    rhea_id = self.rhea_source.map_master_id_to_direction_id(
+                        activity.reaction.rhea_main_reference.db_id.id_intstr,
+                        phy_rxn.direction.rhea_diction_name)
+                    if not (rxn := self.rhea_source.get_rhea_reaction_with_cache(rhea_id)):
+                        self._skipped_directions.append({
+                            'accession': entry.primary_accession,
+                            'reaction': activity.reaction.name,
+                            'rhea_id': rhea_id,
+                            'direction': phy_rxn.direction.short_name,
+                            'reason': DirectionDiscardReason.FAILED_RHEA_ID_TO_RXN_MAPPING.value})
+                        continue
+                    self._data.append(data_formatter(
+                        data_id=self.construct_unique_id(entry.primary_accession, isoform_main_id,
+                                                         activity.reaction.rhea_main_reference, phy_rxn.direction),
+                        primary_accession=entry.primary_accession,
+                        isoform_id=isoform_main_id,
+                        ptm_key=ptm_key,
+                        sequence=isoform_or_ptm_seq if isoform_or_ptm_seq else entry.sequence,
+                        ec_number=activity.reaction.ec_number,
+                        has_physiological_rxn=True,
+                        physiological_rxn_has_exp_evidence=phy_rxn.has_exp_evidence,
+                        rxn_has_exp_evidence=activity.reaction.has_exp_evidence,
+                        rhea_master_id=activity.reaction.rhea_main_reference.db_id.id_intstr,
+                        rhea_id=rhea_id,
+                        rhea_rxn=rxn,
+                        binding_site_all=get_binding_site(entry.binding_sites, rxn,
+                                                          only_exp=False),
+                        binding_site_exp=get_binding_site(entry.binding_sites, rxn,
+                                                          only_exp=True),
+                        mcsa_residues=mcsa_residues,
+                        direction_source=direction_source,
+                        rxn_ecos=[evidence.type for evidence in activity.reaction.evidences],
+                        phy_rxn_ecos=[evidence.type for evidence in activity.reaction.evidences]))
+            else:
+                # Direction will be defined by MetaCyc data
+                if not activity.reaction.has_exp_evidence and not self.allow_non_exp_evidence:
+                    # no exp evidence
+                    self._skipped_activities.append({
+                        'accession': entry.primary_accession,
+                        'reaction': activity.reaction.name,
+                        'reason': ActivityDiscardReason.NO_EXP_EVIDENCE.value})
+                    continue
+                if not activity.reaction.has_rhea_rxn_reference:
+                    # no Rhea reference
+                    self._skipped_activities.append({
+                        'accession': entry.primary_accession,
+                        'reaction': activity.reaction.name,
+                        'reason': ActivityDiscardReason.NO_RHEA_REFERENCE.value})
+                    continue
+                # Isoform or PTM processing
+                isoform_main_id, ptm_key, isoform_or_ptm_seq = None, None, None
+                if activity.has_isoform_molecule:
+                    isoform_main_id, isoform_or_ptm_seq = self.get_isoform_sequence(entry, activity)
+                elif activity.has_non_isoform_molecule:
+                    ptm_key, isoform_or_ptm_seq = self.get_post_translational_mod_seq(entry, activity)
+
+                cyc_directions = []
+                if self.metacyc_mapper is not None:
+                    ref = activity.reaction.rhea_main_reference
+                    if metacyc_directions is not None and i in metacyc_directions:
+                        # NOTE: Copied because the L2R fallback below appends to it.
+                        cyc_directions = list(metacyc_directions[i])
+                    else:
                         cyc_directions = self.get_metacyc_directions(ref)
-                        if len(cyc_directions) != 0:
-                            direction_source = DirectionSource.METACYC
-                    directions = cyc_directions
-                    if self.use_undefined_direction_rxn and len(directions) == 0:
-                        directions.append(ReactionDirection.LEFT_TO_RIGHT)
-                        direction_source = DirectionSource.FORCE_L2R
-                    if len(directions) == 0:
-                        # Reaction direction could not be defined
-                        skipped_activities.append({
+                    if len(cyc_directions) != 0:
+                        direction_source = DirectionSource.METACYC
+                directions = cyc_directions
+                if self.use_undefined_direction_rxn and len(directions) == 0:
+                    directions.append(ReactionDirection.LEFT_TO_RIGHT)
+                    direction_source = DirectionSource.FORCE_L2R
+                if len(directions) == 0:
+                    # Reaction direction could not be defined
+                    self._skipped_activities.append({
+                        'accession': entry.primary_accession,
+                        'reaction': activity.reaction.name,
+                        'reason': ActivityDiscardReason.NO_DIRECTION.value})
+                    continue
+                for direction in directions:
+                    rhea_id = self.rhea_source.map_master_id_to_direction_id(
+                        activity.reaction.rhea_main_reference.db_id.id_intstr,
+                        direction.rhea_diction_name)
+                    if not (rxn := self.rhea_source.get_rhea_reaction_with_cache(rhea_id)):
+                        self._skipped_directions.append({
                             'accession': entry.primary_accession,
                             'reaction': activity.reaction.name,
-                            'reason': ActivityDiscardReason.NO_DIRECTION.value})
+                            'rhea_id': rhea_id,
+                            'direction': direction.short_name,
+                            'reason': DirectionDiscardReason.FAILED_RHEA_ID_TO_RXN_MAPPING.value})
                         continue
-                    for direction in directions:
-                        rhea_id = self.rhea_source.map_master_id_to_direction_id(
-                            activity.reaction.rhea_main_reference.db_id.id_intstr,
-                            direction.rhea_diction_name)
-                        if not (rxn := self.rhea_source.get_single_reaction_with_cache(rhea_id)):
-                            skipped_directions.append({
-                                'accession': entry.primary_accession,
-                                'reaction': activity.reaction.name,
-                                'rhea_id': rhea_id,
-                                'direction': direction.short_name,
-                                'reason': DirectionDiscardReason.FAILED_RHEA_ID_TO_RXN_MAPPING.value})
-                            continue
-                        data.append(data_formatter(
-                            data_id=self.construct_unique_id(entry.primary_accession,
-                                                             isoform_main_id,
-                                                             activity.reaction.rhea_main_reference,
-                                                             direction),
-                            primary_accession=entry.primary_accession,
-                            isoform_id=isoform_main_id,
-                            ptm_key=ptm_key,
-                            sequence=isoform_or_ptm_seq if isoform_or_ptm_seq else entry.sequence,
-                            ec_number=activity.reaction.ec_number,
-                            has_physiological_rxn=False,
-                            physiological_rxn_has_exp_evidence=None,
-                            rxn_has_exp_evidence=activity.reaction.has_exp_evidence,
-                            rhea_master_id=activity.reaction.rhea_main_reference.db_id.id_intstr,
-                            rhea_id=rhea_id,
-                            rhea_rxn=rxn,
-                            binding_site_all=get_binding_site(entry.binding_sites, rxn,
-                                                              only_exp=False),
-                            binding_site_exp=get_binding_site(entry.binding_sites, rxn,
-                                                              only_exp=True),
-                            mcsa_residues=mcsa_residues,
-                            direction_source=direction_source,
-                            rxn_ecos=[evidence.type for evidence in activity.reaction.evidences],
-                            phy_rxn_ecos=None))
-
-        df = pd.DataFrame(data)
+                    self._data.append(data_formatter(
+                        data_id=self.construct_unique_id(entry.primary_accession,
+                                                         isoform_main_id,
+                                                         activity.reaction.rhea_main_reference,
+                                                         direction),
+                        primary_accession=entry.primary_accession,
+                        isoform_id=isoform_main_id,
+                        ptm_key=ptm_key,
+                        sequence=isoform_or_ptm_seq if isoform_or_ptm_seq else entry.sequence,
+                        ec_number=activity.reaction.ec_number,
+                        has_physiological_rxn=False,
+                        physiological_rxn_has_exp_evidence=None,
+                        rxn_has_exp_evidence=activity.reaction.has_exp_evidence,
+                        rhea_master_id=activity.reaction.rhea_main_reference.db_id.id_intstr,
+                        rhea_id=rhea_id,
+                        rhea_rxn=rxn,
+                        binding_site_all=get_binding_site(entry.binding_sites, rxn,
+                                                          only_exp=False),
+                        binding_site_exp=get_binding_site(entry.binding_sites, rxn,
+                                                          only_exp=True),
+                        mcsa_residues=mcsa_residues,
+                        direction_source=direction_source,
+                        rxn_ecos=[evidence.type for evidence in activity.reaction.evidences],
+                        phy_rxn_ecos=None))
+
+    def construct_full_directed_dataset(self, extra_consumers: Iterable[UniprotEntryConsumer] = ()) -> pd.DataFrame:
+        """
+        `extra_consumers` receive the same entries in the same pass, e.g. `EntryStatsAccumulator`.
+        """
+        self._data = []
+        self._skipped_activities = []
+        self._skipped_directions = []
+        # NOTE: With multiple workers, the Rhea reactions needed by each batch of entries are parsed in parallel
+        # before the rows of the batch are generated. The same pool parses the UniProt entry shards, so that
+        # `n_workers` processes are started in total.
+        self._executor = ProcessPoolExecutor(max_workers=self.n_workers) if self.n_workers > 1 else None
+        try:
+            fan_out(self._stream_entries(), [self, *extra_consumers])
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        print(f"Rhea reaction cache: {self.rhea_source.single_reaction_cache.stats()}")
+
+        df = pd.DataFrame(self._data)
         assert df.duplicated().sum() == 0, "Unexpected behavior: duplicated rows has found"
         self.save_path.parent.mkdir(parents=True, exist_ok=True)
         df.to_csv(self.save_path, index=False)
 
-        df1 = pd.DataFrame(skipped_activities)
+        df1 = pd.DataFrame(self._skipped_activities)
         df1.to_csv(self.save_path.parent.joinpath(f"skipped_activities_{self.save_path.stem}.csv"), index=False)
-        df2 = pd.DataFrame(skipped_directions)
+        df2 = pd.DataFrame(self._skipped_directions)
         df2.to_csv(self.save_path.parent.joinpath(f"skipped_directions_{self.save_path.stem}.csv"), index=False)
         return df
 
@@ -331,7 +460,8 @@ class EnzymeReactionDatasetBuilder:
               help='Specify the file path for the downloaded isoform mapping file')
 @click.option('--rhea-rxn-dir', type=click.Path(exists=True),
               default=os.getenv(env_var_names.original_rhea_rxn_dir),
-              help='Specify the dir path that contains Rhea reactions rxn files')
+              help='Specify the dir path that contains Rhea reactions rxn files, or the Rhea rxn archive (.tar or '
+                   '.tar.gz) itself')
 @click.option('--rhea-2-metacyc-file', type=click.Path(exists=True),
               default=os.getenv(env_var_names.original_rhea2metacyc_file),
               help='Specify rhea2metacyc.tsv file path downloaded from Rhea')
@@ -356,6 +486,55 @@ class EnzymeReactionDatasetBuilder:
                    ' cases because of its data size')
 @click.option('--allow-non-exp-evidence', is_flag=True,
               help='')
+@click.option('--n-workers', type=int, default=1,
+              help='Number of worker processes used to parse the UniProt entries JSON and the Rhea reactions. If '
+                   'greater than 1, entries are parsed in parallel byte-range shards, and the Rhea reactions needed '
+                   'by each batch of entries are parsed in parallel before its rows are generated. Both share the '
+                   'same worker processes.')
+@click.option('--uniprot-snapshot-dir', type=click.Path(),
+              default=os.getenv(env_var_names.uniprot_snapshot_dir),
+              help='Specify the dir for the columnar snapshot of parsed UniProt entries. The snapshot is created on the '
+                   'first run and reused while the UniProt entries JSON is unchanged.')
+@click.option('--accession', 'accessions', multiple=True,
+              help='Build the dataset only from the entries with this primary accession. Can be specified multiple '
+                   'times.')
+@click.option('--accession-file', type=click.Path(exists=True),
+              help='Specify a file listing primary accessions, one per line. Combined with `--accession`.')
+@click.option('--ec-prefix', type=str,
+              help='Build the dataset only from the entries having a catalytic activity under this EC class, e.g. '
+                   '1.14.*')
+@click.option('--require-rhea', is_flag=True,
+              help='Build the dataset only from the entries having a catalytic activity with a Rhea reference.')
+@click.option('--sample-size', type=int,
+              help='Build the dataset from this number of randomly chosen entries. Requires the entry index created by '
+                   '`build-uniprot-index`.')
+@click.option('--sample-seed', type=int, default=0,
+              help='Random seed used with `--sample-size`.')
+@click.option('--rhea-reaction-store', type=click.Path(exists=True),
+              default=os.getenv(env_var_names.rhea_reaction_store),
+              help='Specify the Rhea reaction store created by `precompile-rhea`. If specified, Rhea reactions are '
+                   'loaded from the store instead of being parsed from the rxn files.')
+@click.option('--rhea-backend', type=click.Choice(['rxn', 'tabular']), default='rxn',
+              help='`rxn` parses the Rhea rxn files with RDKit. `tabular` reads the reaction SMILES and the reaction '
+                   'participants from `--rhea-reaction-smiles-file` and `--rhea-reaction-participants-file` instead, '
+                   'without RDKit parsing. The `rxn` column then contains Rhea\'s reaction SMILES.')
+@click.option('--rhea-reaction-smiles-file', type=click.Path(exists=True),
+              default=os.getenv(env_var_names.original_rhea_reaction_smiles_file),
+              help='Specify rhea-reaction-smiles.tsv file path downloaded from Rhea. Used with `--rhea-backend '
+                   'tabular`.')
+@click.option('--rhea-reaction-participants-file', type=click.Path(exists=True),
+              default=os.getenv(env_var_names.original_rhea_reaction_participants_file),
+              help='Specify a TSV file with RHEA_ID and CHEBI_ID columns, one row per reaction participant. Used with '
+                   '`--rhea-backend tabular`.')
+@click.option('--rhea-cache-mb', type=int, default=DEFAULT_REACTION_CACHE_BYTES >> 20,
+              help='Memory budget in MB of the parsed Rhea reactions kept in memory. The least recently used '
+                   'reactions are evicted and parsed again if needed.')
+@click.option('--isoform-sequence-sidecar', type=click.Path(),
+              help='Specify a file to which the isoform sequences are written and from which they are memory-mapped, '
+                   'instead of being kept in memory.')
+@click.option('--entry-stats', is_flag=True,
+              help='Count entries and catalytic activities in the same pass and save them as '
+                   '`entry_stats_<output>.json` in the output dir.')
 def build_enzyme_reaction_dataset(
         uniprot_entries_json: str,
         uniprot_isoform_uniparc_mapping_json: str,
@@ -367,20 +546,61 @@ def build_enzyme_reaction_dataset(
         output_dir: str,
         use_undefined_direction_rxn: bool,
         allow_non_exp_evidence,
+        n_workers: int,
+        uniprot_snapshot_dir: Optional[str],
+        accessions: Tuple[str, ...],
+        accession_file: Optional[str],
+        ec_prefix: Optional[str],
+        require_rhea: bool,
+        sample_size: Optional[int],
+        sample_seed: int,
+        rhea_reaction_store: Optional[str],
+        rhea_backend: str,
+        rhea_reaction_smiles_file: Optional[str],
+        rhea_reaction_participants_file: Optional[str],
+        rhea_cache_mb: int,
+        isoform_sequence_sidecar: Optional[str],
+        entry_stats: bool,
 ):
     assert use_undefined_direction_rxn == False, use_undefined_direction_rxn
     print(metacyc_reactions_dat)
+    accession_set = set(accessions)
+    if accession_file is not None:
+        with open(accession_file, 'r') as file:
+            accession_set.update(line.strip() for line in file if line.strip() != '')
+    entry_filter = None
+    if len(accession_set) > 0 or ec_prefix is not None or require_rhea:
+        entry_filter = UniprotEntryFilter(accessions=frozenset(accession_set) if len(accession_set) > 0 else None,
+                                          ec_prefix=ec_prefix, require_rhea=require_rhea)
+    use_tabular_rhea = rhea_backend == 'tabular'
+    if use_tabular_rhea and (rhea_reaction_smiles_file is None or rhea_reaction_participants_file is None):
+        raise ValueError("`--rhea-backend tabular` requires `--rhea-reaction-smiles-file` and "
+                         "`--rhea-reaction-participants-file`")
     output_path = Path(output_dir) / 'enzsrp_full.csv' if allow_non_exp_evidence else Path(output_dir) / 'enzsrp.csv'
     dataset_constructor = EnzymeReactionDatasetBuilder(
         uniprot_entries_json=Path(uniprot_entries_json),
         uniprot_isoform_uniparc_mapping_json=Path(uniprot_isoform_uniparc_mapping_json),
-        rhea_rxn_dir=Path(rhea_rxn_dir),
+        rhea_rxn_dir=Path(rhea_rxn_dir) if rhea_rxn_dir is not None else None,
         rhea_2_metacyc_file=Path(rhea_2_metacyc_file),
         rhea_directions_file=Path(rhea_directions_file),
         mcsa_data_dir=Path(mcsa_data_dir) if mcsa_data_dir is not None else None,
         metacyc_reactions_dat=Path(metacyc_reactions_dat) if metacyc_reactions_dat is not None else None,
         output_path=Path(output_path),
         use_undefined_direction_rxn=use_undefined_direction_rxn,
-        allow_non_exp_evidence=allow_non_exp_evidence
+        allow_non_exp_evidence=allow_non_exp_evidence,
+        n_workers=n_workers,
+        uniprot_snapshot_dir=Path(uniprot_snapshot_dir) if uniprot_snapshot_dir is not None else None,
+        entry_filter=entry_filter,
+        sample_size=sample_size,
+        sample_seed=sample_seed,
+        rhea_reaction_store=Path(rhea_reaction_store) if rhea_reaction_store is not None else None,
+        rhea_cache_bytes=rhea_cache_mb << 20,
+        rhea_reaction_smiles_file=Path(rhea_reaction_smiles_file) if use_tabular_rhea else None,
+        rhea_reaction_participants_file=Path(rhea_reaction_participants_file) if use_tabular_rhea else None,
+        isoform_sequence_sidecar=Path(isoform_sequence_sidecar) if isoform_sequence_sidecar is not None else None
     )
-    dataset_constructor.construct_full_directed_dataset()
+    stats = EntryStatsAccumulator()
+    dataset_constructor.construct_full_directed_dataset(extra_consumers=[stats] if entry_stats else [])
+    if entry_stats:
+        with open(output_path.parent.joinpath(f"entry_stats_{output_path.stem}.json"), 'w') as file:
+            json.dump(stats.to_dict(), file, indent=2)
@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryComponent
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_catalog import EntryCatalogWriter, default_catalog_path
+from enzsrp.utils import env_var_names
+
+
+def _build_uniprot_entry_catalog(uniprot_entries_json: Path, output_path: Optional[Path] = None, n_workers: int = 1,
+                                 uniprot_snapshot_dir: Optional[Path] = None):
+    output_path = output_path if output_path is not None else default_catalog_path(uniprot_entries_json)
+    datasource = OriginalUniprotDataSource(uniprot_entries_json, n_workers=n_workers,
+                                           snapshot_dir=uniprot_snapshot_dir,
+                                           projection=[EntryComponent.ALTERNATIVE_PRODUCTS_DATA])
+    datasource.stream_to_consumers([EntryCatalogWriter(output_path)])
+    print(f"The entry catalog is saved: {output_path}")
+
+
+@click.command()
+@click.option('--uniprot-entries-json', type=click.Path(exists=True),
+              default=os.getenv(env_var_names.original_uniprot_reviewed_catalytic_activity_json_file),
+              help='Specify the file path for the protein data downloaded from UniProt.')
+@click.option('--output-path', type=click.Path(),
+              help='Specify the catalog file path. Defaults to `<uniprot-entries-json>.catalog.sqlite`.')
+@click.option('--n-workers', type=int, default=1,
+              help='Number of worker processes used to parse the UniProt entries JSON.')
+@click.option('--uniprot-snapshot-dir', type=click.Path(),
+              default=os.getenv(env_var_names.uniprot_snapshot_dir),
+              help='Specify the dir for the columnar snapshot of parsed UniProt entries.')
+def build_uniprot_catalog(uniprot_entries_json: Optional[str], output_path: Optional[str], n_workers: int,
+                          uniprot_snapshot_dir: Optional[str]):
+    assert uniprot_entries_json is not None, \
+        (f"Please define {env_var_names.original_uniprot_reviewed_catalytic_activity_json_file} in .env file "
+         f"or pass --uniprot-entries-json argument")
+    _build_uniprot_entry_catalog(Path(uniprot_entries_json),
+                                 output_path=Path(output_path) if output_path is not None else None,
+                                 n_workers=n_workers,
+                                 uniprot_snapshot_dir=Path(
+                                     uniprot_snapshot_dir) if uniprot_snapshot_dir is not None else None)
@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_index import UniprotEntryIndex, default_index_path
+from enzsrp.utils import env_var_names
+from enzsrp.utils.compressed_file import detect_compression
+
+
+def _build_uniprot_entry_index(uniprot_entries_json: Path, output_path: Optional[Path] = None):
+    if detect_compression(uniprot_entries_json) is not None:
+        raise ValueError(f"The entry index requires an uncompressed file: {uniprot_entries_json}")
+    output_path = output_path if output_path is not None else default_index_path(uniprot_entries_json)
+    index = UniprotEntryIndex.build(uniprot_entries_json)
+    index.save(output_path)
+    print(f"{len(index)} entries are indexed: {output_path}")
+
+
+@click.command()
+@click.option('--uniprot-entries-json', type=click.Path(exists=True),
+              default=os.getenv(env_var_names.original_uniprot_reviewed_catalytic_activity_json_file),
+              help='Specify the file path for the protein data downloaded from UniProt.')
+@click.option('--output-path', type=click.Path(),
+              help='Specify the index file path. Defaults to `<uniprot-entries-json>.index.json`.')
+def build_uniprot_index(uniprot_entries_json: Optional[str], output_path: Optional[str]):
+    assert uniprot_entries_json is not None, \
+        (f"Please define {env_var_names.original_uniprot_reviewed_catalytic_activity_json_file} in .env file "
+         f"or pass --uniprot-entries-json argument")
+    _build_uniprot_entry_index(Path(uniprot_entries_json),
+                               output_path=Path(output_path) if output_path is not None else None)
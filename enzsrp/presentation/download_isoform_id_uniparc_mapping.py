@@ -6,18 +6,48 @@ from typing import Optional
 import click
 
 from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
-from enzsrp.data.datasource.remote.uniprot_id_mapping_ext import submit_id_mapping_task_and_download_file
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryComponent
+from enzsrp.data.datasource.remote.uniprot_id_mapping_ext import submit_id_mapping_task_and_download_file, \
+    submit_id_mapping_task_and_stream_to_file, find_interrupted_download
 from enzsrp.utils import env_var_names
 
 
-def _download_isoform_id_uniparc_mapping(uniprot_entries_json: Path, output_dir: Path):
-    datasource = OriginalUniprotDataSource(uniprot_entries_json)
-    isoform_ids = datasource.get_all_isoform_ids()
+FROM_DB = 'UniProtKB_AC-ID'
+TO_DB = 'UniParc'
+
+
+def _default_output_file_path(output_dir: Path, isoform_ids, stream: bool, id_mapping_cache: Optional[Path]) -> Path:
+    if stream:
+        # NOTE: The file name contains the date, so an interrupted download from an earlier day is looked up explicitly.
+        candidates = sorted(output_dir.glob('idmapping_*_isoform_uniparc.jsonl'), reverse=True)
+        interrupted = find_interrupted_download(candidates, from_db=FROM_DB, to_db=TO_DB, ids=isoform_ids,
+                                                cache_path=id_mapping_cache)
+        if interrupted is not None:
+            print(f"resuming the interrupted download: {interrupted}")
+            return interrupted
     formatted_date = datetime.today().strftime('%Y_%m_%d')
-    output_file_path = output_dir.joinpath(f"idmapping_{formatted_date}_isoform_uniparc.json")
+    extension = 'jsonl' if stream else 'json'
+    return output_dir.joinpath(f"idmapping_{formatted_date}_isoform_uniparc.{extension}")
+
+
+def _download_isoform_id_uniparc_mapping(uniprot_entries_json: Path, output_dir: Optional[Path], n_workers: int = 1,
+                                         uniprot_snapshot_dir: Optional[Path] = None,
+                                         id_mapping_cache: Optional[Path] = None, stream: bool = False,
+                                         output_file: Optional[Path] = None):
+    """
+    The result is written to `output_file` if given. Otherwise, it is written to a file named with today's date in
+    `output_dir`.
+    """
+    datasource = OriginalUniprotDataSource(uniprot_entries_json, n_workers=n_workers,
+                                           snapshot_dir=uniprot_snapshot_dir,
+                                           projection=[EntryComponent.ALTERNATIVE_PRODUCTS_DATA])
+    isoform_ids = datasource.get_all_isoform_ids()
+    output_file_path = output_file if output_file is not None else _default_output_file_path(
+        output_dir, isoform_ids, stream, id_mapping_cache)
     output_file_path.parent.mkdir(parents=True, exist_ok=True)
-    submit_id_mapping_task_and_download_file(from_db='UniProtKB_AC-ID', to_db='UniParc', ids=isoform_ids,
-                                             output_file_path=output_file_path)
+    download = submit_id_mapping_task_and_stream_to_file if stream else submit_id_mapping_task_and_download_file
+    download(from_db=FROM_DB, to_db=TO_DB, ids=isoform_ids, output_file_path=output_file_path,
+             cache_path=id_mapping_cache)
 
 
 @click.command()
@@ -28,9 +58,34 @@ def _download_isoform_id_uniparc_mapping(uniprot_entries_json: Path, output_dir:
 @click.option('--output-dir', type=click.Path(),
               default=os.getenv(env_var_names.output_dir),
               help='Specify the directory where the output file will be saved.')
-def download_isoform_id_uniparc_mapping(uniprot_entries_json: Optional[str], output_dir: Optional[str]):
+@click.option('--output-file', type=click.Path(),
+              help='Specify the output file instead of the file named with the date in the output dir.')
+@click.option('--n-workers', type=int, default=1,
+              help='Number of worker processes used to parse the UniProt entries JSON.')
+@click.option('--uniprot-snapshot-dir', type=click.Path(),
+              default=os.getenv(env_var_names.uniprot_snapshot_dir),
+              help='Specify the dir for the columnar snapshot of parsed UniProt entries.')
+@click.option('--id-mapping-cache', type=click.Path(),
+              default=os.getenv(env_var_names.id_mapping_cache),
+              help='Specify the SQLite file caching the ID mapping results. Only the isoform IDs not in the cache are '
+                   'submitted.')
+@click.option('--stream', is_flag=True, default=False,
+              help='Write the result pages to a JSON lines file as they arrive. '
+                   'An interrupted download is resumed when the command is run again.')
+def download_isoform_id_uniparc_mapping(uniprot_entries_json: Optional[str], output_dir: Optional[str],
+                                        output_file: Optional[str], n_workers: int, uniprot_snapshot_dir: Optional[str],
+                                        id_mapping_cache: Optional[str], stream: bool):
     assert uniprot_entries_json is not None, \
         (f"Please define {env_var_names.original_uniprot_reviewed_catalytic_activity_json_file} in .env file "
          f"or pass --output-dir argument")
-    assert output_dir is not None, f"Please define {env_var_names.output_dir} in .env file or pass --output-dir argument"
-    _download_isoform_id_uniparc_mapping(uniprot_entries_json=Path(uniprot_entries_json), output_dir=Path(output_dir))
+    assert output_dir is not None or output_file is not None, \
+        f"Please define {env_var_names.output_dir} in .env file or pass --output-dir or --output-file argument"
+    _download_isoform_id_uniparc_mapping(uniprot_entries_json=Path(uniprot_entries_json),
+                                         output_dir=Path(output_dir) if output_dir is not None else None,
+                                         output_file=Path(output_file) if output_file is not None else None,
+                                         n_workers=n_workers,
+                                         uniprot_snapshot_dir=Path(
+                                             uniprot_snapshot_dir) if uniprot_snapshot_dir is not None else None,
+                                         id_mapping_cache=Path(
+                                             id_mapping_cache) if id_mapping_cache is not None else None,
+                                         stream=stream)
@@ -0,0 +1,25 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from enzsrp.data.datasource.original.rhea.rhea_reaction_store import precompile_rhea_reactions
+from enzsrp.utils import env_var_names
+
+
+@click.command()
+@click.option('--rhea-rxn-dir', type=click.Path(exists=True),
+              default=os.getenv(env_var_names.original_rhea_rxn_dir),
+              help='Specify the directory of the rxn files downloaded from Rhea, or the Rhea rxn archive itself')
+@click.option('--output-path', type=click.Path(),
+              default=os.getenv(env_var_names.rhea_reaction_store),
+              help='Specify the file path of the Rhea reaction store')
+@click.option('--n-workers', type=int, default=1,
+              help='Number of worker processes used to parse the rxn files.')
+def precompile_rhea(rhea_rxn_dir: Optional[str], output_path: Optional[str], n_workers: int):
+    assert rhea_rxn_dir is not None, \
+        f"Please define {env_var_names.original_rhea_rxn_dir} in .env file or pass --rhea-rxn-dir argument"
+    assert output_path is not None, \
+        f"Please define {env_var_names.rhea_reaction_store} in .env file or pass --output-path argument"
+    precompile_rhea_reactions(Path(rhea_rxn_dir), Path(output_path), n_workers=n_workers)
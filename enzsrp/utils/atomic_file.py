@@ -0,0 +1,30 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def prepare_temporary_path(path: Path) -> Path:
+    """
+    Returns the temporary path to write `path` to, removing the one left by an interrupted run.
+    Pass it to `replace_with_temporary_path` when the file is complete.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.unlink(missing_ok=True)
+    return tmp_path
+
+
+def replace_with_temporary_path(tmp_path: Path, path: Path):
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def atomic_write_path(path: Path) -> Iterator[Path]:
+    """
+    Yields a temporary path to write to instead of `path`. It replaces `path` atomically when the block exits without
+    an error, so readers never see a partly written file and an interrupted run leaves `path` as it was.
+    """
+    tmp_path = prepare_temporary_path(path)
+    yield tmp_path
+    replace_with_temporary_path(tmp_path, path)
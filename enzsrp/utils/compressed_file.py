@@ -0,0 +1,110 @@
+import gzip
+import io
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+_MAGIC_NUMBERS = {
+    GZIP: b'\x1f\x8b',
+    ZSTD: b'\x28\xb5\x2f\xfd',
+}
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_CHUNKS = 16
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """
+    Returns GZIP or ZSTD based on the magic number of the file, or None if the file is not compressed.
+    """
+    with open(path, 'rb') as file:
+        head = file.read(4)
+    for compression, magic in _MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+class ReadAheadReader(io.RawIOBase):
+    """
+    Reads `source` in a background thread and serves the chunks through a bounded queue.
+    Decompression releases the GIL, so it overlaps with parsing in the consuming thread.
+    """
+
+    def __init__(self, source: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, max_chunks: int = DEFAULT_MAX_CHUNKS):
+        super().__init__()
+        self._source = source
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(self._chunk_size)
+                self._put(chunk)  # NOTE: an empty chunk marks the end of the stream
+                if not chunk:
+                    return
+        except BaseException as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if len(self._pending) == 0:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._pending = memoryview(item)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._source.close()
+        super().close()
+
+
+def open_binary(path: Path) -> BinaryIO:
+    """
+    Opens a plain, gzip or zstd compressed file for binary reading. Compressed files are decompressed in a
+    background thread.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, 'rb')
+    if compression == GZIP:
+        source = gzip.open(path, 'rb')
+    else:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(f"The `zstandard` package is required to read zstd compressed files: {path}") from e
+        source = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return io.BufferedReader(ReadAheadReader(source), buffer_size=DEFAULT_CHUNK_SIZE)
@@ -3,6 +3,11 @@ output_dir = 'ENZSRP_OUTPUT_DIR'
 original_rhea_rxn_dir = 'ENZSRP_ORIGINAL_RHEA_RXN_DIR'
 original_rhea2metacyc_file = 'ENZSRP_ORIGINAL_RHEA2METACYC_FILE'
 original_rhea_directions_file = 'ENZSRP_ORIGINAL_RHEA_DIRECTIONS_FILE'
+original_rhea_reaction_smiles_file = 'ENZSRP_ORIGINAL_RHEA_REACTION_SMILES_FILE'
+original_rhea_reaction_participants_file = 'ENZSRP_ORIGINAL_RHEA_REACTION_PARTICIPANTS_FILE'
 original_mcsa_data_dir = 'ENZSRP_ORIGINAL_MCSA_DATA_DIR'
 original_metacyc_reactions_dat_file = 'ENZSRP_ORIGINAL_METACYC_REACTIONS_DAT_FILE'
 isoform_uniparc_id_mapping_file = 'ENZSRP_ISOFORM_UNIPARC_ID_MAPPING_FILE'
+uniprot_snapshot_dir = 'ENZSRP_UNIPROT_SNAPSHOT_DIR'
+rhea_reaction_store = 'ENZSRP_RHEA_REACTION_STORE'
+id_mapping_cache = 'ENZSRP_ID_MAPPING_CACHE'
@@ -1,6 +1,10 @@
 import hashlib
 from pathlib import Path
 
+from enzsrp.utils.json_sidecar import load_json_sidecar, save_json_sidecar, file_fingerprint
+
+HASH_CACHE_FORMAT_VERSION = 1
+
 
 def hash_file(file_path: Path):
     sha256 = hashlib.sha256()
@@ -8,3 +12,16 @@ def hash_file(file_path: Path):
         while chunk := file.read(8192):
             sha256.update(chunk)
     return sha256.hexdigest()
+
+
+def hash_file_with_cache(file_path: Path, cache_path: Path) -> str:
+    """
+    Same as `hash_file`, but the hash is saved to `cache_path` with the size and modification time of the file, and
+    reused without reading the file again while they are unchanged.
+    """
+    fingerprint = file_fingerprint(file_path)
+    file_hash = load_json_sidecar(cache_path, HASH_CACHE_FORMAT_VERSION, fingerprint, str)
+    if file_hash is None:
+        file_hash = hash_file(file_path)
+        save_json_sidecar(cache_path, HASH_CACHE_FORMAT_VERSION, fingerprint, file_hash)
+    return file_hash
@@ -0,0 +1,53 @@
+import json
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from enzsrp.utils.atomic_file import atomic_write_path
+
+T = TypeVar('T')
+
+
+def sidecar_path(source: Path, suffix: str) -> Path:
+    return source.with_name(source.name + suffix)
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Size and modification time of `path`, used as the source key of a file derived from it without reading it.
+    """
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_json_sidecar(path: Path, format_version: int, source_key: str, decode: Callable[[Any], T]) -> Optional[T]:
+    """
+    Returns the decoded payload saved by `save_json_sidecar`, or None if the file does not exist, was saved with
+    another format version or source key, or cannot be read (e.g. truncated or edited by hand). The caller rebuilds
+    the payload in that case.
+    """
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as file:
+            data = json.load(file)
+        if data['format_version'] != format_version or data['source_key'] != source_key:
+            return None
+        return decode(data['payload'])
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        # NOTE: json.JSONDecodeError and UnicodeDecodeError are ValueError.
+        warnings.warn(f"Ignoring the unreadable file {path}: {e!r}")
+        return None
+
+
+def save_json_sidecar(path: Path, format_version: int, source_key: str, payload: Any):
+    """
+    Saves `payload` with the key of the source it was built from (e.g. a file hash), so that it is only reused for the
+    same source. The file is replaced atomically, so readers never see a partly written file.
+
+    Bump `format_version` whenever the layout of a saved file changes, so that files saved by an older version are
+    rebuilt instead of misread. The snapshot, store and cache files written elsewhere follow the same rule with their
+    own version constants.
+    """
+    with atomic_write_path(path) as tmp_path, open(tmp_path, 'w') as file:
+        json.dump({'format_version': format_version, 'source_key': source_key, 'payload': payload}, file)
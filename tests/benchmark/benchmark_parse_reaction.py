@@ -0,0 +1,32 @@
+import time
+from typing import List
+
+from enzsrp.extension.parse_reaction import reaction_from_rxn_block_with_mol_title
+from tests.test_utils.test_default_path import TestDefaultPath
+
+N_REPEATS = 200
+
+
+def load_fixture_rxn_blocks() -> List[str]:
+    blocks = []
+    for path in sorted(TestDefaultPath().test_data.glob('*.rxn')):
+        with open(path, 'r') as file:
+            blocks.append(file.read())
+    return blocks
+
+
+def measure_reactions_per_sec(rxn_blocks: List[str], verify: bool, n_repeats: int = N_REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        for rxn_block in rxn_blocks:
+            reaction_from_rxn_block_with_mol_title(rxn_block, verify=verify)
+    elapsed = time.perf_counter() - start
+    return len(rxn_blocks) * n_repeats / elapsed
+
+
+# Run from the project root: python -m tests.benchmark.benchmark_parse_reaction
+if __name__ == '__main__':
+    fixture_blocks = load_fixture_rxn_blocks()
+    print(f"fixture reactions: {len(fixture_blocks)}, repeats: {N_REPEATS}")
+    print(f"single pass: {measure_reactions_per_sec(fixture_blocks, verify=False):,.0f} reactions/sec")
+    print(f"with verification: {measure_reactions_per_sec(fixture_blocks, verify=True):,.0f} reactions/sec")
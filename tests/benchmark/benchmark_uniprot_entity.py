@@ -0,0 +1,40 @@
+import json
+import time
+from typing import List, Optional, Iterable
+
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity, EntryComponent
+from enzsrp.presentation.build_enzyme_reaction_dataset import EnzymeReactionDatasetBuilder
+from tests.test_utils.test_default_path import TestDefaultPath
+
+N_REPEATS = 200
+
+
+def load_fixture_entry_dicts() -> List[dict]:
+    test_data = TestDefaultPath().test_data
+    entries = []
+    for path in sorted(test_data.glob('uniprotkb_*.json')):
+        with open(path, 'r') as file:
+            entries.extend(json.load(file)["results"])
+    for path in sorted(test_data.joinpath('single_entry').glob('*.json')):
+        with open(path, 'r') as file:
+            entries.append(json.load(file))
+    return entries
+
+
+def measure_entries_per_sec(entries: List[dict], projection: Optional[Iterable[EntryComponent]] = None,
+                            n_repeats: int = N_REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        for data in entries:
+            EntryWithCatalyticActivity.from_dict(data, projection)
+    elapsed = time.perf_counter() - start
+    return len(entries) * n_repeats / elapsed
+
+
+# Run from the project root: python -m tests.benchmark.benchmark_uniprot_entity
+if __name__ == '__main__':
+    fixture_entries = load_fixture_entry_dicts()
+    print(f"fixture entries: {len(fixture_entries)}, repeats: {N_REPEATS}")
+    print(f"from_dict (all components): {measure_entries_per_sec(fixture_entries):,.0f} entries/sec")
+    print(f"from_dict (builder projection): "
+          f"{measure_entries_per_sec(fixture_entries, EnzymeReactionDatasetBuilder.ENTRY_PROJECTION):,.0f} entries/sec")
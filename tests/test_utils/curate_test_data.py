@@ -1,6 +1,7 @@
 from collections import UserDict
 
 from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_catalog import default_catalog_path, query_catalog
 from tests.test_utils.test_default_path import TestDefaultPath
 
 
@@ -49,5 +50,44 @@ def curate_test_data():
     # 'A0A0E3KBH3' hits
 
 
+# Same conditions as `curate_test_data`, as queries on the catalog created by `build-uniprot-catalog`.
+_SINGLE_ACTIVITY_QUERY = ("SELECT e.accession FROM entries e JOIN activities a ON a.accession = e.accession "
+                          "WHERE e.n_activities = 1 AND {} ORDER BY e.rowid LIMIT 1")
+CATALOG_QUERIES = {
+    'two activity, all activity is single direction with experimental evidence':
+        "SELECT e.accession FROM entries e WHERE e.n_activities = 2 AND NOT EXISTS (SELECT 1 FROM activities a "
+        "WHERE a.accession = e.accession AND NOT (a.n_phy_reactions = 1 AND a.n_exp_phy_reactions = 1)) "
+        "ORDER BY e.rowid LIMIT 1",
+    'bidirectional, all physiological reactions have experimental evidences':
+        _SINGLE_ACTIVITY_QUERY.format("a.n_phy_reactions = 2 AND a.n_exp_phy_reactions = 2"),
+    'single direction, physiological reaction has experimental evidence':
+        _SINGLE_ACTIVITY_QUERY.format("a.n_phy_reactions = 1 AND a.n_exp_phy_reactions = 1"),
+    'single direction, physiological reaction does not have experimental evidence but reaction does':
+        _SINGLE_ACTIVITY_QUERY.format("a.n_phy_reactions = 1 AND a.n_exp_phy_reactions = 0 "
+                                      "AND a.rxn_has_exp_evidence = 1"),
+    'single direction, physiological reaction and reaction don\'t have experimental evidence':
+        _SINGLE_ACTIVITY_QUERY.format("a.n_phy_reactions = 1 AND a.n_exp_phy_reactions = 0 "
+                                      "AND a.rxn_has_exp_evidence = 0"),
+    'no direction (no  physiological reaction)': _SINGLE_ACTIVITY_QUERY.format("a.n_phy_reactions = 0"),
+}
+
+
+def curate_test_data_from_catalog():
+    catalog_path = default_catalog_path(TestDefaultPath().original_uniprot_reviewed_catalytic_activity_json_file)
+    test_accession_ids = {}
+    for description, sql in CATALOG_QUERIES.items():
+        rows = query_catalog(catalog_path, sql)
+        if len(rows) == 1:
+            test_accession_ids[description] = rows[0][0]
+    for description, accession_id in test_accession_ids.items():
+        print(f"{accession_id}: {description}")
+
+    print('Query')
+    print(' OR '.join(test_accession_ids.values()))
+
+
 if __name__ == '__main__':
-    curate_test_data()
+    if default_catalog_path(TestDefaultPath().original_uniprot_reviewed_catalytic_activity_json_file).exists():
+        curate_test_data_from_catalog()
+    else:
+        curate_test_data()
@@ -0,0 +1,112 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Callable, Optional, Dict
+from urllib.parse import urlparse, parse_qs
+
+
+def default_uniparc_result(isoform_id: str) -> Optional[dict]:
+    """
+    Maps IDs starting with 'FAIL' to failedIds, and the others to a minimal UniParc entry.
+    """
+    if isoform_id.startswith('FAIL'):
+        return None
+    return {"from": isoform_id, "to": {"uniParcId": f"UPI_{isoform_id}"}}
+
+
+class UniprotIdMappingStub:
+    """
+    Local HTTP server imitating the `/idmapping` endpoints of the UniProt REST API. Each submitted job finishes
+    immediately, and its results are paged with `Link: <...>; rel="next"` headers like the real API.
+    Use `url` in place of `uniprot_id_mapping.API_URL`. The page starting at `fail_once_at_cursor` fails once with
+    status 500, to imitate an interrupted download.
+    """
+
+    def __init__(self, page_size: int = 2,
+                 map_id: Callable[[str], Optional[dict]] = default_uniparc_result,
+                 fail_once_at_cursor: Optional[int] = None):
+        self.page_size = page_size
+        self.map_id = map_id
+        self.fail_once_at_cursor = fail_once_at_cursor
+        # IDs of each submitted job, in order of submission
+        self.submitted_ids: List[List[str]] = []
+        # (job ID, cursor) of each requested result page
+        self.requested_pages: List[tuple] = []
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _job(self, job_id: str) -> Dict[str, list]:
+        ids = self.submitted_ids[int(job_id)]
+        mapped = [(i, self.map_id(i)) for i in ids]
+        return {"results": [result for _, result in mapped if result is not None],
+                "failedIds": [i for i, result in mapped if result is None]}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def _send_json(self, content, headers: Optional[Dict[str, str]] = None, status: int = 200):
+                body = json.dumps(content).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != '/idmapping/run':
+                    self.send_error(404)
+                    return
+                length = int(self.headers['Content-Length'])
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                stub.submitted_ids.append(form['ids'][0].split(','))
+                self._send_json({"jobId": str(len(stub.submitted_ids) - 1)})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip('/').split('/')
+                if parts[:2] == ['idmapping', 'status']:
+                    self._send_json(stub._job(parts[2]))
+                elif parts[:2] == ['idmapping', 'details']:
+                    self._send_json({"redirectURL": f"{stub.url}/idmapping/uniparc/results/{parts[2]}"})
+                elif parts[:3] == ['idmapping', 'uniparc', 'results']:
+                    job = stub._job(parts[3])
+                    cursor = int(parse_qs(parsed.query).get('cursor', ['0'])[0])
+                    stub.requested_pages.append((parts[3], cursor))
+                    if cursor == stub.fail_once_at_cursor:
+                        stub.fail_once_at_cursor = None
+                        self._send_json({"messages": ["stub failure"]}, status=500)
+                        return
+                    next_cursor = cursor + stub.page_size
+                    headers = {'x-total-results': str(len(job["results"]))}
+                    if next_cursor < len(job["results"]):
+                        headers['Link'] = f'<{stub.url}{parsed.path}?cursor={next_cursor}>; rel="next"'
+                    # NOTE: Like the real API, failedIds are returned with the first page only.
+                    page = {"results": job["results"][cursor:next_cursor]}
+                    if cursor == 0:
+                        page["failedIds"] = job["failedIds"]
+                    self._send_json(page, headers)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
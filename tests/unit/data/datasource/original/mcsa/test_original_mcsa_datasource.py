@@ -0,0 +1,69 @@
+import datetime
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.mcsa.original_mcsa_datasource import OriginalMCSADataSource, default_index_path
+
+
+def _residue(uniprot_id, code, resid):
+    return {"mcsa_id": 1, "roles_summary": "", "function_location_abv": "", "main_annotation": "", "ptm": "",
+            "roles": [], "residue_chains": [],
+            "residue_sequences": [{"uniprot_id": uniprot_id, "code": code, "is_reference": True, "resid": resid}]}
+
+
+def _entry(mcsa_id, residues):
+    return {"mcsa_id": mcsa_id, "enzyme_name": "", "is_reference_uniprot_id": True, "reference_uniprot_id": "P00001",
+            "url": "", "description": "", "protein": {"sequences": []}, "all_ecs": [], "residues": residues,
+            "reaction": {}}
+
+
+def _uniprot_entry(accession, sequence):
+    return SimpleNamespace(primary_accession=accession, secondary_accessions=[], sequence=sequence,
+                           last_sequence_update_date=datetime.date(2010, 1, 1))
+
+
+class TestOriginalMCSADataSource(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcsa_data_dir = Path(self.temp_dir.name).joinpath('mcsa')
+        self.mcsa_data_dir.mkdir()
+        with open(self.mcsa_data_dir.joinpath('page_2.json'), 'w') as file:
+            json.dump({"results": [_entry(2, [_residue("P00002", "Cys", 1), _residue("P00001", "Asp", 3)])]}, file)
+        with open(self.mcsa_data_dir.joinpath('page_1.json'), 'w') as file:
+            json.dump({"results": [_entry(1, [_residue("P00001", "Ser", 2), _residue("", "Gly", 1)])]}, file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_residues_by_entry(self):
+        for n_workers in [1, 2]:
+            source = OriginalMCSADataSource(self.mcsa_data_dir, n_workers=n_workers)
+            self.assertEqual([1, 2], [residue.mcsa_id for residue in source.uniprot_id_residues_map['P00001']])
+            residues = source.get_residues_by_entry(_uniprot_entry('P00001', 'ASD'))
+            self.assertEqual([2, 3], sorted(residue.resid for residue in residues))
+            with self.assertWarns(UserWarning):
+                self.assertEqual(set(), source.get_residues_by_entry(_uniprot_entry('P00001', 'ASE')))
+            with self.assertWarns(UserWarning):
+                self.assertEqual(set(), source.get_residues_by_entry(_uniprot_entry('P00002', 'A')))
+            self.assertEqual(set(), source.get_residues_by_entry(_uniprot_entry('P00003', 'A')))
+
+    def test_index_is_reused(self):
+        expected = OriginalMCSADataSource(self.mcsa_data_dir).uniprot_id_residues_map
+        index_path = default_index_path(self.mcsa_data_dir)
+        self.assertTrue(index_path.exists())
+        modified_at = index_path.stat().st_mtime_ns
+        self.assertEqual(expected, OriginalMCSADataSource(self.mcsa_data_dir).uniprot_id_residues_map)
+        self.assertEqual(modified_at, index_path.stat().st_mtime_ns)
+
+    def test_broken_index_is_rebuilt(self):
+        expected = OriginalMCSADataSource(self.mcsa_data_dir).uniprot_id_residues_map
+        index_path = default_index_path(self.mcsa_data_dir)
+        data = json.loads(index_path.read_text())
+        del data['payload']
+        index_path.write_text(json.dumps(data))
+        with self.assertWarns(UserWarning):
+            self.assertEqual(expected, OriginalMCSADataSource(self.mcsa_data_dir).uniprot_id_residues_map)
@@ -1,8 +1,10 @@
+import tempfile
 import unittest
+from pathlib import Path
 
 # noinspection PyProtectedMember
 from enzsrp.data.datasource.original.metacyc.parse_reactions_dat import MetaCycDirectionMapper, \
-    _extract_rhea_id_from_line
+    _extract_rhea_id_from_line, default_index_path
 from enzsrp.domain.entity.reaction_direciton import MetaCycDirection
 from tests.test_utils.test_default_path import TestDefaultPath
 
@@ -34,5 +36,74 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(output, '99999')
 
 
+REACTIONS_DAT = """# REACTION-DIRECTION in a header comment
+UNIQUE-ID - RXN-1
+DBLINKS - (RHEA "10001" NIL |x| 1 NIL NIL)
+REACTION-DIRECTION - REVERSIBLE
+//
+UNIQUE-ID - RXN-2
+REACTION-DIRECTION - PHYSIOL-LEFT-TO-RIGHT
+DBLINKS - (RHEA "10002" NIL |x| 1 NIL NIL)
+DBLINKS - (RHEA "10003" NIL |x| 1 NIL NIL)
+//
+UNIQUE-ID - RXN-3
+//
+UNIQUE-ID - RXN-4
+REACTION-DIRECTION - RIGHT-TO-LEFT
+//
+UNIQUE-ID - RXN-4
+REACTION-DIRECTION - LEFT-TO-RIGHT
+//
+"""
+
+
+class TestMetaCycDirectionIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.reactions_dat = Path(self.temp_dir.name).joinpath('reactions.dat')
+        self.reactions_dat.write_text(REACTIONS_DAT)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assert_directions(self, mapper: MetaCycDirectionMapper):
+        self.assertEqual(MetaCycDirection.REVERSIBLE, mapper.metacyc_id_to_direction('RXN-1'))
+        self.assertEqual(MetaCycDirection.PHYSIOL_LEFT_TO_RIGHT, mapper.metacyc_id_to_direction('RXN-2'))
+        self.assertIsNone(mapper.metacyc_id_to_direction('RXN-3'))
+        with self.assertRaises(ValueError):
+            mapper.metacyc_id_to_direction('RXN-4')
+
+    def test_index_is_saved_and_reused(self):
+        self.assert_directions(MetaCycDirectionMapper(self.reactions_dat))
+        index_path = default_index_path(self.reactions_dat)
+        self.assertTrue(index_path.exists())
+        modified_at = index_path.stat().st_mtime_ns
+        self.assert_directions(MetaCycDirectionMapper(self.reactions_dat))
+        self.assertEqual(modified_at, index_path.stat().st_mtime_ns)
+
+    def test_index_is_rebuilt_on_source_change(self):
+        MetaCycDirectionMapper(self.reactions_dat)
+        self.reactions_dat.write_text(REACTIONS_DAT.replace('REVERSIBLE', 'LEFT-TO-RIGHT'))
+        mapper = MetaCycDirectionMapper(self.reactions_dat)
+        self.assertEqual(MetaCycDirection.LEFT_TO_RIGHT, mapper.metacyc_id_to_direction('RXN-1'))
+
+    def test_broken_index_is_rebuilt(self):
+        MetaCycDirectionMapper(self.reactions_dat)
+        index_path = default_index_path(self.reactions_dat)
+        index_path.write_text(index_path.read_text()[:20])
+        with self.assertWarns(UserWarning):
+            self.assert_directions(MetaCycDirectionMapper(self.reactions_dat))
+        # The rebuilt index is saved again
+        self.assert_directions(MetaCycDirectionMapper(self.reactions_dat))
+
+    def test_too_many_rhea_links(self):
+        self.reactions_dat.write_text(REACTIONS_DAT.replace('REACTION-DIRECTION - REVERSIBLE', (
+            'DBLINKS - (RHEA "10004" NIL |x| 1 NIL NIL)\nDBLINKS - (RHEA "10005" NIL |x| 1 NIL NIL)\n'
+            'REACTION-DIRECTION - REVERSIBLE')))
+        with self.assertRaises(RuntimeError):
+            MetaCycDirectionMapper(self.reactions_dat)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,5 @@
+import tempfile
+from pathlib import Path
 from unittest import TestCase
 
 from rdkit.Chem import AllChem
@@ -41,3 +43,42 @@ class TestOriginalRheaDatasource(TestCase):
     def test_map_rhea_id_to_metacyc_id_error(self):
         result = self.datasource.map_rhea_id_to_metacyc_id('10001')
         self.assertEqual(0, len(result))
+
+
+class TestOriginalRheaDatasourceIndexes(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        temp_dir_path = Path(self.temp_dir.name)
+        rhea_directions = temp_dir_path.joinpath('rhea-directions.tsv')
+        rhea_directions.write_text("RHEA_ID_MASTER\tRHEA_ID_LR\tRHEA_ID_RL\tRHEA_ID_BI\n"
+                                   "10000\t10001\t10002\t10003\n"
+                                   "10004\t10005\t10006\t10007\n"
+                                   "10008\t10009\t10010\t10011\n"
+                                   "10008\t10009\t10010\t10011\n")
+        rhea2metacyc = temp_dir_path.joinpath('rhea2metacyc.tsv')
+        rhea2metacyc.write_text("RHEA_ID\tDIRECTION\tMASTER_ID\tID\n"
+                                "10001\tLR\t10000\tPENTANAMIDASE-RXN\n"
+                                "10006\tRL\t10004\tRXN-1 \n"
+                                "10007\tBI\t10004\tRXN-2\n")
+        self.datasource = OriginalRheaDatasource(rhea_rxn_dir=temp_dir_path, rhea2metacyc=rhea2metacyc,
+                                                 rhea_directions=rhea_directions)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_map_master_id_to_direction_id(self):
+        self.assertEqual('10001', self.datasource.map_master_id_to_direction_id('10000', RheaDirectionName.RHEA_ID_LR))
+        self.assertEqual('10006', self.datasource.map_master_id_to_direction_id('10004', RheaDirectionName.RHEA_ID_RL))
+        self.assertEqual('10007', self.datasource.map_master_id_to_direction_id('10004', RheaDirectionName.RHEA_ID_BI))
+        with self.assertRaises(ValueError):
+            self.datasource.map_master_id_to_direction_id('10001', RheaDirectionName.RHEA_ID_LR)
+        with self.assertRaises(ValueError):
+            self.datasource.map_master_id_to_direction_id('10008', RheaDirectionName.RHEA_ID_LR)
+
+    def test_map_rhea_id_to_metacyc_id(self):
+        self.assertEqual({'PENTANAMIDASE-RXN'}, self.datasource.map_rhea_id_to_metacyc_id('10000'))
+        self.assertEqual({'RXN-1', 'RXN-2'}, self.datasource.map_rhea_id_to_metacyc_id('10004'))
+        self.assertEqual(set(), self.datasource.map_rhea_id_to_metacyc_id('10008'))
+        with self.assertWarns(UserWarning):
+            self.assertEqual(set(), self.datasource.map_rhea_id_to_metacyc_id('10001'))
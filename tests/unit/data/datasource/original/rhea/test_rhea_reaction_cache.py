@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from rdkit.Chem import AllChem
+
+from enzsrp.data.datasource.original.rhea.rhea_reaction import RheaReaction
+from enzsrp.data.datasource.original.rhea.rhea_reaction_cache import RheaReactionCache
+from enzsrp.extension.parse_reaction import reaction_from_rxn_block_with_mol_title
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+def _reaction(n_bytes: int) -> RheaReaction:
+    return RheaReaction(b'x' * n_bytes, '', frozenset())
+
+
+class TestRheaReactionCache(TestCase):
+
+    def test_lru_eviction(self):
+        cache = RheaReactionCache(max_bytes=250)
+        cache.put('1', _reaction(100))
+        cache.put('2', _reaction(100))
+        self.assertEqual((True, _reaction(100)), cache.lookup('1'))
+        cache.put('3', _reaction(100))
+        self.assertEqual(['1', '3'], list(cache.keys()))
+        self.assertEqual((False, None), cache.lookup('2'))
+        cache.put('4', None)
+        self.assertEqual((True, None), cache.lookup('4'))
+        self.assertEqual({'hits': 2, 'misses': 1, 'evictions': 2, 'resident_bytes': 164, 'n_reactions': 2},
+                         cache.stats())
+
+    def test_reaction_larger_than_budget(self):
+        cache = RheaReactionCache(max_bytes=50)
+        cache.put('1', _reaction(10))
+        cache.put('2', _reaction(100))
+        self.assertEqual(['2'], list(cache.keys()))
+        self.assertEqual(100, cache.resident_bytes)
+
+    def test_unbounded(self):
+        cache = RheaReactionCache(max_bytes=None)
+        for i in range(100):
+            cache.put(str(i), _reaction(1000))
+        self.assertEqual(100, len(cache))
+        self.assertEqual(0, cache.evictions)
+
+    def test_rhea_reaction(self):
+        with open(TestDefaultPath().test_data.joinpath('10001.rxn'), 'r') as file:
+            reaction = reaction_from_rxn_block_with_mol_title(file.read())
+        rhea_reaction = RheaReaction.from_reaction(reaction)
+        self.assertEqual(AllChem.ReactionToSmiles(reaction), rhea_reaction.smiles)
+        self.assertEqual(rhea_reaction.smiles, AllChem.ReactionToSmiles(rhea_reaction.reaction))
+        self.assertEqual(rhea_reaction, RheaReaction.from_binary(rhea_reaction.binary))
@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from rdkit.Chem import AllChem
+
+from enzsrp.data.datasource.original.rhea.original_rhea_datasource import OriginalRheaDatasource
+from enzsrp.data.datasource.original.rhea.rhea_reaction_store import precompile_rhea_reactions, RheaReactionStore
+from enzsrp.extension.parse_reaction import get_all_mol_names_in_rxn
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestRheaReactionStore(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        temp_dir_path = Path(self.temp_dir.name)
+        self.rxn_dir = temp_dir_path.joinpath('rxn')
+        self.rxn_dir.mkdir()
+        for rhea_id in ['10001', '71500']:
+            shutil.copy(TestDefaultPath().test_data.joinpath(f'{rhea_id}.rxn'), self.rxn_dir)
+        self.rxn_dir.joinpath('99999.rxn').write_text('broken')
+        self.store_path = temp_dir_path.joinpath('rhea.sqlite')
+        precompile_rhea_reactions(self.rxn_dir, self.store_path, n_workers=2)
+
+        self.rhea_directions = temp_dir_path.joinpath('rhea-directions.tsv')
+        self.rhea_directions.write_text("RHEA_ID_MASTER\tRHEA_ID_LR\tRHEA_ID_RL\tRHEA_ID_BI\n")
+        self.rhea2metacyc = temp_dir_path.joinpath('rhea2metacyc.tsv')
+        self.rhea2metacyc.write_text("RHEA_ID\tDIRECTION\tMASTER_ID\tID\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_store(self):
+        store = RheaReactionStore(self.store_path)
+        self.assertIsNotNone(store.get_reaction_binary('10001'))
+        self.assertIsNotNone(store.get_reaction_binary('71500'))
+        self.assertIsNone(store.get_reaction_binary('99999'))
+        self.assertIsNotNone(store.get_failure_reason('99999'))
+        self.assertIsNone(store.get_failure_reason('10001'))
+        store.close()
+
+    def test_get_single_reaction_from_store(self):
+        parsed = OriginalRheaDatasource(self.rxn_dir, self.rhea2metacyc, self.rhea_directions)
+        stored = OriginalRheaDatasource(self.rxn_dir, self.rhea2metacyc, self.rhea_directions,
+                                        reaction_store=self.store_path)
+        for rhea_id in ['10001', '71500']:
+            expected = parsed.get_single_reaction(rhea_id)
+            actual = stored.get_single_reaction(rhea_id)
+            self.assertEqual(AllChem.ReactionToSmiles(expected), AllChem.ReactionToSmiles(actual))
+            self.assertEqual(get_all_mol_names_in_rxn(expected), get_all_mol_names_in_rxn(actual))
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(stored.get_single_reaction('99999'))
+        self.assertIn('99999', stored.warned_rhea_ids)
+
+    def test_prefetch_reactions(self):
+        datasource = OriginalRheaDatasource(self.rxn_dir, self.rhea2metacyc, self.rhea_directions)
+        with ProcessPoolExecutor(max_workers=2) as executor, self.assertWarns(UserWarning):
+            datasource.prefetch_reactions(['10001', '71500', '99999', '12345'], executor)
+        # Failures are also cached, so that they are not parsed again
+        self.assertEqual({'10001', '71500', '99999', '12345'}, set(datasource.single_reaction_cache.keys()))
+        self.assertIn('99999', datasource.warned_rhea_ids)
+        expected = datasource.get_single_reaction('10001')
+        with patch.object(datasource, 'get_single_reaction') as get_single_reaction:
+            actual = datasource.get_single_reaction_with_cache('10001')
+            self.assertIsNone(datasource.get_single_reaction_with_cache('99999'))
+            self.assertIsNone(datasource.get_single_reaction_with_cache('12345'))
+            get_single_reaction.assert_not_called()
+        self.assertEqual(get_all_mol_names_in_rxn(expected), get_all_mol_names_in_rxn(actual))
+
+    def test_prefetched_reactions_are_kept_beyond_cache_budget(self):
+        datasource = OriginalRheaDatasource(self.rxn_dir, self.rhea2metacyc, self.rhea_directions,
+                                            reaction_cache_bytes=1)
+        with ProcessPoolExecutor(max_workers=2) as executor, self.assertWarns(UserWarning):
+            datasource.prefetch_reactions(['10001', '71500', '99999'], executor)
+        # Only the last one fits in the cache
+        self.assertEqual(1, len(datasource.single_reaction_cache))
+        with patch.object(datasource, 'get_single_reaction') as get_single_reaction:
+            self.assertIsNotNone(datasource.get_rhea_reaction_with_cache('10001'))
+            self.assertIsNotNone(datasource.get_rhea_reaction_with_cache('71500'))
+            self.assertIsNone(datasource.get_rhea_reaction_with_cache('99999'))
+            get_single_reaction.assert_not_called()
+
+    def test_prefetch_reactions_from_store(self):
+        datasource = OriginalRheaDatasource(self.rxn_dir, self.rhea2metacyc, self.rhea_directions,
+                                            reaction_store=self.store_path)
+        with ProcessPoolExecutor(max_workers=2) as executor, self.assertWarns(UserWarning):
+            datasource.prefetch_reactions(['10001', '99999'], executor)
+        self.assertEqual({'10001', '99999'}, set(datasource.single_reaction_cache.keys()))
+        self.assertIn('99999', datasource.warned_rhea_ids)
+
+    def test_get_rhea_reaction_with_cache(self):
+        datasource = OriginalRheaDatasource(self.rxn_dir, self.rhea2metacyc, self.rhea_directions)
+        rhea_reaction = datasource.get_rhea_reaction_with_cache('10001')
+        self.assertEqual(AllChem.ReactionToSmiles(rhea_reaction.reaction), rhea_reaction.smiles)
+        self.assertEqual(frozenset({'CHEBI:28938', 'CHEBI:15377', 'CHEBI:31011', 'CHEBI:16459'}),
+                         rhea_reaction.mol_titles)
+        self.assertIs(rhea_reaction, datasource.get_rhea_reaction_with_cache('10001'))
+        self.assertEqual(rhea_reaction.mol_titles,
+                         get_all_mol_names_in_rxn(datasource.get_single_reaction_with_cache('10001')))
+        self.assertIsNone(datasource.get_rhea_reaction_with_cache('99999'))
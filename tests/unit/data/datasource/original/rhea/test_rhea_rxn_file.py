@@ -0,0 +1,52 @@
+import tarfile
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.rhea.original_rhea_datasource import OriginalRheaDatasource
+from enzsrp.data.datasource.original.rhea.rhea_rxn_file import open_rhea_rxn_source, RheaRxnArchive, \
+    RheaRxnDirectory
+from enzsrp.extension.parse_reaction import get_all_mol_names_in_rxn
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestRheaRxnFile(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir_path = Path(self.temp_dir.name)
+        self.archive_paths = []
+        for name, mode in [('rhea-rxn.tar', 'w'), ('rhea-rxn.tar.gz', 'w:gz')]:
+            archive_path = self.temp_dir_path.joinpath(name)
+            with tarfile.open(archive_path, mode) as archive:
+                for rhea_id in ['10001', '71500']:
+                    archive.add(TestDefaultPath().test_data.joinpath(f'{rhea_id}.rxn'), arcname=f'rxn/{rhea_id}.rxn')
+            self.archive_paths.append(archive_path)
+        self.expected = RheaRxnDirectory(TestDefaultPath().test_data).read_rxn_blocks(['10001', '71500'])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_rxn_blocks_from_archive(self):
+        for archive_path in self.archive_paths:
+            source = open_rhea_rxn_source(archive_path)
+            self.assertIsInstance(source, RheaRxnArchive)
+            self.assertEqual(['10001', '71500'], source.list_rhea_ids())
+            self.assertEqual(self.expected, source.read_rxn_blocks(['71500', '10001', '12345']))
+            self.assertEqual(self.expected['10001'], source.read_rxn_block('10001'))
+            with self.assertRaises(FileNotFoundError):
+                source.read_rxn_block('12345')
+
+    def test_get_single_reaction_from_archive(self):
+        rhea_directions = self.temp_dir_path.joinpath('rhea-directions.tsv')
+        rhea_directions.write_text("RHEA_ID_MASTER\tRHEA_ID_LR\tRHEA_ID_RL\tRHEA_ID_BI\n")
+        rhea2metacyc = self.temp_dir_path.joinpath('rhea2metacyc.tsv')
+        rhea2metacyc.write_text("RHEA_ID\tDIRECTION\tMASTER_ID\tID\n")
+        expected = OriginalRheaDatasource(TestDefaultPath().test_data, rhea2metacyc,
+                                          rhea_directions).get_single_reaction('10001')
+        for archive_path in self.archive_paths:
+            datasource = OriginalRheaDatasource(archive_path, rhea2metacyc, rhea_directions)
+            actual = datasource.get_single_reaction('10001')
+            self.assertEqual(get_all_mol_names_in_rxn(expected), get_all_mol_names_in_rxn(actual))
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(datasource.get_single_reaction('12345'))
@@ -0,0 +1,67 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from rdkit.Chem import AllChem
+
+from enzsrp.data.datasource.original.rhea.tabular_rhea_datasource import TabularRheaDatasource
+from enzsrp.domain.entity.reaction_direciton import RheaDirectionName
+
+
+class TestTabularRheaDatasource(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        temp_dir_path = Path(self.temp_dir.name)
+        self.rhea_reaction_smiles = temp_dir_path.joinpath('rhea-reaction-smiles.tsv')
+        self.rhea_reaction_smiles.write_text("10001\tO.[H]OC(=O)CCC>>OC(=O)CCC.[H]O\n"
+                                             "10002\tOC(=O)CCC.[H]O>>O.[H]OC(=O)CCC\n"
+                                             "10006\tO.[H]OC(=O)C>>OC(=O)C.[H]O\n"
+                                             "10009\tO.[H]OC(=O)CC>>OC(=O)CC.[H]O\n")
+        self.rhea_reaction_participants = temp_dir_path.joinpath('rhea-reaction-participants.tsv')
+        self.rhea_reaction_participants.write_text("RHEA_ID\tCHEBI_ID\n"
+                                                   "10001\tCHEBI:15377\n"
+                                                   "10001\t16459\n"
+                                                   "10001\tCHEBI:15377\n"
+                                                   "10004\tCHEBI:15377\n"
+                                                   "10004\tCHEBI:30089\n")
+        self.rhea_directions = temp_dir_path.joinpath('rhea-directions.tsv')
+        self.rhea_directions.write_text("RHEA_ID_MASTER\tRHEA_ID_LR\tRHEA_ID_RL\tRHEA_ID_BI\n"
+                                        "10000\t10001\t10002\t10003\n"
+                                        "10004\t10005\t10006\t10007\n"
+                                        "10008\t10009\t10010\t10011\n")
+        self.rhea2metacyc = temp_dir_path.joinpath('rhea2metacyc.tsv')
+        self.rhea2metacyc.write_text("RHEA_ID\tDIRECTION\tMASTER_ID\tID\n")
+        self.datasource = TabularRheaDatasource(self.rhea_reaction_smiles, self.rhea_reaction_participants,
+                                                self.rhea2metacyc, self.rhea_directions)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_rhea_reaction_with_cache(self):
+        rhea_reaction = self.datasource.get_rhea_reaction_with_cache('10001')
+        self.assertEqual("O.[H]OC(=O)CCC>>OC(=O)CCC.[H]O", rhea_reaction.smiles)
+        self.assertEqual(frozenset({'CHEBI:15377', 'CHEBI:16459'}), rhea_reaction.mol_titles)
+        self.assertIsNone(self.datasource.get_rhea_reaction_with_cache('10003'))
+        self.assertIn('10003', self.datasource.warned_rhea_ids)
+
+    def test_participants_of_master_id(self):
+        # Participants keyed by the master ID are used for its directional IDs
+        self.assertEqual(frozenset({'CHEBI:15377', 'CHEBI:30089'}),
+                         self.datasource.get_rhea_reaction_with_cache('10006').mol_titles)
+
+    def test_no_participants(self):
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(self.datasource.get_rhea_reaction_with_cache('10002'))
+        self.assertIn('10002', self.datasource.warned_rhea_ids)
+        self.assertIsNone(self.datasource.get_rhea_reaction_with_cache('10009'))
+
+    def test_map_master_id_to_direction_id(self):
+        self.assertEqual('10002', self.datasource.map_master_id_to_direction_id('10000', RheaDirectionName.RHEA_ID_RL))
+
+    def test_get_single_reaction_with_cache(self):
+        reaction = self.datasource.get_single_reaction_with_cache('10001')
+        self.assertIsInstance(reaction, AllChem.ChemicalReaction)
+        self.assertEqual(2, reaction.GetNumReactantTemplates())
+        self.assertEqual(2, reaction.GetNumProductTemplates())
+        self.assertIsNone(self.datasource.get_single_reaction_with_cache('10003'))
@@ -1,9 +1,12 @@
+import gc
 import json
+import pickle
 import unittest
+import weakref
 from datetime import datetime
 
 from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryWithCatalyticActivity, LocationModifier, \
-    Isoform, RheaReference, RheaID
+    Isoform, RheaReference, RheaID, EntryComponent
 from enzsrp.domain.entity.evidence_and_clusion_ontology import ECO
 from enzsrp.domain.entity.reaction_direciton import ReactionDirection
 from tests.test_utils.test_default_path import TestDefaultPath
@@ -122,3 +125,41 @@ class MyTestCase(unittest.TestCase):
                     "IPLTADIDMFAIMPHLSNFRDSARSSVTSGDSVTDYLARTRRAASEATGGLDRERIDLLWKIARAGARSAVGTEARRQFRYDGDMNIGVIT"
                     "DFELEVRNALNRRAHAVGAQDVVQHGTEQNNPFPEADEK")
         self.assertEqual(expected, ptm_seq)
+
+    def test_projection(self):
+        file_path = TestDefaultPath().test_data.joinpath('single_entry', 'O00115.json')
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        expected = EntryWithCatalyticActivity.from_dict(data)
+
+        entry = EntryWithCatalyticActivity.from_dict(data, projection=[EntryComponent.FEATURES])
+        self.assertIsInstance(entry.__dict__['features'], list)
+        self.assertNotIsInstance(entry.__dict__['active_sites'], list)
+        # components not selected are built on first access
+        self.assertEqual(expected.active_sites, entry.active_sites)
+        self.assertIsInstance(entry.__dict__['active_sites'], list)
+        self.assertEqual(expected, entry)
+
+    def test_shared_evidences_and_locations(self):
+        file_path = TestDefaultPath().test_data.joinpath('single_entry', 'O00115.json')
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        entry1 = EntryWithCatalyticActivity.from_dict(data)
+        entry2 = pickle.loads(pickle.dumps(EntryWithCatalyticActivity.from_dict(data)))
+        self.assertEqual(entry1, entry2)
+        self.assertIs(entry1.catalytic_activities[0].reaction.evidences[0],
+                      entry2.catalytic_activities[0].reaction.evidences[0])
+        self.assertIs(entry1.active_sites[0].location, entry2.active_sites[0].location)
+        self.assertIs(RheaID.from_string('RHEA:67184'), RheaID.from_string('RHEA:67184'))
+
+    def test_unused_evidences_and_locations_are_freed(self):
+        file_path = TestDefaultPath().test_data.joinpath('single_entry', 'O00115.json')
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        entry = EntryWithCatalyticActivity.from_dict(data)
+        evidence = weakref.ref(entry.catalytic_activities[0].reaction.evidences[0])
+        location = weakref.ref(entry.active_sites[0].location)
+        del entry
+        gc.collect()
+        self.assertIsNone(evidence())
+        self.assertIsNone(location())
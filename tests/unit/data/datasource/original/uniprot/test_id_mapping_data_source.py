@@ -0,0 +1,64 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.uniprot.id_mapping_data_source import IsoformIdMappingDataSource
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+def _result(isoform_id, sequence, active_ids):
+    cross_refs = [{"database": "UniProtKB/Swiss-Prot protein isoforms", "id": active_id, "active": True} for
+                  active_id in active_ids]
+    return {"from": isoform_id, "to": {"uniParcCrossReferences": cross_refs, "sequence": {"value": sequence}}}
+
+
+class TestIsoformIdMappingDataSource(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir_path = Path(self.temp_dir.name)
+        self.path = self.temp_dir_path.joinpath('idmapping.json')
+        with open(self.path, 'w') as file:
+            json.dump({"results": [_result("P00001-1", "MKV", ["P00001-1"]),
+                                   _result("P00001-2", "MKVL", ["P00001-3", "P00001-2"]),
+                                   _result("P00001-3", "MKV", ["P00001-3"])]}, file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_mapping(self):
+        for sidecar_path in [None, self.temp_dir_path.joinpath('sequences.bin')]:
+            source = IsoformIdMappingDataSource(self.path, sequence_sidecar_path=sidecar_path)
+            self.assertEqual({"P00001-1": "MKV", "P00001-2": "MKVL", "P00001-3": "MKV"},
+                             dict(source.isoform_id_to_sequence))
+            # Identical sequences are stored once
+            self.assertEqual(len("MKV") + len("MKVL"), source.isoform_id_to_sequence.n_buffer_bytes)
+            self.assertEqual({"P00001-1": "P00001-1", "P00001-2": "P00001-2", "P00001-3": "P00001-3"},
+                             source.isoform_id_to_active_isoform_id)
+            self.assertEqual({"P00001-2": "MKVL"}, source.bulk_map_isoform_id_to_seq(["P00001-2", "P00009-1"]))
+            self.assertIsNone(source.map_isoform_to_seq("P00009-1"))
+            source.close()
+
+    def test_from_is_not_unique(self):
+        with open(self.path, 'w') as file:
+            json.dump({"results": [_result("P00001-1", "MKV", ["P00001-1"]),
+                                   _result("P00001-1", "MKV", ["P00001-1"])]}, file)
+        with self.assertRaises(AssertionError):
+            IsoformIdMappingDataSource(self.path)
+
+    def test_mapping_file(self):
+        path = TestDefaultPath().test_data.joinpath('output', 'idmapping_2024_09_21_isoform_uniparc.json')
+        source = IsoformIdMappingDataSource(path)
+        self.assertEqual({'O14975-1', 'O14975-2', 'F1MAB7-1', 'F1MAB7-2', 'F1MAB7-3'},
+                         set(source.isoform_id_to_sequence.keys()))
+
+    def test_jsonl(self):
+        jsonl_path = self.temp_dir_path.joinpath('idmapping.jsonl')
+        with open(self.path, 'r') as file, open(jsonl_path, 'w') as jsonl_file:
+            for result in json.load(file)["results"]:
+                jsonl_file.write(json.dumps(result) + '\n')
+        source = IsoformIdMappingDataSource(jsonl_path)
+        self.assertEqual({"P00001-1": "MKV", "P00001-2": "MKVL", "P00001-3": "MKV"},
+                         dict(source.isoform_id_to_sequence))
+        self.assertEqual("P00001-2", source.map_isoform_id_to_active_isoform_id("P00001-2"))
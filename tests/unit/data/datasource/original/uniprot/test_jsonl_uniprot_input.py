@@ -0,0 +1,46 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.sharded_uniprot_reader import split_lines_into_ranges, \
+    decode_lines_in_range
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestJsonlUniprotInput(TestCase):
+
+    def setUp(self):
+        self.file_path = TestDefaultPath().test_data.joinpath('uniprotkb_A0A0E3KBH3_OR_A0A072ULZ1_OR_A_2024_09_24.json')
+        with open(self.file_path, 'r') as file:
+            self.entry_dicts = json.load(file)["results"]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.jsonl_path = Path(self.temp_dir.name).joinpath('entries.jsonl')
+        with open(self.jsonl_path, 'w') as file:
+            for data in self.entry_dicts:
+                file.write(json.dumps(data) + '\n')
+        self.expected = list(OriginalUniprotDataSource(self.file_path).stream_entries_with_catalytic_activity())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_split_lines_into_ranges(self):
+        ranges = split_lines_into_ranges(self.jsonl_path, shard_bytes=1000)
+        self.assertEqual(len(self.entry_dicts), len(ranges))
+        decoded = [data for start, end in ranges for data in decode_lines_in_range(self.jsonl_path, start, end)]
+        self.assertEqual(self.entry_dicts, decoded)
+
+    def test_stream_jsonl_entries(self):
+        sequential = list(OriginalUniprotDataSource(self.jsonl_path).stream_entries_with_catalytic_activity())
+        self.assertEqual(self.expected, sequential)
+        parallel = list(OriginalUniprotDataSource(self.jsonl_path, n_workers=2).stream_entries_with_catalytic_activity())
+        self.assertEqual(self.expected, parallel)
+
+    def test_stream_compressed_jsonl_entries(self):
+        gz_path = self.jsonl_path.with_name('entries.jsonl.gz')
+        with open(self.jsonl_path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+            dst.write(src.read())
+        loaded = list(OriginalUniprotDataSource(gz_path).stream_entries_with_catalytic_activity())
+        self.assertEqual(self.expected, loaded)
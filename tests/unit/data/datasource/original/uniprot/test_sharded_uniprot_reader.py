@@ -0,0 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+
+import ijson
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.sharded_uniprot_reader import find_entry_offsets, split_into_shards, \
+    decode_entries_in_range, stream_entries_in_parallel
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestShardedUniprotReader(TestCase):
+
+    def setUp(self):
+        self.file_path = TestDefaultPath().test_data.joinpath('uniprotkb_A0A0E3KBH3_OR_A0A072ULZ1_OR_A_2024_09_24.json')
+        with open(self.file_path, 'rb') as file:
+            self.expected_accessions = [item['primaryAccession'] for item in ijson.items(file, 'results.item')]
+
+    def test_find_entry_offsets(self):
+        offsets = find_entry_offsets(self.file_path)
+        self.assertEqual(len(self.expected_accessions), len(offsets))
+        shards = split_into_shards(offsets, self.file_path.stat().st_size, shard_size=2)
+        decoded = [data['primaryAccession'] for shard_offsets, end in shards for data in
+                   decode_entries_in_range(self.file_path, shard_offsets, end)]
+        self.assertEqual(self.expected_accessions, decoded)
+
+    def test_stream_entries_in_parallel_keeps_file_order(self):
+        entries = list(stream_entries_in_parallel(self.file_path, n_workers=2, shard_size=1))
+        self.assertEqual(self.expected_accessions, [entry.primary_accession for entry in entries])
+
+    def test_stream_entries_with_given_executor(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            entries = list(stream_entries_in_parallel(self.file_path, n_workers=2, shard_size=1, executor=executor))
+            self.assertEqual(self.expected_accessions, [entry.primary_accession for entry in entries])
+            # The executor is not shut down, so the caller can keep using it
+            self.assertEqual(4, executor.submit(pow, 2, 2).result())
+
+    def test_parallel_and_sequential_streams_are_equal(self):
+        sequential = list(OriginalUniprotDataSource(self.file_path).stream_entries_with_catalytic_activity())
+        parallel = list(OriginalUniprotDataSource(self.file_path, n_workers=2).stream_entries_with_catalytic_activity())
+        self.assertEqual(sequential, parallel)
@@ -0,0 +1,32 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_catalog import EntryCatalogWriter, query_catalog
+from tests.test_utils.curate_test_data import CATALOG_QUERIES
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestEntryCatalogWriter(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.catalog_path = Path(self.temp_dir.name).joinpath('entries.catalog.sqlite')
+        file_path = TestDefaultPath().test_data.joinpath('uniprotkb_A0A0E3KBH3_OR_A0A072ULZ1_OR_A_2024_09_24.json')
+        OriginalUniprotDataSource(file_path).stream_to_consumers([EntryCatalogWriter(self.catalog_path)])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_catalog(self):
+        self.assertEqual([(6, 7)], query_catalog(
+            self.catalog_path, "SELECT COUNT(*), (SELECT COUNT(*) FROM activities) FROM entries"))
+        self.assertEqual([('A0A0E3T552', '1.2.1.19')], query_catalog(
+            self.catalog_path, "SELECT accession, ec_number FROM activities WHERE ec_number LIKE ?", ('1.2.1.%',)))
+
+    def test_curation_queries(self):
+        found = {description: query_catalog(self.catalog_path, sql)[0][0] for description, sql in
+                 CATALOG_QUERIES.items()}
+        self.assertEqual({'A0A0E3T552', 'A0A072ULZ1', 'A0A0D1DWQ2', 'A0A0A7EQR3', 'A0A0E4AZP0', 'A0A0E3KBH3'},
+                         set(found.values()))
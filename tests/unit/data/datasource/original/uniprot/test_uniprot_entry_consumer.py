@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_consumer import UniprotEntryConsumer, IsoformIdCollector, \
+    EntryStatsAccumulator
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class _RecordingConsumer(UniprotEntryConsumer):
+    def __init__(self):
+        self.entries = []
+        self.closed = False
+
+    def consume(self, entry):
+        self.entries.append(entry)
+
+    def close(self):
+        self.closed = True
+
+
+class TestUniprotEntryConsumer(TestCase):
+
+    def test_stream_to_consumers(self):
+        file_path = TestDefaultPath().test_data.joinpath("uniprotkb_accession_F1MAB7_OR_O14975_2024_09_21.json")
+        source = OriginalUniprotDataSource(file_path)
+        recorder, collector, stats = _RecordingConsumer(), IsoformIdCollector(), EntryStatsAccumulator()
+        source.stream_to_consumers([recorder, collector, stats])
+        self.assertTrue(recorder.closed)
+        self.assertEqual(['F1MAB7', 'O14975'], [entry.primary_accession for entry in recorder.entries])
+        self.assertEqual({'F1MAB7-2', 'F1MAB7-1', 'O14975-1', 'O14975-2', 'F1MAB7-3'}, collector.isoform_ids)
+        self.assertEqual(2, stats.to_dict()['entries'])
+        self.assertEqual(sum(len(entry.catalytic_activities) for entry in recorder.entries),
+                         stats.to_dict()['activities'])
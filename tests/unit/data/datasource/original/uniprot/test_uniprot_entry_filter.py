@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+def _entry(accession, reactions):
+    return {
+        "primaryAccession": accession,
+        "comments": [{"commentType": "CATALYTIC ACTIVITY", "reaction": reaction} for reaction in reactions]
+    }
+
+
+class TestUniprotEntryFilter(TestCase):
+
+    def test_matches(self):
+        entry = _entry("P00001", [
+            {"ecNumber": "1.14.11.42", "reactionCrossReferences": [{"database": "ChEBI", "id": "CHEBI:15379"}]}
+        ])
+        self.assertTrue(UniprotEntryFilter().matches(entry))
+        self.assertTrue(UniprotEntryFilter(accessions=frozenset({"P00001"})).matches(entry))
+        self.assertFalse(UniprotEntryFilter(accessions=frozenset({"P00002"})).matches(entry))
+        self.assertTrue(UniprotEntryFilter(ec_prefix="1.14.*").matches(entry))
+        self.assertTrue(UniprotEntryFilter(ec_prefix="1.14").matches(entry))
+        self.assertFalse(UniprotEntryFilter(ec_prefix="1.1.*").matches(entry))
+        self.assertFalse(UniprotEntryFilter(require_rhea=True).matches(entry))
+        self.assertFalse(UniprotEntryFilter(ec_prefix="1.14.*", require_rhea=True).matches(entry))
+
+    def test_stream_entries_with_filter(self):
+        file_path = TestDefaultPath().test_data.joinpath('uniprotkb_A0A0E3KBH3_OR_A0A072ULZ1_OR_A_2024_09_24.json')
+        entry_filter = UniprotEntryFilter(ec_prefix="1.2.*", require_rhea=True)
+        for n_workers in [1, 2]:
+            source = OriginalUniprotDataSource(file_path, n_workers=n_workers, entry_filter=entry_filter)
+            accessions = [entry.primary_accession for entry in source.stream_entries_with_catalytic_activity()]
+            self.assertEqual(['A0A0E3KBH3', 'A0A0E3T552'], accessions)
+
+    def test_get_all_isoform_ids_with_filter(self):
+        file_path = TestDefaultPath().test_data.joinpath("uniprotkb_accession_F1MAB7_OR_O14975_2024_09_21.json")
+        source = OriginalUniprotDataSource(file_path, entry_filter=UniprotEntryFilter(accessions=frozenset({'O14975'})))
+        self.assertEqual({'O14975-1', 'O14975-2'}, source.get_all_isoform_ids())
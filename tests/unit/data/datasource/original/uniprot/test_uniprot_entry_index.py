@@ -0,0 +1,81 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import ijson
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_index import UniprotEntryIndex
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestUniprotEntryIndex(TestCase):
+
+    def setUp(self):
+        self.file_path = TestDefaultPath().test_data.joinpath('uniprotkb_A0A0E3KBH3_OR_A0A072ULZ1_OR_A_2024_09_24.json')
+        with open(self.file_path, 'rb') as file:
+            self.expected = list(ijson.items(file, 'results.item', use_float=True))
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_path = Path(self.temp_dir.name).joinpath('entries.index.json')
+        UniprotEntryIndex.build(self.file_path).save(self.index_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_index_ranges(self):
+        index = UniprotEntryIndex.load(self.index_path, self.file_path)
+        self.assertEqual([data['primaryAccession'] for data in self.expected],
+                         [accession for accession, _, _ in index.entries])
+        ranges = [(start, end) for _, start, end in index.entries]
+        self.assertEqual(self.expected, index.read_entry_dicts(self.file_path, ranges))
+
+    def test_index_ranges_do_not_depend_on_key_order(self):
+        # "primaryAccession" is not the second key, a nested object has the same key, and a string ends with '}'
+        entries = [{'entryType': data['entryType'], 'nested': {'primaryAccession': 'P99999'},
+                    **{key: value for key, value in data.items() if key not in ('entryType', 'primaryAccession')},
+                    'primaryAccession': data['primaryAccession'], 'note': '{}'} for data in self.expected]
+        file_path = Path(self.temp_dir.name).joinpath('entries.json')
+        with open(file_path, 'w') as file:
+            json.dump({'results': entries}, file, indent=2)
+        index = UniprotEntryIndex.build(file_path)
+        self.assertEqual([data['primaryAccession'] for data in self.expected],
+                         [accession for accession, _, _ in index.entries])
+        self.assertEqual(entries, index.read_entry_dicts(file_path, [(start, end) for _, start, end in index.entries]))
+
+    def test_get_entries_by_accessions(self):
+        source = OriginalUniprotDataSource(self.file_path, index_path=self.index_path)
+        streamed = {entry.primary_accession: entry for entry in source.stream_entries_with_catalytic_activity()}
+        fetched = source.get_entries_by_accessions(['A0A0E3T552', 'A0A072ULZ1'])
+        self.assertEqual([streamed['A0A0E3T552'], streamed['A0A072ULZ1']], fetched)
+        with self.assertRaises(KeyError):
+            source.get_entries_by_accessions(['P99999'])
+
+    def test_sample_entries(self):
+        source = OriginalUniprotDataSource(self.file_path, index_path=self.index_path)
+        sampled = [entry.primary_accession for entry in source.sample_entries(3, seed=1)]
+        self.assertEqual(3, len(sampled))
+        self.assertEqual(sampled, [entry.primary_accession for entry in source.sample_entries(3, seed=1)])
+        expected_order = [data['primaryAccession'] for data in self.expected]
+        self.assertEqual(sorted(sampled, key=expected_order.index), sampled)
+
+    def test_sample_entries_with_filter(self):
+        accessions = frozenset(['A0A0E3T552', 'A0A072ULZ1'])
+        source = OriginalUniprotDataSource(self.file_path, index_path=self.index_path,
+                                           entry_filter=UniprotEntryFilter(accessions=accessions))
+        self.assertEqual(accessions, {entry.primary_accession for entry in source.sample_entries(5, seed=1)})
+        source = OriginalUniprotDataSource(self.file_path, index_path=self.index_path,
+                                           entry_filter=UniprotEntryFilter(ec_prefix='99'))
+        self.assertEqual([], source.sample_entries(3, seed=1))
+
+    def test_modified_source(self):
+        index = UniprotEntryIndex.load(self.index_path, self.file_path)
+        copied_path = Path(self.temp_dir.name).joinpath('entries.json')
+        shutil.copyfile(self.file_path, copied_path)
+        self.assertIsNone(UniprotEntryIndex.load(self.index_path, copied_path))
+        with self.assertRaises(ValueError):
+            OriginalUniprotDataSource(copied_path, index_path=self.index_path).get_entries_by_accessions(['A0A072ULZ1'])
+        with self.assertRaises(ValueError):
+            index.read_entry_dicts(copied_path, [index.entries[0][1:]])
@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.data.datasource.original.uniprot.uniprot_entity import EntryComponent
+from enzsrp.data.datasource.original.uniprot.uniprot_entry_filter import UniprotEntryFilter
+from enzsrp.data.datasource.original.uniprot.uniprot_snapshot_cache import UniprotSnapshotCache
+from enzsrp.utils import hash_util
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestUniprotSnapshotCache(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir_path = Path(self.temp_dir.name)
+        self.file_path = TestDefaultPath().test_data.joinpath("uniprotkb_accession_F1MAB7_OR_O14975_2024_09_21.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_entries_from_snapshot_are_equal_to_original(self):
+        expected = list(OriginalUniprotDataSource(self.file_path).stream_entries_with_catalytic_activity())
+        source = OriginalUniprotDataSource(self.file_path, snapshot_dir=self.temp_dir_path)
+        self.assertEqual(expected, list(source.stream_entries_with_catalytic_activity()))
+        self.assertTrue(UniprotSnapshotCache(self.temp_dir_path, self.file_path).exists())
+        # second run reads the snapshot
+        self.assertEqual(expected, list(source.stream_entries_with_catalytic_activity()))
+
+    def test_all_components_with_projection_and_filter(self):
+        # This file has active sites, sites and cofactors
+        file_path = TestDefaultPath().test_data.joinpath('uniprotkb_A0A0E3KBH3_OR_A0A072ULZ1_OR_A_2024_09_24.json')
+        projection = frozenset({EntryComponent.BINDING_SITES, EntryComponent.ALTERNATIVE_PRODUCTS_DATA})
+        expected = list(OriginalUniprotDataSource(file_path).stream_entries_with_catalytic_activity())
+        source = OriginalUniprotDataSource(file_path, snapshot_dir=self.temp_dir_path, projection=projection)
+        self.assertEqual(expected, list(source.stream_entries_with_catalytic_activity()))
+
+        entry_filter = UniprotEntryFilter(ec_prefix="1.2.*", require_rhea=True)
+        source = OriginalUniprotDataSource(file_path, snapshot_dir=self.temp_dir_path, projection=projection,
+                                           entry_filter=entry_filter)
+        entries = list(source.stream_entries_with_catalytic_activity())
+        self.assertEqual(['A0A0E3KBH3', 'A0A0E3T552'], [entry.primary_accession for entry in entries])
+        self.assertEqual([entry for entry in expected if entry.primary_accession in {'A0A0E3KBH3', 'A0A0E3T552'}],
+                         entries)
+
+    def test_numbers_have_the_same_types(self):
+        # ijson parses non-integer numbers as Decimal, e.g. this field ignored by the entities
+        with open(self.file_path, 'r') as file:
+            data = json.load(file)
+        data['results'][0]['features'][0]['score'] = 0.5
+        file_path = self.temp_dir_path.joinpath('entries.json')
+        with open(file_path, 'w') as file:
+            json.dump(data, file)
+        expected = list(OriginalUniprotDataSource(file_path).stream_entries_with_catalytic_activity())
+        actual = list(OriginalUniprotDataSource(file_path, snapshot_dir=self.temp_dir_path)
+                      .stream_entries_with_catalytic_activity())
+        self.assertEqual(expected, actual)
+        for expected_entry, actual_entry in zip(expected, actual):
+            for expected_feature, actual_feature in zip(expected_entry.features, actual_entry.features):
+                self.assertIs(type(expected_feature.location.start_value), type(actual_feature.location.start_value))
+
+    def test_source_is_hashed_only_when_changed(self):
+        file_path = self.temp_dir_path.joinpath('entries.json')
+        shutil.copyfile(self.file_path, file_path)
+        snapshot_dir = self.temp_dir_path.joinpath('snapshot')
+        with patch.object(hash_util, 'hash_file', wraps=hash_util.hash_file) as hash_file:
+            path = UniprotSnapshotCache(snapshot_dir, file_path).path
+            self.assertEqual(path, UniprotSnapshotCache(snapshot_dir, file_path).path)
+            self.assertEqual(1, hash_file.call_count)
+            stat = file_path.stat()
+            os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            self.assertEqual(path, UniprotSnapshotCache(snapshot_dir, file_path).path)
+            self.assertEqual(2, hash_file.call_count)
+
+    def test_get_all_isoform_ids_from_snapshot(self):
+        source = OriginalUniprotDataSource(self.file_path, snapshot_dir=self.temp_dir_path)
+        result = source.get_all_isoform_ids()
+        self.assertEqual(result, {'F1MAB7-2', 'F1MAB7-1', 'O14975-1', 'O14975-2', 'F1MAB7-3'})
@@ -0,0 +1,51 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from enzsrp.data.datasource.remote.id_mapping_cache import IdMappingCache
+from enzsrp.data.datasource.remote.uniprot_id_mapping_ext import submit_id_mapping_task_and_download_file
+from tests.test_utils.uniprot_id_mapping_stub import UniprotIdMappingStub
+
+
+class TestIdMappingCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.temp_dir.name).joinpath('cache', 'id_mapping.sqlite')
+        self.output_path = Path(self.temp_dir.name).joinpath('output.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _download(self, stub: UniprotIdMappingStub, ids):
+        with patch('enzsrp.data.datasource.remote.uniprot_id_mapping.API_URL', stub.url):
+            submit_id_mapping_task_and_download_file(from_db='UniProtKB_AC-ID', to_db='UniParc', ids=ids,
+                                                     output_file_path=self.output_path, cache_path=self.cache_path)
+        with open(self.output_path, 'r') as f:
+            return json.load(f)
+
+    def test_put_and_get_results(self):
+        cache = IdMappingCache(self.cache_path)
+        cache.put_results('A', 'B', [{"from": "P1", "to": "X"}, {"from": "P1", "to": "Y"}, {"from": "P2", "to": "Z"}])
+        self.assertEqual(cache.get_results('A', 'B', ['P1', 'P3']),
+                         {"P1": [{"from": "P1", "to": "X"}, {"from": "P1", "to": "Y"}]})
+        self.assertEqual(cache.get_results('A', 'C', ['P1']), {})
+        cache.put_results('A', 'B', [{"from": "P1", "to": "W"}])
+        self.assertEqual(cache.get_results('A', 'B', ['P1']), {"P1": [{"from": "P1", "to": "W"}]})
+        cache.close()
+
+    def test_submit_only_missing_ids(self):
+        with UniprotIdMappingStub(page_size=2) as stub:
+            first = self._download(stub, ['P1-1', 'P1-2', 'FAIL-1', 'P2-1'])
+            second = self._download(stub, ['P1-1', 'P3-1', 'P1-2', 'FAIL-1', 'P2-1'])
+            third = self._download(stub, ['P2-1', 'P1-1'])
+        self.assertEqual(stub.submitted_ids, [['P1-1', 'P1-2', 'FAIL-1', 'P2-1'], ['P3-1', 'FAIL-1']])
+        self.assertEqual([r["from"] for r in first["results"]], ['P1-1', 'P1-2', 'P2-1'])
+        self.assertEqual(first["failedIds"], ['FAIL-1'])
+        self.assertEqual([r["from"] for r in second["results"]], ['P1-1', 'P3-1', 'P1-2', 'P2-1'])
+        self.assertEqual(second["results"][1], {"from": "P3-1", "to": {"uniParcId": "UPI_P3-1"}})
+        self.assertEqual(second["failedIds"], ['FAIL-1'])
+        self.assertEqual(third, {"results": [{"from": "P2-1", "to": {"uniParcId": "UPI_P2-1"}},
+                                             {"from": "P1-1", "to": {"uniParcId": "UPI_P1-1"}}]})
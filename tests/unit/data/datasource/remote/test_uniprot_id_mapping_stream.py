@@ -0,0 +1,67 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from enzsrp.data.datasource.remote.uniprot_id_mapping_ext import submit_id_mapping_task_and_stream_to_file, \
+    default_checkpoint_path
+from tests.test_utils.uniprot_id_mapping_stub import UniprotIdMappingStub
+
+IDS = ['P1-1', 'P1-2', 'FAIL-1', 'P2-1', 'P3-1']
+
+
+class TestStreamIdMappingResults(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = Path(self.temp_dir.name).joinpath('idmapping.jsonl')
+        self.cache_path = Path(self.temp_dir.name).joinpath('id_mapping.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _download(self, stub: UniprotIdMappingStub, ids, cache_path=None):
+        with patch('enzsrp.data.datasource.remote.uniprot_id_mapping.API_URL', stub.url):
+            submit_id_mapping_task_and_stream_to_file(from_db='UniProtKB_AC-ID', to_db='UniParc', ids=ids,
+                                                      output_file_path=self.output_path, cache_path=cache_path)
+
+    def _read_output(self):
+        with open(self.output_path, 'r') as file:
+            return [json.loads(line)["from"] for line in file]
+
+    def _read_checkpoint(self):
+        with open(default_checkpoint_path(self.output_path), 'r') as file:
+            return json.load(file)['payload']
+
+    def test_stream(self):
+        with UniprotIdMappingStub(page_size=2) as stub:
+            self._download(stub, IDS)
+            # A completed download is not fetched again
+            self._download(stub, IDS)
+        self.assertEqual(['P1-1', 'P1-2', 'P2-1', 'P3-1'], self._read_output())
+        self.assertEqual([('0', 0), ('0', 2)], stub.requested_pages)
+        checkpoint = self._read_checkpoint()
+        self.assertTrue(checkpoint['complete'])
+        self.assertEqual(['FAIL-1'], checkpoint['failed_ids'])
+
+    def test_resume(self):
+        with UniprotIdMappingStub(page_size=2, fail_once_at_cursor=2) as stub:
+            with self.assertRaises(requests.HTTPError):
+                self._download(stub, IDS)
+            self.assertEqual(['P1-1', 'P1-2'], self._read_output())
+            self.assertFalse(self._read_checkpoint()['complete'])
+            self._download(stub, IDS)
+        # The job is not submitted again and the first page is not fetched again
+        self.assertEqual(1, len(stub.submitted_ids))
+        self.assertEqual([('0', 0), ('0', 2), ('0', 2)], stub.requested_pages)
+        self.assertEqual(['P1-1', 'P1-2', 'P2-1', 'P3-1'], self._read_output())
+
+    def test_stream_with_cache(self):
+        with UniprotIdMappingStub(page_size=2) as stub:
+            self._download(stub, IDS[:3], cache_path=self.cache_path)
+            self._download(stub, IDS, cache_path=self.cache_path)
+        self.assertEqual([['P1-1', 'P1-2', 'FAIL-1'], ['FAIL-1', 'P2-1', 'P3-1']], stub.submitted_ids)
+        self.assertEqual(['P2-1', 'P3-1', 'P1-1', 'P1-2'], self._read_output())
@@ -0,0 +1,34 @@
+import unittest
+
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+from enzsrp.extension.parse_reaction import reaction_from_rxn_block_with_mol_title, get_all_mol_names_in_rxn, \
+    reaction_from_rxn_block_with_cleaning
+from tests.test_utils.test_default_path import TestDefaultPath
+
+
+class TestParseReaction(unittest.TestCase):
+
+    def test_reaction_from_rxn_block_with_mol_title(self):
+        for rhea_id in ['10001', '71500']:
+            with open(TestDefaultPath().test_data.joinpath(f'{rhea_id}.rxn'), 'r') as file:
+                rxn_block = file.read()
+            expected = reaction_from_rxn_block_with_cleaning(rxn_block)
+            for verify in [False, True]:
+                reaction = reaction_from_rxn_block_with_mol_title(rxn_block, verify=verify)
+                self.assertEqual(AllChem.ReactionToSmiles(expected), AllChem.ReactionToSmiles(reaction))
+                self.assertEqual([Chem.MolToSmiles(mol) for mol in expected.GetReactants()],
+                                 [Chem.MolToSmiles(mol) for mol in reaction.GetReactants()])
+                self.assertEqual([Chem.MolToSmiles(mol) for mol in expected.GetProducts()],
+                                 [Chem.MolToSmiles(mol) for mol in reaction.GetProducts()])
+
+    def test_mol_titles(self):
+        with open(TestDefaultPath().test_data.joinpath('10001.rxn'), 'r') as file:
+            reaction = reaction_from_rxn_block_with_mol_title(file.read())
+        self.assertEqual({'CHEBI:28938', 'CHEBI:15377', 'CHEBI:31011', 'CHEBI:16459'},
+                         get_all_mol_names_in_rxn(reaction))
+
+
+if __name__ == "__main__":
+    unittest.main()
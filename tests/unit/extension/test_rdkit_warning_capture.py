@@ -0,0 +1,56 @@
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from rdkit import Chem
+
+from enzsrp.extension.rdkit_warning import RDKitWarningCapture, NotRemovingHydrogenAtomWithDummyAtomNeighbors, \
+    NotRemovingHydrogenAtomWithoutNeighbors
+
+
+def _remove_hs(smiles: str):
+    with RDKitWarningCapture():
+        return Chem.MolToSmiles(Chem.RemoveHs(Chem.MolFromSmiles(smiles)))
+
+
+def _remove_hs_or_exception_type(smiles: str):
+    try:
+        return _remove_hs(smiles)
+    except Exception as e:
+        return type(e)
+
+
+class TestRDKitWarningCapture(unittest.TestCase):
+
+    def test_warning(self):
+        with self.assertRaises(NotRemovingHydrogenAtomWithDummyAtomNeighbors):
+            _remove_hs('[H]*')
+        self.assertEqual('CCO', _remove_hs('[H]OCC'))
+
+    def test_ignored_warning(self):
+        with RDKitWarningCapture(ignored=[NotRemovingHydrogenAtomWithDummyAtomNeighbors]):
+            Chem.RemoveHs(Chem.MolFromSmiles('[H]*'))
+
+    def test_stderr_is_not_replaced(self):
+        stderr = sys.stderr
+        with RDKitWarningCapture():
+            self.assertIs(stderr, sys.stderr)
+
+    def test_nested(self):
+        with self.assertRaises(NotRemovingHydrogenAtomWithoutNeighbors):
+            with RDKitWarningCapture():
+                with self.assertRaises(NotRemovingHydrogenAtomWithDummyAtomNeighbors):
+                    with RDKitWarningCapture():
+                        Chem.RemoveHs(Chem.MolFromSmiles('[H]*'))
+                Chem.RemoveHs(Chem.MolFromSmiles('[H+]'))
+
+    def test_threads(self):
+        smiles = ['[H]*', '[H]OCC', '[H+]', 'C[H]'] * 50
+        expected = [NotRemovingHydrogenAtomWithDummyAtomNeighbors, 'CCO', NotRemovingHydrogenAtomWithoutNeighbors,
+                    'C'] * 50
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(expected, list(executor.map(_remove_hs_or_exception_type, smiles)))
+
+
+if __name__ == "__main__":
+    unittest.main()
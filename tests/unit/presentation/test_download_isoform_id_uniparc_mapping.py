@@ -0,0 +1,54 @@
+import json
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from enzsrp.presentation.download_isoform_id_uniparc_mapping import _download_isoform_id_uniparc_mapping
+from tests.test_utils.test_default_path import TestDefaultPath
+from tests.test_utils.uniprot_id_mapping_stub import UniprotIdMappingStub
+
+
+class TestDownloadIsoformIdUniparcMapping(TestCase):
+
+    def setUp(self):
+        self.uniprot_entries_json = TestDefaultPath().test_data.joinpath(
+            'uniprotkb_accession_F1MAB7_OR_O14975_2024_09_21.json')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _download(self, stub: UniprotIdMappingStub, today: datetime):
+        with patch('enzsrp.data.datasource.remote.uniprot_id_mapping.API_URL', stub.url), \
+                patch('enzsrp.presentation.download_isoform_id_uniparc_mapping.datetime') as mock_datetime:
+            mock_datetime.today.return_value = today
+            _download_isoform_id_uniparc_mapping(uniprot_entries_json=self.uniprot_entries_json,
+                                                 output_dir=self.output_dir, stream=True)
+
+    def test_resume_on_later_day(self):
+        with UniprotIdMappingStub(page_size=2, fail_once_at_cursor=2) as stub:
+            with self.assertRaises(requests.HTTPError):
+                self._download(stub, datetime(2024, 11, 13))
+            self._download(stub, datetime(2024, 11, 14))
+        # The job of the first day is resumed instead of submitting a new one
+        self.assertEqual(1, len(stub.submitted_ids))
+        self.assertEqual(['idmapping_2024_11_13_isoform_uniparc.jsonl',
+                          'idmapping_2024_11_13_isoform_uniparc.jsonl.checkpoint.json'],
+                         sorted(path.name for path in self.output_dir.iterdir()))
+        with open(self.output_dir.joinpath('idmapping_2024_11_13_isoform_uniparc.jsonl'), 'r') as file:
+            mapped_ids = [json.loads(line)["from"] for line in file]
+        self.assertEqual(sorted(stub.submitted_ids[0]), sorted(mapped_ids))
+
+    def test_output_file(self):
+        output_file = self.output_dir.joinpath('mapping', 'isoform_uniparc.jsonl')
+        with UniprotIdMappingStub(page_size=2) as stub, \
+                patch('enzsrp.data.datasource.remote.uniprot_id_mapping.API_URL', stub.url):
+            _download_isoform_id_uniparc_mapping(uniprot_entries_json=self.uniprot_entries_json, output_dir=None,
+                                                 stream=True, output_file=output_file)
+        with open(output_file, 'r') as file:
+            self.assertEqual(5, len(file.readlines()))
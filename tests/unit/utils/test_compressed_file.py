@@ -0,0 +1,64 @@
+import gzip
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from enzsrp.data.datasource.original.uniprot.id_mapping_data_source import IsoformIdMappingDataSource
+from enzsrp.data.datasource.original.uniprot.original_uniprot_data_source import OriginalUniprotDataSource
+from enzsrp.utils.compressed_file import detect_compression, open_binary, ReadAheadReader, GZIP, ZSTD
+from tests.test_utils.test_default_path import TestDefaultPath
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class TestCompressedFile(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir_path = Path(self.temp_dir.name)
+        self.file_path = TestDefaultPath().test_data.joinpath("uniprotkb_accession_F1MAB7_OR_O14975_2024_09_21.json")
+        with open(self.file_path, 'rb') as file:
+            self.content = file.read()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_ahead_reader(self):
+        with io.BufferedReader(ReadAheadReader(io.BytesIO(self.content), chunk_size=1000, max_chunks=2)) as reader:
+            self.assertEqual(self.content, reader.read())
+
+    def test_stream_gzip_entries(self):
+        gz_path = self.temp_dir_path / 'entries.json.gz'
+        with gzip.open(gz_path, 'wb') as file:
+            file.write(self.content)
+        self.assertEqual(GZIP, detect_compression(gz_path))
+        self.assertEqual(None, detect_compression(self.file_path))
+        with open_binary(gz_path) as file:
+            self.assertEqual(self.content, file.read())
+
+        expected = list(OriginalUniprotDataSource(self.file_path).stream_entries_with_catalytic_activity())
+        result = list(OriginalUniprotDataSource(gz_path).stream_entries_with_catalytic_activity())
+        self.assertEqual(expected, result)
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_stream_zstd_entries(self):
+        zst_path = self.temp_dir_path / 'entries.json.zst'
+        with open(zst_path, 'wb') as file:
+            file.write(zstandard.ZstdCompressor().compress(self.content))
+        self.assertEqual(ZSTD, detect_compression(zst_path))
+        with open_binary(zst_path) as file:
+            self.assertEqual(self.content, file.read())
+
+    def test_isoform_id_mapping_gzip(self):
+        path = TestDefaultPath().test_data.joinpath('output', 'idmapping_2024_09_21_isoform_uniparc.json')
+        gz_path = self.temp_dir_path / 'idmapping.json.gz'
+        with open(path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+            dst.write(src.read())
+        expected = IsoformIdMappingDataSource(path)
+        result = IsoformIdMappingDataSource(gz_path)
+        self.assertEqual(expected.isoform_id_to_sequence, result.isoform_id_to_sequence)
+        self.assertEqual(expected.isoform_id_to_active_isoform_id, result.isoform_id_to_active_isoform_id)
@@ -0,0 +1,39 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from enzsrp.utils.json_sidecar import sidecar_path, load_json_sidecar, save_json_sidecar
+
+
+class TestJsonSidecar(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = sidecar_path(Path(self.temp_dir.name).joinpath('source.dat'), '.index.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sidecar_path(self):
+        self.assertEqual('source.dat.index.json', self.path.name)
+
+    def test_save_and_load(self):
+        self.assertIsNone(load_json_sidecar(self.path, 1, 'abc', dict))
+        save_json_sidecar(self.path, 1, 'abc', {'x': [1, 2]})
+        self.assertEqual({'x': [1, 2]}, load_json_sidecar(self.path, 1, 'abc', dict))
+        self.assertEqual(((1, 2),), load_json_sidecar(self.path, 1, 'abc', lambda payload: (tuple(payload['x']),)))
+        # Another source or format version is stale
+        self.assertIsNone(load_json_sidecar(self.path, 1, 'abd', dict))
+        self.assertIsNone(load_json_sidecar(self.path, 2, 'abc', dict))
+
+    def test_unreadable_file_is_stale(self):
+        save_json_sidecar(self.path, 1, 'abc', {'x': [1, 2]})
+        content = self.path.read_text()
+        for broken in [content[:len(content) // 2], '[]', '{"format_version": 1, "source_key": "abc"}', '\xff']:
+            self.path.write_text(broken)
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(load_json_sidecar(self.path, 1, 'abc', lambda payload: payload['x']))
+        # Errors from decoding the payload are also treated as stale
+        save_json_sidecar(self.path, 1, 'abc', {'y': 1})
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(load_json_sidecar(self.path, 1, 'abc', lambda payload: payload['x']))